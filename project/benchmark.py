@@ -0,0 +1,261 @@
+"""Headless benchmark of World.tick using the objects of the balls scene.
+
+Builds worlds of Balls resting on BoundLine terrain, optionally with a Player,
+steps them without touching SDL and prints one JSON document with per step
+timings of every run, so results can be compared across commits.
+
+    python benchmark.py --bodies 100 1000 10000 50000 --steps 200 -o run.json
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import typing
+from array import array
+
+import pymunk
+from gamepart.physics import World
+from scenes.balls.ball import Ball
+from scenes.balls.category import cat_enemy, cat_terrain
+from scenes.balls.line import BoundLine
+from scenes.balls.player import Player
+
+DEFAULT_BODIES = (100, 500, 1000, 5000, 10000, 50000)
+BALL_RADIUS = 10.0
+BALL_SPACING = 25.0
+
+
+class ProfiledWorld(World):
+    """World adding up the time spent in the parts of tick.
+
+    step is the time in space.step, which includes collisions, the time in
+    collision callbacks dispatched by the world. aware is the time spent
+    ticking aware objects.
+    """
+
+    def __init__(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.timings = dict.fromkeys(("step", "collisions", "aware"), 0.0)
+        step = self.space.step
+        timings = self.timings
+
+        def timed_step(dt: float) -> None:
+            start = time.perf_counter()
+            step(dt)
+            timings["step"] += time.perf_counter() - start
+
+        self.space.step = timed_step  # type: ignore[method-assign]
+
+    def _dispatch(
+        self, phase: str
+    ) -> typing.Callable[[pymunk.Arbiter, pymunk.Space, typing.Any], None]:
+        dispatch = super()._dispatch(phase)
+        timings = self.timings
+
+        def timed_dispatch(
+            arbiter: pymunk.Arbiter, space: pymunk.Space, data: typing.Any
+        ) -> None:
+            start = time.perf_counter()
+            dispatch(arbiter, space, data)
+            timings["collisions"] += time.perf_counter() - start
+
+        return timed_dispatch
+
+    def _tick_aware(self, delta: float) -> None:
+        start = time.perf_counter()
+        super()._tick_aware(delta)
+        self.timings["aware"] += time.perf_counter() - start
+
+
+def build_world(
+    bodies: int,
+    lines: int = 64,
+    player: bool = True,
+    collision_handlers: bool = False,
+    seed: int = 0,
+    **world_options: typing.Any,
+) -> ProfiledWorld:
+    """World with bodies Balls stacked on a grid above a zigzag floor.
+
+    The floor is made of lines BoundLines inside a box of four more. With
+    collision_handlers, every ball touching terrain goes through a world
+    collision callback, like a scene listening to those contacts would.
+    """
+    world = ProfiledWorld(**world_options)
+    world.space.gravity = (0, -1000)
+    rng = random.Random(seed)
+    columns = max(1, math.ceil(math.sqrt(bodies)))
+    rows = math.ceil(bodies / columns)
+    width = (columns + 2) * BALL_SPACING
+    height = (rows + 20) * BALL_SPACING
+    static_body = world.space.static_body
+    world.add(*BoundLine.make_box(static_body, width, height, 0, -BALL_SPACING))
+    step = width / max(1, lines)
+    world.add(
+        *(
+            BoundLine(
+                static_body,
+                i * step,
+                BALL_RADIUS * (i % 2),
+                (i + 1) * step,
+                BALL_RADIUS * ((i + 1) % 2),
+            )
+            for i in range(lines)
+        )
+    )
+    world.add(
+        *(
+            Ball(
+                BALL_RADIUS,
+                position=(
+                    (i % columns + 1.5) * BALL_SPACING + rng.uniform(-2, 2),
+                    (i // columns + 2) * BALL_SPACING,
+                ),
+            )
+            for i in range(bodies)
+        )
+    )
+    if player:
+        world.add(Player(position=(width / 2, (rows + 10) * BALL_SPACING)))
+    if collision_handlers:
+        world.on_collision(cat_enemy, cat_terrain, post_solve=_ignore_collision)
+    return world
+
+
+def _ignore_collision(arbiter: pymunk.Arbiter, *objects: typing.Any) -> None:
+    pass
+
+
+def run(
+    bodies: int, steps: int = 200, delta: float = 1 / 60, **options: typing.Any
+) -> dict[str, typing.Any]:
+    """Builds a world and ticks it steps times, returns the run's results.
+
+    Times are in seconds. solver is the time in space.step without collision
+    callbacks, bookkeeping is what tick spends outside of space.step and
+    aware ticks, mostly storing transforms for interpolation.
+    """
+    start = time.perf_counter()
+    world = build_world(bodies, **options)
+    setup = time.perf_counter() - start
+    tick_times = array("d")
+    for _ in range(steps):
+        start = time.perf_counter()
+        world.tick(delta)
+        tick_times.append(time.perf_counter() - start)
+    total = sum(tick_times)
+    timings = world.timings
+    return {
+        "bodies": bodies,
+        "shapes": len(world.space.shapes),
+        "steps": steps,
+        "delta": delta,
+        "options": options,
+        "setup": setup,
+        "tick": {
+            "mean": total / steps,
+            "median": statistics.median(tick_times),
+            "p95": _percentile(tick_times, 0.95),
+            "max": max(tick_times),
+        },
+        "per_step": {
+            "solver": (timings["step"] - timings["collisions"]) / steps,
+            "collisions": timings["collisions"] / steps,
+            "aware": timings["aware"] / steps,
+            "bookkeeping": (total - timings["step"] - timings["aware"]) / steps,
+        },
+        "bodies_per_second": bodies * steps / total if total else 0.0,
+        "sleeping": sum(body.is_sleeping for body in world.space.bodies),
+    }
+
+
+def _percentile(values: typing.Sequence[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark(
+    body_counts: typing.Iterable[int], **options: typing.Any
+) -> dict[str, typing.Any]:
+    """Runs every body count and wraps the runs with environment details."""
+    return {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "pymunk": pymunk.version,
+        "platform": platform.platform(),
+        "runs": [run(bodies, **options) for bodies in body_counts],
+    }
+
+
+def print_curve(results: dict[str, typing.Any], file: typing.TextIO) -> None:
+    """Prints the runs as a table of milliseconds per step."""
+    print(
+        f"{'bodies':>8} {'tick':>9} {'solver':>9} {'collide':>9}"
+        f" {'aware':>9} {'other':>9} {'bodies/s':>12}",
+        file=file,
+    )
+    for result in results["runs"]:
+        per_step = result["per_step"]
+        print(
+            f"{result['bodies']:>8} {result['tick']['mean'] * 1000:>9.3f}"
+            f" {per_step['solver'] * 1000:>9.3f}"
+            f" {per_step['collisions'] * 1000:>9.3f}"
+            f" {per_step['aware'] * 1000:>9.3f}"
+            f" {per_step['bookkeeping'] * 1000:>9.3f}"
+            f" {result['bodies_per_second']:>12.0f}",
+            file=file,
+        )
+
+
+def main(argv: typing.Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bodies", type=int, nargs="+", default=DEFAULT_BODIES)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--delta", type=float, default=1 / 60)
+    parser.add_argument("--lines", type=int, default=64)
+    parser.add_argument("--no-player", dest="player", action="store_false")
+    parser.add_argument("--collision-handlers", action="store_true")
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = benchmark(
+        args.bodies,
+        steps=args.steps,
+        delta=args.delta,
+        lines=args.lines,
+        player=args.player,
+        collision_handlers=args.collision_handlers,
+        threads=args.threads,
+        seed=args.seed,
+    )
+    print_curve(results, sys.stderr)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,7 @@ class MyGame(Game):
         super().__init__()
         self.fps_display_config.font = "console"
         self.fps_display_config.size = 14
+        self.fps_display_config.use_atlas = True
 
     def get_initial_context(self) -> MyContext:
         return self.context_class(
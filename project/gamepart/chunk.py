@@ -1,76 +1,888 @@
+import collections
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
 import typing
+from concurrent.futures import Future, ThreadPoolExecutor
 from logging import getLogger
 
+import sdl2
+import sdl2.ext
+
+from gamepart.render import GfxRenderer
 from gamepart.subsystem import SubSystemObject, SystemManager
+from gamepart.viewport import FlippedViewPort, GraphicalObject, ViewPort
+from gamepart.viewport.commands import COPY
+from gamepart.viewport.spatial import Bounds
 
 logger = getLogger(__name__)
 
+# States reported by ChunkManager.chunk_state
+CHUNK_UNLOADED = 0
+CHUNK_PENDING = 1  # generating on a worker or waiting to be integrated
+CHUNK_LOADED = 2
+CHUNK_CACHED = 3  # unloaded, kept to be attached again without generating
+
 
 class Chunk:
     def __init__(self, coord: tuple[int, int]) -> None:
         self.coord = coord
         self.objects: list[SubSystemObject] = []
+        self.version = 0  # bumped by changed()
+        self.dirty = False  # has state a ChunkStore does not have yet
+        self.render_cache: ChunkRenderCache | None = None
+
+    def changed(self) -> None:
+        """Marks the look of the chunk's static objects as changed."""
+        self.version += 1
+        self.dirty = True
+
+
+class RenderCacheBudget:
+    """Total size of the textures of ChunkRenderCaches sharing it.
+
+    Once adding a texture would exceed `budget` bytes, the textures of the
+    least recently drawn caches are released first. Textures drawn since the
+    renderer last presented may still be queued, they are kept even if that
+    leaves the budget exceeded for the frame.
+    """
+
+    def __init__(self, budget: int = 64 * 2**20) -> None:
+        self.budget = budget
+        self.usage: int = 0
+        self._caches: collections.OrderedDict[ChunkRenderCache, int] = (
+            collections.OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._caches)
+
+    def touch(self, cache: "ChunkRenderCache") -> None:
+        """Marks cache as the most recently drawn."""
+        if cache in self._caches:
+            self._caches.move_to_end(cache)
+
+    def add(self, cache: "ChunkRenderCache", nbytes: int, frame: int) -> None:
+        """Accounts a new texture of cache, releasing others to make room."""
+        self.remove(cache)
+        for other in list(self._caches):
+            if self.usage + nbytes <= self.budget:
+                break
+            if other.drawn_frame < frame:
+                other.release()
+        self._caches[cache] = nbytes
+        self.usage += nbytes
+
+    def remove(self, cache: "ChunkRenderCache") -> None:
+        nbytes = self._caches.pop(cache, None)
+        if nbytes is not None:
+            self.usage -= nbytes
+
+
+class ChunkRenderCache(GraphicalObject):
+    """Static graphical objects of a chunk rendered once into a texture.
+
+    The objects are marked as baked, ChunkManager keeps them out of
+    viewports, and the texture is blitted instead. It is rendered at the viewport zoom
+    rounded up to a power of `zoom_step`, but at most `max_texture_size`
+    pixels wide or high, and scaled when copied, so it is regenerated only
+    when zoom crosses such a threshold or the chunk version changes. Chunks
+    bigger than `max_texture_size` pixels at the current zoom are drawn
+    object by object. With a `budget`, textures of caches not drawn lately
+    are released once the caches sharing it use too much memory.
+    """
+
+    static = True
+
+    def __init__(
+        self,
+        chunk: Chunk,
+        zoom_step: float = 2.0,
+        max_texture_size: int = 4096,
+        padding: int = 2,
+        budget: RenderCacheBudget | None = None,
+    ) -> None:
+        super().__init__()
+        self.chunk = chunk
+        self.zoom_step = zoom_step
+        self.max_texture_size = max_texture_size
+        self.padding = padding  # pixels around the objects, room for line widths
+        self.budget = budget
+        self.drawn_frame = -1  # renderer.frames when last drawn
+        self.position: tuple[float, float] = (0.0, 0.0)
+        self.angle = 0.0
+        self.objects: list[GraphicalObject] = [
+            obj
+            for obj in chunk.objects
+            if isinstance(obj, GraphicalObject) and obj.static and not obj.baked
+        ]
+        for obj in self.objects:
+            obj.baked = True
+        self.layer = min((obj.layer for obj in self.objects), default=0)
+        self.texture: typing.Any = None
+        self.texture_key: tuple[float, int, bool, int] | None = None
+        self.texture_rect: Bounds = (0.0, 0.0, 0.0, 0.0)  # world area of texture
+        self.renders = 0  # how many times the texture was rendered
+        self._bounds: Bounds = (0.0, 0.0, 0.0, 0.0)
+        self._bounds_version = -1
+
+    def get_bounds(self) -> Bounds:
+        if self._bounds_version != self.chunk.version:
+            bounds = [obj.get_bounds() for obj in self.objects]
+            if bounds:
+                self._bounds = (
+                    min(b[0] for b in bounds),
+                    min(b[1] for b in bounds),
+                    max(b[2] for b in bounds),
+                    max(b[3] for b in bounds),
+                )
+                minx, miny, maxx, maxy = self._bounds
+                self.position = ((minx + maxx) / 2, (miny + maxy) / 2)
+            self._bounds_version = self.chunk.version
+        return self._bounds
+
+    def zoom_level(self, zoom: float) -> float:
+        """Viewport zoom rounded up to a power of zoom_step."""
+        step = self.zoom_step
+        return float(step ** math.ceil(math.log(zoom, step) - 1e-9))
+
+    def render_zoom(self, zoom: float) -> float:
+        """Zoom the texture is rendered at, capped by max_texture_size."""
+        minx, miny, maxx, maxy = self.get_bounds()
+        extent = max(maxx - minx, maxy - miny)
+        level = self.zoom_level(zoom)
+        if extent <= 0:
+            return level
+        return min(level, (self.max_texture_size - 2 * self.padding) / extent)
+
+    def draw(self, vp: "ViewPort") -> None:
+        if not self.objects:
+            return
+        minx, miny, maxx, maxy = self.get_bounds()
+        extent = max(maxx - minx, maxy - miny)
+        if math.ceil(extent * vp.zoom) + 2 * self.padding > self.max_texture_size:
+            self.release()
+            for obj in self.objects:
+                obj.draw(vp)
+            return
+        zoom = self.render_zoom(vp.zoom)
+        width = math.ceil((maxx - minx) * zoom) + 2 * self.padding
+        height = math.ceil((maxy - miny) * zoom) + 2 * self.padding
+        flipped = isinstance(vp, FlippedViewPort)
+        key = (zoom, self.chunk.version, flipped, vp.renderer.target_resets)
+        if self.texture is None or self.texture_key != key:
+            pad = self.padding / zoom
+            self.texture_rect = (
+                minx - pad,
+                miny - pad,
+                minx - pad + width / zoom,
+                miny - pad + height / zoom,
+            )
+            self._render(vp.renderer, zoom, width, height, flipped)
+            self.texture_key = key
+            if self.budget is not None:
+                self.budget.add(self, width * height * 4, vp.renderer.frames)
+        elif self.budget is not None:
+            self.budget.touch(self)
+        self.drawn_frame = vp.renderer.frames
+        tx1, ty1, tx2, ty2 = self.texture_rect
+        x1, y1 = vp.to_view((tx1, ty1))
+        x2, y2 = vp.to_view((tx2, ty2))
+        dst = (
+            round(min(x1, x2)),
+            round(min(y1, y2)),
+            round(abs(x2 - x1)),
+            round(abs(y2 - y1)),
+        )
+        vp.commands.add(
+            COPY,
+            (self.texture.contents, None, dst, 0, None, 0),
+            None,
+            self.layer,
+            texture=self.texture,
+        )
+
+    def _render(
+        self, renderer: GfxRenderer, zoom: float, width: int, height: int, flipped: bool
+    ) -> None:
+        self.release()
+        sdlrenderer = renderer.sdlrenderer
+        texture = sdl2.SDL_CreateTexture(
+            sdlrenderer,
+            sdl2.SDL_PIXELFORMAT_ARGB8888,
+            sdl2.SDL_TEXTUREACCESS_TARGET,
+            width,
+            height,
+        )
+        if not texture:
+            raise sdl2.ext.SDLError()
+        sdl2.SDL_SetTextureBlendMode(texture, sdl2.SDL_BLENDMODE_BLEND)
+        tx1, ty1, _, _ = self.texture_rect
+        view_class = FlippedViewPort if flipped else ViewPort
+        view = view_class(renderer, width, height, zoom=zoom, x=tx1, y=ty1)
+        renderer.flush()  # pending geometry belongs to the current target
+        old_target = sdl2.SDL_GetRenderTarget(sdlrenderer)
+        with renderer.keep_color(), renderer.keep_blendmode():
+            sdl2.SDL_SetRenderTarget(sdlrenderer, texture)
+            sdl2.SDL_SetRenderDrawColor(sdlrenderer, 0, 0, 0, 0)
+            sdl2.SDL_RenderClear(sdlrenderer)
+            for obj in self.objects:
+                obj.draw(view)
+            view.commands.flush(renderer)
+            renderer.flush()
+            sdl2.SDL_SetRenderTarget(sdlrenderer, old_target or None)
+        self.texture = texture
+        self.renders += 1
+
+    def release(self) -> None:
+        """Destroys the cached texture."""
+        if self.texture is not None:
+            sdl2.SDL_DestroyTexture(self.texture)
+            self.texture = None
+            self.texture_key = None
+            if self.budget is not None:
+                self.budget.remove(self)
+
+
+class ChunkStore:
+    """Encoded chunks kept in an SQLite file, written in batches by a thread.
+
+    put only queues the data, a writer thread commits queued chunks once
+    batch_size of them are waiting or flush_interval seconds have passed.
+    get sees queued chunks, so reads never wait for the writer. Without a
+    path the store lives in a temporary file removed by close.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        batch_size: int = 32,
+        flush_interval: float = 1.0,
+    ) -> None:
+        self.temporary = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(suffix=".chunks")
+            os.close(fd)
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.writes = 0  # chunks committed
+        self.batches = 0  # transactions committed
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "x INTEGER, y INTEGER, data BLOB, PRIMARY KEY (x, y)) WITHOUT ROWID"
+        )
+        self._db.commit()
+        self._db_lock = threading.Lock()
+        self._condition = threading.Condition()
+        self._queued: dict[tuple[int, int], bytes] = {}
+        self._writing: dict[tuple[int, int], bytes] = {}
+        self._flush_requested = False
+        self._closed = False
+        self._writer = threading.Thread(
+            target=self._write_loop, name="chunk-store", daemon=True
+        )
+        self._writer.start()
+
+    def __contains__(self, coord: tuple[int, int]) -> bool:
+        return self.get(coord) is not None
+
+    def get(self, coord: tuple[int, int]) -> bytes | None:
+        with self._condition:
+            data = self._queued.get(coord)
+            if data is None:
+                data = self._writing.get(coord)
+        if data is not None:
+            return data
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT data FROM chunks WHERE x = ? AND y = ?", coord
+            ).fetchone()
+        return None if row is None else bytes(row[0])
+
+    def put(self, coord: tuple[int, int], data: bytes) -> None:
+        with self._condition:
+            if self._closed:
+                raise ValueError("ChunkStore is closed")
+            self._queued[coord] = data
+            if len(self._queued) >= self.batch_size:
+                self._condition.notify_all()
+
+    def flush(self) -> None:
+        """Waits until every queued chunk is committed."""
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            self._condition.wait_for(lambda: not (self._queued or self._writing))
+
+    def close(self) -> None:
+        """Commits queued chunks, stops the writer and closes the file."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._writer.join()
+        with self._db_lock:
+            self._db.close()
+        if self.temporary:
+            os.remove(self.path)
+
+    def _write_loop(self) -> None:
+        condition = self._condition
+        while True:
+            with condition:
+                condition.wait_for(
+                    lambda: self._closed
+                    or self._flush_requested
+                    or len(self._queued) >= self.batch_size,
+                    self.flush_interval,
+                )
+                self._flush_requested = False
+                self._writing, self._queued = self._queued, {}
+                closed = self._closed
+            if self._writing:
+                self._commit(self._writing)
+            with condition:
+                self._writing = {}
+                condition.notify_all()
+                if closed and not self._queued:
+                    return
+
+    def _commit(self, batch: dict[tuple[int, int], bytes]) -> None:
+        with self._db_lock:
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO chunks (x, y, data) VALUES (?, ?, ?)",
+                    [(x, y, data) for (x, y), data in batch.items()],
+                )
+        self.writes += len(batch)
+        self.batches += 1
 
 
 T = typing.TypeVar("T", bound=Chunk)
 
+# Chunk coords spanned by an area, as (minx, miny, maxx, maxy)
+ChunkArea = tuple[int, int, int, int]
+
 
 class ChunkManager(typing.Generic[T]):
+    """Loads the chunks around a position into a system manager.
+
+    Chunks within load_rings are loaded and those past unload_rings are
+    unloaded into an LRU cache of cache_size chunks and cache_objects objects.
+    """
+
     def __init__(
         self,
         system: SystemManager,
         chunk_size: int = 1000,
+        render_cache: bool = False,
+        workers: int = 0,
+        integration_budget: float = 0.004,
+        load_rings: int = 1,
+        unload_rings: int = 2,
+        cache_size: int = 16,
+        cache_objects: int | None = None,
+        store: ChunkStore | None = None,
+        lookahead: float = 1.0,
+        prefetch_rings: int | None = None,
+        max_prefetch: int = 32,
+        view_rings: int = 0,
+        coarse: "ChunkManager[typing.Any] | None" = None,
+        coarse_zoom: float = 0.0,
+        render_budget: int = 64 * 2**20,
     ) -> None:
         self._system = system
         self._chunk_size = chunk_size
+        self._render_cache = render_cache  # draw static objects via ChunkRenderCache
+        self.render_budget = RenderCacheBudget(render_budget)  # shared by chunks
         self._loaded_chunks: dict[tuple[int, int], T] = {}
+        self._pending: dict[tuple[int, int], Future[tuple[typing.Any, bool]]] = {}
+        self._executor: ThreadPoolExecutor | None = None
+        if workers > 0:
+            self._executor = ThreadPoolExecutor(workers, thread_name_prefix="chunks")
+        self.integration_budget = integration_budget  # seconds per frame
+        self.load_rings = load_rings
+        self.unload_rings = unload_rings
+        self.cache_size = cache_size
+        self.cache_objects = cache_objects
+        self.store = store
+        self.lookahead = lookahead  # seconds of movement to prefetch
+        self.prefetch_rings = prefetch_rings  # load_rings when None
+        self.max_prefetch = max_prefetch
+        self.view_rings = view_rings  # chunks loaded around a rect
+        self.coarse = coarse
+        self.coarse_zoom = coarse_zoom  # zoom below which coarse takes over
+        self._cached_chunks: collections.OrderedDict[tuple[int, int], T] = (
+            collections.OrderedDict()
+        )
+        self._cached_objects = 0
+        self._pinned: collections.Counter[tuple[int, int]] = collections.Counter()
+        # requested, prefetched, built, reattached, unloaded, evicted,
+        # cancelled, saved and restored chunks
+        self.counts: collections.Counter[str] = collections.Counter()
 
     def get_chunk_coord(self, position: tuple[float, float]) -> tuple[int, int]:
         return int(position[0] // self._chunk_size), int(
             position[1] // self._chunk_size
         )
 
+    def get_chunk_area(self, rect: Bounds) -> ChunkArea:
+        """Chunks overlapped by a (minx, miny, maxx, maxy) world rect."""
+        minx, miny = self.get_chunk_coord((rect[0], rect[1]))
+        maxx, maxy = self.get_chunk_coord((rect[2], rect[3]))
+        return minx, miny, maxx, maxy
+
     def get_required_chunks(
         self, center: tuple[int, int], rings: int = 1
     ) -> set[tuple[int, int]]:
-        required: set[tuple[int, int]] = set()
-        for dx in range(-rings, rings + 1):
-            for dy in range(-rings, rings + 1):
-                required.add((center[0] + dx, center[1] + dy))
-        return required
+        return self.get_area_chunks((*center, *center), rings)
+
+    @staticmethod
+    def get_area_chunks(area: ChunkArea, rings: int = 0) -> set[tuple[int, int]]:
+        """Chunks of area and of rings rings around it."""
+        minx, miny, maxx, maxy = area
+        return {
+            (x, y)
+            for x in range(minx - rings, maxx + rings + 1)
+            for y in range(miny - rings, maxy + rings + 1)
+        }
+
+    @staticmethod
+    def ring_distance(a: tuple[int, int], b: tuple[int, int]) -> int:
+        """Index of the ring around chunk a that chunk b is in."""
+        return max(abs(a[0] - b[0]), abs(a[1] - b[1]))
+
+    @staticmethod
+    def area_distance(area: ChunkArea, coord: tuple[int, int]) -> int:
+        """Index of the ring around area that chunk coord is in, 0 inside."""
+        x, y = coord
+        return max(area[0] - x, x - area[2], area[1] - y, y - area[3], 0)
+
+    def get_chunk(self, coord: tuple[int, int]) -> T | None:
+        return self._loaded_chunks.get(coord)
+
+    def chunk_state(self, coord: tuple[int, int]) -> int:
+        """CHUNK_LOADED, CHUNK_PENDING, CHUNK_CACHED or CHUNK_UNLOADED."""
+        if coord in self._loaded_chunks:
+            return CHUNK_LOADED
+        if coord in self._pending:
+            return CHUNK_PENDING
+        if coord in self._cached_chunks:
+            return CHUNK_CACHED
+        return CHUNK_UNLOADED
+
+    @property
+    def pending_chunks(self) -> typing.KeysView[tuple[int, int]]:
+        return self._pending.keys()
+
+    def _generate_chunk(self, coord: tuple[int, int]) -> typing.Any:
+        """Data a chunk is built from, computed on a worker with workers.
+
+        Must not touch the system manager or the objects in it.
+        """
+        return None
+
+    def _encode_chunk(self, chunk: T) -> bytes:
+        """State of a chunk for the store."""
+        raise NotImplementedError
+
+    def _decode_chunk(self, coord: tuple[int, int], data: bytes) -> typing.Any:
+        """Data for _build_chunk from what _encode_chunk stored."""
+        raise NotImplementedError
+
+    def _chunk_data(self, coord: tuple[int, int]) -> tuple[typing.Any, bool]:
+        """Data of a chunk and whether it came from the store.
+
+        Runs on a worker, counts are updated by _add_chunk on the game thread.
+        """
+        if self.store is not None:
+            stored = self.store.get(coord)
+            if stored is not None:
+                return self._decode_chunk(coord, stored), True
+        return self._generate_chunk(coord), False
+
+    def _build_chunk(self, coord: tuple[int, int], data: typing.Any) -> T:
+        """Chunk made from generated data, on the game thread."""
+        return self._load_chunk(coord)
 
     def _load_chunk(self, coord: tuple[int, int]) -> T:
         raise NotImplementedError
 
     def _unload_chunk(self, chunk: T) -> None:
-        pass
+        """Called when a chunk is unloaded, it may be attached again later."""
+
+    def _evict_chunk(self, chunk: T) -> None:
+        """Called when an unloaded chunk is dropped from the cache."""
+
+    @staticmethod
+    def _split_baked(chunk: T) -> tuple[list[SubSystemObject], list[GraphicalObject]]:
+        """Objects of chunk drawn by viewports and those baked in its cache."""
+        cache = chunk.render_cache
+        if cache is None or not cache.objects:
+            return chunk.objects, []
+        baked = set(cache.objects)
+        return [obj for obj in chunk.objects if obj not in baked], cache.objects
+
+    def _attach_chunk(self, chunk: T) -> T:
+        drawn, baked = self._split_baked(chunk)
+        self._system.add_all(*drawn)
+        if baked:
+            self._system.add_all(*baked, exclude=(ViewPort,))
+        self._loaded_chunks[chunk.coord] = chunk
+        return chunk
+
+    def _add_chunk(self, coord: tuple[int, int], result: tuple[typing.Any, bool]) -> T:
+        data, restored = result
+        if restored:
+            self.counts["restored"] += 1
+        chunk = self._build_chunk(coord, data)
+        if self._render_cache:
+            chunk.render_cache = ChunkRenderCache(chunk, budget=self.render_budget)
+            chunk.objects.append(chunk.render_cache)
+        self.counts["built"] += 1
+        return self._attach_chunk(chunk)
+
+    def _take_cached(self, coord: tuple[int, int]) -> T | None:
+        chunk = self._cached_chunks.pop(coord, None)
+        if chunk is not None:
+            self._cached_objects -= len(chunk.objects)
+            self.counts["reattached"] += 1
+        return chunk
+
+    def _cache_chunk(self, chunk: T) -> None:
+        self._cached_chunks[chunk.coord] = chunk
+        self._cached_objects += len(chunk.objects)
+        self._trim_cache()
+
+    def _trim_cache(self) -> None:
+        """Evicts the least recently unloaded unpinned chunks over the limits."""
+        cache_objects = self.cache_objects
+        while len(self._cached_chunks) > self.cache_size or (
+            cache_objects is not None and self._cached_objects > cache_objects
+        ):
+            coord = next(
+                (c for c in self._cached_chunks if c not in self._pinned), None
+            )
+            if coord is None:
+                break
+            evicted = self._cached_chunks.pop(coord)
+            self._cached_objects -= len(evicted.objects)
+            self._drop_chunk(evicted)
+            self.counts["evicted"] += 1
+
+    def _drop_chunk(self, chunk: T) -> None:
+        self.save_chunk(chunk)
+        self._evict_chunk(chunk)
+
+    def clear_cache(self) -> None:
+        """Drops every unloaded chunk."""
+        for chunk in self._cached_chunks.values():
+            self._drop_chunk(chunk)
+        self._cached_chunks.clear()
+        self._cached_objects = 0
+
+    def save_chunk(self, chunk: T) -> None:
+        """Queues a dirty chunk for the store.
+
+        Chunks are saved, encoded by _encode_chunk, when they are unloaded or
+        dropped from the cache, and chunks found in the store are decoded by
+        _decode_chunk instead of being generated.
+        """
+        if self.store is not None and chunk.dirty:
+            self.store.put(chunk.coord, self._encode_chunk(chunk))
+            chunk.dirty = False
+            self.counts["saved"] += 1
+
+    def save_all(self) -> None:
+        """Queues every dirty loaded or cached chunk for the store."""
+        for chunks in (self._loaded_chunks, self._cached_chunks):
+            for chunk in chunks.values():
+                self.save_chunk(chunk)
 
     def load_chunk(self, coord: tuple[int, int]) -> T:
+        """Loads a chunk right away, using its pending generation if running."""
         logger.info(f"Loading chunk {coord}")
-        chunk = self._load_chunk(coord)
-        self._system.add_all(*chunk.objects)
-        self._loaded_chunks[coord] = chunk
-        return chunk
+        cached = self._take_cached(coord)
+        if cached is not None:
+            return self._attach_chunk(cached)
+        future = self._pending.pop(coord, None)
+        if future is None or future.cancel():
+            result = self._chunk_data(coord)
+        else:
+            result = future.result()
+        return self._add_chunk(coord, result)
+
+    def request_chunk(self, coord: tuple[int, int]) -> None:
+        """Starts generating a chunk on a worker, loads it without workers."""
+        if coord in self._loaded_chunks or coord in self._pending:
+            return
+        self.counts["requested"] += 1
+        if self._executor is None or coord in self._cached_chunks:
+            self.load_chunk(coord)
+            return
+        logger.info(f"Requesting chunk {coord}")
+        self._pending[coord] = self._executor.submit(self._chunk_data, coord)
+
+    def cancel_chunk(self, coord: tuple[int, int]) -> None:
+        """Forgets a pending chunk, its generation result is thrown away."""
+        future = self._pending.pop(coord, None)
+        if future is not None:
+            future.cancel()
+            self.counts["cancelled"] += 1
+
+    def integrate_pending(self, budget: float | None = None) -> int:
+        """Adds generated chunks to the system manager, returns their count.
+
+        With workers, _generate_chunk runs on a thread pool and the chunks it
+        finished are built by _build_chunk here, on the game thread. Without
+        workers chunks load as soon as they are requested. Managers
+        overriding only _load_chunk do all the work in _build_chunk.
+
+        Stops once budget seconds, integration_budget by default, are spent.
+        At least one generated chunk is added per call, so the budget only
+        spreads chunks over frames. Chunks are added in request order.
+        """
+        if not self._pending:
+            return 0
+        if budget is None:
+            budget = self.integration_budget
+        deadline = time.perf_counter() + budget
+        integrated = 0
+        for coord, future in list(self._pending.items()):
+            if not future.done():
+                continue
+            del self._pending[coord]
+            logger.info(f"Loading chunk {coord}")
+            self._add_chunk(coord, future.result())
+            integrated += 1
+            if time.perf_counter() >= deadline:
+                break
+        return integrated
+
+    def finish_pending(self) -> None:
+        """Waits for every pending chunk and adds them all."""
+        for coord in list(self._pending):
+            self.load_chunk(coord)
 
     def unload_chunk(self, coord: tuple[int, int]) -> T | None:
         logger.info(f"Unloading chunk {coord}")
+        self.cancel_chunk(coord)
         chunk = self._loaded_chunks.pop(coord, None)
         if chunk is not None:
             self._unload_chunk(chunk)
-            self._system.remove_all(*chunk.objects)
+            drawn, baked = self._split_baked(chunk)
+            self._system.remove_all(*drawn)
+            if baked:
+                self._system.remove_all(*baked, exclude=(ViewPort,))
+            if chunk.render_cache is not None:
+                chunk.render_cache.release()
+            self.counts["unloaded"] += 1
+            self.save_chunk(chunk)
+            if self.cache_size > 0 or coord in self._pinned:
+                self._cache_chunk(chunk)
+            else:
+                self._evict_chunk(chunk)
         return chunk
 
-    def update(self, player_position: tuple[float, float]) -> None:
-        player_chunk = self.get_chunk_coord(player_position)
-        required = self.get_required_chunks(player_chunk)
-        currently_loaded = set(self._loaded_chunks.keys())
-        chunks_to_unload = currently_loaded - required
-        chunks_to_load = required - currently_loaded
-        for coord in chunks_to_unload:
+    def _find_chunk(self, position: tuple[float, float]) -> T | None:
+        coord = self.get_chunk_coord(position)
+        chunk = self._loaded_chunks.get(coord)
+        return self._cached_chunks.get(coord) if chunk is None else chunk
+
+    def mark_changed(self, position: tuple[float, float]) -> None:
+        """Marks the chunk containing position as changed."""
+        chunk = self._find_chunk(position)
+        if chunk is not None:
+            chunk.changed()
+
+    def mark_dirty(self, position: tuple[float, float]) -> None:
+        """Marks the chunk containing position as needing to be saved."""
+        chunk = self._find_chunk(position)
+        if chunk is not None:
+            chunk.dirty = True
+
+    def pin(self, position: tuple[float, float]) -> None:
+        """Keeps the chunk containing position from being evicted.
+
+        For chunks whose objects are referenced from outside: they are
+        unloaded as usual but always attached again as the same objects.
+        Pins are counted, the chunk is released once unpin is called as
+        many times.
+        """
+        self._pinned[self.get_chunk_coord(position)] += 1
+
+    def unpin(self, position: tuple[float, float]) -> None:
+        """Releases a pin, the chunk may be evicted again."""
+        coord = self.get_chunk_coord(position)
+        self._pinned[coord] -= 1
+        if self._pinned[coord] <= 0:
+            del self._pinned[coord]
+            self._trim_cache()
+
+    def request_chunks(
+        self, required: typing.Iterable[tuple[int, int]], center: tuple[int, int]
+    ) -> None:
+        """Requests chunks not loaded yet, nearest to center first."""
+        missing = [coord for coord in required if coord not in self._loaded_chunks]
+        missing.sort(key=lambda c: (c[0] - center[0]) ** 2 + (c[1] - center[1]) ** 2)
+        for coord in missing:
+            self.request_chunk(coord)
+
+    def _area(self, position: tuple[float, float], rect: Bounds | None) -> ChunkArea:
+        if rect is None:
+            x, y = self.get_chunk_coord(position)
+            return x, y, x, y
+        return self.get_chunk_area(rect)
+
+    def _load_rings(self, rings: int | None, rect: Bounds | None) -> int:
+        if rings is not None:
+            return rings
+        return self.load_rings if rect is None else self.view_rings
+
+    def get_prefetch_chunks(
+        self,
+        position: tuple[float, float],
+        velocity: tuple[float, float],
+        rings: int | None = None,
+        rect: Bounds | None = None,
+    ) -> list[tuple[int, int]]:
+        """Chunks around the path ahead of position, nearest first.
+
+        The path is sampled every half chunk for lookahead seconds and the
+        chunks within prefetch_rings (or rings) of the samples are returned,
+        leaving out those within rings of position. With a rect, the rect is
+        moved along the path instead of position. At most max_prefetch chunks
+        are returned, update keeps them while they stay on the path.
+        """
+        vx, vy = velocity
+        if self.lookahead <= 0 or not (vx or vy):
+            return []
+        load_rings = self._load_rings(rings, rect)
+        prefetch_rings = self.prefetch_rings
+        if prefetch_rings is None:
+            prefetch_rings = load_rings
+        center = self.get_chunk_coord(position)
+        area = self._area(position, rect)
+        dx, dy = vx * self.lookahead, vy * self.lookahead
+        samples = max(1, math.ceil(math.hypot(dx, dy) / (self._chunk_size / 2)))
+        x, y = position
+        found: set[tuple[int, int]] = set()
+        for i in range(1, samples + 1):
+            ox, oy = dx * i / samples, dy * i / samples
+            if rect is None:
+                sample = self._area((x + ox, y + oy), None)
+            else:
+                minx, miny, maxx, maxy = rect
+                sample = self.get_chunk_area(
+                    (minx + ox, miny + oy, maxx + ox, maxy + oy)
+                )
+            found.update(self.get_area_chunks(sample, prefetch_rings))
+        distance = self.area_distance
+        ahead = [c for c in found if distance(area, c) > load_rings]
+        ahead.sort(key=lambda c: (c[0] - center[0]) ** 2 + (c[1] - center[1]) ** 2)
+        return ahead[: self.max_prefetch]
+
+    def update(
+        self,
+        position: tuple[float, float],
+        rings: int | None = None,
+        velocity: tuple[float, float] | None = None,
+        rect: Bounds | None = None,
+    ) -> None:
+        """Loads chunks within rings, load_rings by default, of position.
+
+        Chunks farther than unload_rings, or rings if that is more, are
+        unloaded and their pending generation is cancelled, unless they are
+        prefetched for velocity. Prefetches are requested after the chunks
+        needed now, without workers only one is loaded per call.
+
+        With a world rect, rings (view_rings by default) are counted around
+        the chunks overlapping it, and chunks are unloaded past as many more
+        rings as unload_rings adds to load_rings.
+        """
+        center = self.get_chunk_coord(position)
+        area = self._area(position, rect)
+        load_rings = self._load_rings(rings, rect)
+        if rect is None:
+            unload_rings = max(load_rings, self.unload_rings)
+        else:
+            unload_rings = load_rings + max(0, self.unload_rings - self.load_rings)
+        prefetch = (
+            self.get_prefetch_chunks(position, velocity, load_rings, rect)
+            if velocity is not None
+            else []
+        )
+        keep = set(prefetch)
+        distance = self.area_distance
+        for coord in [
+            c
+            for c in self._pending
+            if distance(area, c) > unload_rings and c not in keep
+        ]:
+            self.cancel_chunk(coord)
+        for coord in [
+            c
+            for c in self._loaded_chunks
+            if distance(area, c) > unload_rings and c not in keep
+        ]:
             self.unload_chunk(coord)
-        for coord in chunks_to_load:
-            self.load_chunk(coord)
+        self.request_chunks(self.get_area_chunks(area, load_rings), center)
+        for coord in prefetch:
+            if coord not in self._loaded_chunks and coord not in self._pending:
+                self.counts["prefetched"] += 1
+                self.request_chunk(coord)
+                if self._executor is None:
+                    break
+        self.integrate_pending()
 
-    def clear(self) -> None:
+    def update_view(
+        self, viewport: ViewPort, velocity: tuple[float, float] | None = None
+    ) -> None:
+        """Loads the chunks seen by viewport, coarse ones when zoomed out.
+
+        The viewport's rect is loaded with view_rings around it. Below
+        coarse_zoom the detailed chunks are unloaded and the coarse manager,
+        working with bigger chunks of cheaper objects, is updated instead.
+        Above it the coarse chunks are unloaded.
+        """
+        center = viewport.center
+        rect = viewport.world_rect
+        coarse = self.coarse
+        if coarse is not None and viewport.zoom < self.coarse_zoom:
+            self.unload_all()
+            coarse.update(center, velocity=velocity, rect=rect)
+            return
+        if coarse is not None:
+            coarse.unload_all()
+        self.update(center, velocity=velocity, rect=rect)
+
+    def unload_all(self) -> None:
+        """Unloads every chunk, keeping them in the cache."""
+        for coord in list(self._pending):
+            self.cancel_chunk(coord)
         for coord in list(self._loaded_chunks.keys()):
             self.unload_chunk(coord)
+
+    def clear(self) -> None:
+        """Unloads every chunk and empties the cache."""
+        self.unload_all()
+        self.clear_cache()
+        if self.coarse is not None:
+            self.coarse.clear()
+
+    def shutdown(self) -> None:
+        """Unloads everything, stops the workers and closes the store."""
+        self.clear()
+        if self.coarse is not None:
+            self.coarse.shutdown()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self.store is not None:
+            self.store.close()
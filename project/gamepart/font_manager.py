@@ -1,11 +1,173 @@
 import ctypes
+import typing
 from functools import lru_cache
 
+import sdl2
+import sdl2.ext
 from sdl2 import sdlttf
 from sdl2.ext import FontManager
 
+from gamepart.render import GfxRenderer
+
+_GLYPH_COLOR = sdl2.SDL_Color(255, 255, 255, 255)
+
+# texture, uv corners, x offset, width, height, advance
+_Glyph = tuple[typing.Any, tuple[float, ...], int, int, int, int]
+
+
+class GlyphAtlas:
+    """Glyphs of one font size rasterized once into shared texture pages.
+
+    Glyphs are rendered white and tinted by vertex colors. Text is laid out
+    from cached advances and kerning and drawn as textured quads through the
+    renderer's geometry batch, one SDL_RenderGeometry call per page.
+    """
+
+    def __init__(
+        self, renderer: GfxRenderer, font: typing.Any, page_size: int = 256
+    ) -> None:
+        self.renderer = renderer
+        self.font = font
+        self.page_size = page_size
+        self.pages: list[typing.Any] = []
+        self.glyphs: dict[str, _Glyph] = {}
+        self.line_height: int = sdlttf.TTF_FontHeight(font)
+        self.line_skip: int = sdlttf.TTF_FontLineSkip(font)
+        self.kerning = bool(sdlttf.TTF_GetFontKerning(font))
+        self._kerning: dict[tuple[str, str], int] = {}
+        self._page_side = 0
+        self._x = 0
+        self._y = 0
+        self._row_height = 0
+
+    def close(self) -> None:
+        """Destroys the atlas textures."""
+        for texture in self.pages:
+            sdl2.SDL_DestroyTexture(texture)
+        self.pages.clear()
+        self.glyphs.clear()
+
+    def glyph(self, char: str) -> _Glyph:
+        glyph = self.glyphs.get(char)
+        if glyph is None:
+            glyph = self.glyphs[char] = self._rasterize(char)
+        return glyph
+
+    def kerning_between(self, prev: str, char: str) -> int:
+        key = (prev, char)
+        kerning = self._kerning.get(key)
+        if kerning is None:
+            kerning = self._kerning[key] = sdlttf.TTF_GetFontKerningSizeGlyphs32(
+                self.font, ord(prev), ord(char)
+            )
+        return kerning
+
+    def _new_page(self, side: int) -> None:
+        texture = sdl2.SDL_CreateTexture(
+            self.renderer.sdlrenderer,
+            sdl2.SDL_PIXELFORMAT_ARGB8888,
+            sdl2.SDL_TEXTUREACCESS_STATIC,
+            side,
+            side,
+        )
+        if not texture:
+            raise sdl2.ext.SDLError()
+        sdl2.SDL_SetTextureBlendMode(texture, sdl2.SDL_BLENDMODE_BLEND)
+        blank = (ctypes.c_uint32 * (side * side))()
+        rect = sdl2.SDL_Rect(0, 0, side, side)
+        sdl2.SDL_UpdateTexture(texture, rect, ctypes.addressof(blank), side * 4)
+        self.pages.append(texture)
+        self._page_side = side
+        self._x = self._y = self._row_height = 0
+
+    def _place(self, w: int, h: int) -> tuple[typing.Any, int, int]:
+        if self.pages and self._x + w > self._page_side:
+            self._x = 0
+            self._y += self._row_height
+            self._row_height = 0
+        if not self.pages or self._y + h > self._page_side or w > self._page_side:
+            self._new_page(max(self.page_size, w, h))
+        x, y = self._x, self._y
+        self._x += w
+        self._row_height = max(self._row_height, h)
+        return self.pages[-1], x, y
+
+    def _rasterize(self, char: str) -> _Glyph:
+        code = ord(char)
+        minx = ctypes.c_int(0)
+        advance = ctypes.c_int(0)
+        sdlttf.TTF_GlyphMetrics32(
+            self.font, code, ctypes.byref(minx), None, None, None, ctypes.byref(advance)
+        )
+        offset = min(0, minx.value)  # glyph surfaces start at negative bearings
+        surface = sdlttf.TTF_RenderGlyph32_Blended(self.font, code, _GLYPH_COLOR)
+        if not surface:
+            return None, (), offset, 0, 0, advance.value
+        converted = sdl2.SDL_ConvertSurfaceFormat(
+            surface, sdl2.SDL_PIXELFORMAT_ARGB8888, 0
+        )
+        sdl2.SDL_FreeSurface(surface)
+        if not converted:
+            raise sdl2.ext.SDLError()
+        sf = converted.contents
+        w, h = sf.w, sf.h
+        texture, x, y = self._place(w, h)
+        rect = sdl2.SDL_Rect(x, y, w, h)
+        sdl2.SDL_UpdateTexture(texture, rect, sf.pixels, sf.pitch)
+        sdl2.SDL_FreeSurface(converted)
+        side = self._page_side
+        u1, v1, u2, v2 = x / side, y / side, (x + w) / side, (y + h) / side
+        uv = (u1, v1, u2, v1, u2, v2, u1, v2)
+        return texture, uv, offset, w, h, advance.value
+
+    def measure(self, text: str) -> tuple[int, int]:
+        """Size of text in pixels."""
+        if not text:
+            return 0, 0
+        width = 0
+        lines = text.split("\n")
+        for line in lines:
+            pen = 0
+            prev = None
+            for char in line:
+                if prev is not None and self.kerning:
+                    pen += self.kerning_between(prev, char)
+                pen += self.glyph(char)[5]
+                prev = char
+            width = max(width, pen)
+        return width, self.line_skip * (len(lines) - 1) + self.line_height
+
+    def draw(self, text: str, x: int, y: int, color: typing.Any) -> None:
+        """Draws text with its top-left corner at (x, y)."""
+        renderer = self.renderer
+        if not renderer.batching:
+            with renderer.batched():
+                self.draw(text, x, y, color)
+            return
+        clr = sdl2.ext.convert_to_color(color)
+        pen_y = y
+        for line in text.split("\n"):
+            pen_x = x
+            prev = None
+            for char in line:
+                texture, uv, offset, w, h, advance = self.glyph(char)
+                if prev is not None and self.kerning:
+                    pen_x += self.kerning_between(prev, char)
+                if w:
+                    gx, gy = pen_x + offset, pen_y
+                    renderer.get_geometry(texture).add_quad(
+                        (gx, gy, gx + w, gy, gx + w, gy + h, gx, gy + h), clr, uv
+                    )
+                pen_x += advance
+                prev = char
+            pen_y += self.line_skip
+
 
 class AdvancedFontManager(FontManager):
+    def __init__(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.atlases: dict[tuple[str, int], GlyphAtlas] = {}
+
     @lru_cache(maxsize=100)
     def get_text_size(self, font: str, size: int, text: str) -> tuple[int, int]:
         if not text:
@@ -21,3 +183,23 @@ class AdvancedFontManager(FontManager):
     @lru_cache(maxsize=100)
     def get_line_height(self, font: str, size: int) -> int:
         return sdlttf.TTF_FontLineSkip(self.fonts[font][size])
+
+    def get_atlas(
+        self, renderer: GfxRenderer, alias: str | None = None, size: int | None = None
+    ) -> GlyphAtlas:
+        """Glyph atlas of a font size, created on first use."""
+        alias = alias or self.default_font
+        size = size or self.size
+        atlas = self.atlases.get((alias, size))
+        if atlas is None:
+            if size not in self.fonts[alias]:
+                self._change_font_size(alias, size)  # type: ignore[attr-defined]
+            atlas = GlyphAtlas(renderer, self.fonts[alias][size])
+            self.atlases[(alias, size)] = atlas
+        return atlas
+
+    def close_atlases(self) -> None:
+        """Destroys the textures of every glyph atlas."""
+        for atlas in self.atlases.values():
+            atlas.close()
+        self.atlases.clear()
@@ -4,18 +4,22 @@ import logging
 import sys
 import time
 import typing
+from array import array
 
 import sdl2
 import sdl2.ext
 
 from .context import Context
 from .font_manager import AdvancedFontManager
-from .render import GfxRenderer
+from .render import GfxRenderer, SpriteCache
 from .time import FPSCounter, TimeFeeder
 from .utils import format_event, get_mouse_state
 
 logger = logging.getLogger(__name__)
 
+# Events after which render targets have to be drawn again
+_TARGETS_LOST = (sdl2.SDL_RENDER_TARGETS_RESET, sdl2.SDL_RENDER_DEVICE_RESET)
+
 
 class FPSDisplayConfig:
     display: bool = False
@@ -25,6 +29,13 @@ class FPSDisplayConfig:
     width: int = 500
     position: tuple[int, int] = (0, 0)
     font: str | None = None
+    use_atlas: bool = False  # draw with a GlyphAtlas instead of a texture per frame
+    refresh_rate: float = 4.0  # summary updates per second, 0 updates every frame
+    graph: bool = False  # frame time graph below the summary
+    graph_height: int = 40
+    graph_scale: float = 1 / 30  # frame time at the top of the graph
+    graph_color: tuple[int, int, int, int] = (50, 200, 50, 255)
+    graph_target_color: tuple[int, int, int, int] = (200, 50, 50, 255)
 
 
 class Game:
@@ -42,12 +53,17 @@ class Game:
         self.height: int = self.config["height"]
         self.max_fps: float = self.config["max_fps"]
         self.fps_display_config.display = self.config["show_fps"]
+        self.fps_display_config.refresh_rate = self.config["fps_refresh_rate"]
+        self.fps_display_config.graph = self.config["show_fps_graph"]
         self.caption: str = self.config["caption"]
         self.fullscreen: bool = self.config["fullscreen"]
         self.hidden: bool = self.config["hidden"]
         self.time_step: float = self.config["time_step"]
         self.time_speed: float = self.config["time_speed"]
         self.time_max_iter: int = self.config["time_max_iter"]
+        self.batch_geometry: bool = self.config["batch_geometry"]
+        self.sprite_cache_budget: int = self.config["sprite_cache_budget"]
+        self.sprite_cache_antialias: bool = self.config["sprite_cache_antialias"]
 
         self.window: sdl2.ext.Window
         self.renderer: GfxRenderer
@@ -62,6 +78,10 @@ class Game:
         self.init_heavy()
 
         self.fps_counter: FPSCounter = FPSCounter()
+        self.fps_summary: str = ""
+        self.fps_texture: sdl2.ext.TextureSprite | None = None
+        self.fps_refresh_at: float = 0.0
+        self.fps_graph_coords: array = array("f")
         self.feeder: TimeFeeder = TimeFeeder(self.time_step, self.time_speed)
         self.key_state: dict[int, bool] = sdl2.SDL_GetKeyboardState(None)
         self.mouse_state: tuple[int, int, int] = get_mouse_state()
@@ -102,6 +122,13 @@ class Game:
         self.renderer = GfxRenderer(self.window)
         self.renderer.blendmode = sdl2.SDL_BLENDMODE_BLEND
         self.renderer.clip = (0, 0, self.width, self.height)
+        self.renderer.batching = self.batch_geometry
+        if self.sprite_cache_budget > 0:
+            self.renderer.sprite_cache = SpriteCache(
+                self.renderer,
+                budget=self.sprite_cache_budget,
+                antialias=self.sprite_cache_antialias,
+            )
 
     def init_sprite_factory(self) -> None:
         self.logger.debug("Initializing sprite factory")
@@ -134,30 +161,82 @@ class Game:
         self.renderer.present()
 
     def display_fps(self) -> None:
-        summary = self.fps_counter.get_fps_summary()
-        logger.debug("FPS:\n%s", summary)
+        config = self.fps_display_config
+        now = time.monotonic()
+        if now >= self.fps_refresh_at:
+            rate = config.refresh_rate
+            self.fps_refresh_at = now + (1.0 / rate if rate > 0 else 0.0)
+            self.refresh_fps()
         if (
             self.font_manager is None
             or self.sprite_factory is None
             or self.renderer is None
         ):
             return
+        x, y = config.position
+        if config.use_atlas:
+            w, h = self.display_fps_from_atlas(self.fps_summary)
+        elif self.fps_texture is not None:
+            w, h = self.fps_texture.size
+            self.renderer.copy(self.fps_texture, None, (x, y, w, h))
+        else:
+            return
+        if config.graph:
+            self.display_fps_graph(x, y + h, w)
+
+    def refresh_fps(self) -> None:
+        """Updates the summary shown by display_fps."""
+        self.fps_summary = self.fps_counter.get_fps_summary()
+        logger.debug("FPS:\n%s", self.fps_summary)
+        config = self.fps_display_config
+        if config.use_atlas or self.font_manager is None or self.sprite_factory is None:
+            return
         text = self.font_manager.render(
-            text=summary,
-            alias=self.fps_display_config.font,
-            size=self.fps_display_config.size,
-            color=self.fps_display_config.color,
-            bg_color=self.fps_display_config.bg_color,
-            width=self.fps_display_config.width,
+            text=self.fps_summary,
+            alias=config.font,
+            size=config.size,
+            color=config.color,
+            bg_color=config.bg_color,
+            width=config.width,
         )
-        pos = (
-            self.fps_display_config.position[0],
-            self.fps_display_config.position[1],
-            text.w,
-            text.h,
-        )
-        text = self.sprite_factory.from_surface(text, True)
-        self.renderer.copy(text, None, pos)
+        self.fps_texture = self.sprite_factory.from_surface(text, True)
+
+    def display_fps_from_atlas(self, summary: str) -> tuple[int, int]:
+        config = self.fps_display_config
+        atlas = self.font_manager.get_atlas(self.renderer, config.font, config.size)
+        x, y = config.position
+        w, h = atlas.measure(summary)
+        self.renderer.box([(x, y, x + w - 1, y + h - 1)], config.bg_color)
+        atlas.draw(summary, x, y, config.color)
+        return w, h
+
+    def display_fps_graph(self, x: int, y: int, width: int) -> None:
+        """Draws the recent frame times as one polyline, newest on the right."""
+        config = self.fps_display_config
+        times = self.fps_counter.frame_times
+        count = len(times)
+        if count < 2 or width <= 0:
+            return
+        coords = self.fps_graph_coords
+        if len(coords) != 2 * count:
+            coords = self.fps_graph_coords = array("f", bytes(8 * count))
+        height = config.graph_height
+        bottom = y + height
+        scale = height / config.graph_scale
+        step = width / (count - 1)
+        start = self.fps_counter.frame_index
+        for i in range(count):
+            coords[2 * i] = x + i * step
+            coords[2 * i + 1] = bottom - min(times[(start + i) % count] * scale, height)
+        renderer = self.renderer
+        with renderer.batched():
+            renderer.box([(x, y, x + width - 1, bottom)], config.bg_color)
+            if self.max_fps > 0 and 1.0 / self.max_fps < config.graph_scale:
+                target = round(bottom - scale / self.max_fps)
+                renderer.line(
+                    [(x, target, x + width - 1, target)], config.graph_target_color
+                )
+            renderer.polyline([(coords, 1)], config.graph_color)
 
     def frame(self) -> None:
         self.mouse_state = get_mouse_state()
@@ -167,6 +246,8 @@ class Game:
         for event in sdl2.ext.get_events():
             if logger.isEnabledFor(logging.DEBUG):
                 logger.debug("Event %s", format_event(event))
+            if event.type in _TARGETS_LOST and self.renderer is not None:
+                self.renderer.reset_targets()
             self.active_scene.event(event)
         self.tick()
         self.active_scene.frame()
@@ -209,8 +290,28 @@ class Game:
         logger.debug("Stopping")
         for scene in self.scenes.values():
             scene.uninit()
+        self.release_sdl_objects()
         sdl2.ext.quit()
 
+    def release_sdl_objects(self) -> None:
+        """Destroys SDL objects owned by the game while SDL is still running.
+
+        Wrappers collected after SDL_Quit would destroy stale pointers, which
+        may by then belong to objects created by a later SDL session.
+        """
+        self.fps_texture = None
+        font_manager = getattr(self, "font_manager", None)
+        if font_manager is not None:
+            font_manager.close_atlases()
+        renderer = getattr(self, "renderer", None)
+        if renderer is not None:
+            if renderer.sprite_cache is not None:
+                renderer.sprite_cache.clear()
+            renderer.destroy()
+        window = getattr(self, "window", None)
+        if window is not None:
+            window.close()
+
     def main_loop(self) -> None:
         self.running = True
         while self.running:
@@ -235,11 +336,16 @@ class Game:
             "caption": self.__class__.__name__,
             "max_fps": 128,
             "show_fps": False,
+            "fps_refresh_rate": 4.0,  # Hz, 0 refreshes every frame
+            "show_fps_graph": False,
             "fullscreen": False,
             "hidden": False,
             "time_step": 1 / 128,
             "time_speed": 1.0,
             "time_max_iter": 8,
+            "batch_geometry": True,
+            "sprite_cache_budget": 16 * 2**20,  # bytes, 0 disables
+            "sprite_cache_antialias": False,
         }
 
     def get_initial_context(self) -> Context:
@@ -25,6 +25,7 @@ class Paragraph(Text):
         background_color: tuple[int, int, int, int] | None = None,
         max_width: int | None = None,
         line_spacing: int = 2,
+        use_atlas: bool = False,
     ) -> None:
         super().__init__(
             x=x,
@@ -38,6 +39,7 @@ class Paragraph(Text):
             color=color,
             background_color=background_color,
             max_width=max_width,
+            use_atlas=use_atlas,
         )
         self.line_spacing: int = line_spacing
         self._text_cache: dict[str, Text] = {}
@@ -50,6 +52,7 @@ class Paragraph(Text):
         "max_width",
         "background_color",
         "line_spacing",
+        "use_atlas",
     )
     def get_texts(self) -> list[tuple[int, Text]]:
         texts = []
@@ -64,6 +67,7 @@ class Paragraph(Text):
             text.color = self.color
             text.background_color = self.background_color
             text.max_width = self.max_width
+            text.use_atlas = self.use_atlas
             text.fit_to_text()
             texts.append((py, text))
             py += text.height + self.line_spacing
@@ -102,6 +106,7 @@ class ScrollableParagraph(Paragraph):
         scroll_speed: int = 20,
         smooth_scroll_factor: float = 0.2,
         valign: Literal["top", "bottom"] = "top",
+        use_atlas: bool = False,
     ) -> None:
         super().__init__(
             x=x,
@@ -116,6 +121,7 @@ class ScrollableParagraph(Paragraph):
             background_color=background_color,
             max_width=max_width,
             line_spacing=line_spacing,
+            use_atlas=use_atlas,
         )
         self.scroll_speed: int = scroll_speed
         self.smooth_scroll_factor: float = smooth_scroll_factor
@@ -51,7 +51,7 @@ class GUISystem(SubSystem["GUIObject"]):
         x, y = self._update_mouse_position(event)
         result = None
         handled_by = None
-        for obj in self.objects:
+        for obj in list(self.objects):  # handlers may add or remove objects
             if obj.enabled and handled_by is None:
                 if result := obj.event(event):
                     handled_by = obj.event
@@ -4,6 +4,7 @@ import logging
 
 import sdl2.ext
 
+from gamepart.font_manager import GlyphAtlas
 from gamepart.utils import cached_depends_on
 
 from .guiobject import GUIObject
@@ -27,6 +28,7 @@ class Text(Image):
         color: tuple[int, int, int, int] = (0, 0, 0, 255),
         background_color: tuple[int, int, int, int] | None = None,
         max_width: int | None = None,
+        use_atlas: bool = False,
     ) -> None:
         super().__init__(x=x, y=y, width=width, height=height, parent=parent)
         self.text: str = text
@@ -35,6 +37,9 @@ class Text(Image):
         self.color: tuple[int, int, int, int] = color
         self.background_color: tuple[int, int, int, int] | None = background_color
         self.max_width: int | None = max_width
+        # Draw from a shared glyph atlas instead of a texture per string,
+        # only without max_width as the atlas does not wrap lines.
+        self.use_atlas: bool = use_atlas
 
     @cached_depends_on(
         "text", "font", "font_size", "color", "max_width", "background_color"
@@ -53,15 +58,43 @@ class Text(Image):
             return manager.sprite_factory.from_surface(surface, free=True)
         return None
 
+    def draws_from_atlas(self) -> bool:
+        return self.use_atlas and self.max_width is None
+
+    def get_atlas(self) -> GlyphAtlas:
+        return self.gui_system.font_manager.get_atlas(
+            self.gui_system.renderer, self.font, self.font_size
+        )
+
     def draw(self) -> None:
+        if self.draws_from_atlas():
+            self.draw_from_atlas()
+            return
         self.sprite = self.get_rendered_text(self.gui_system)
         super().draw()
 
+    def draw_from_atlas(self) -> None:
+        if not self.text:
+            return
+        x, y = self.get_absolute_position()
+        atlas = self.get_atlas()
+        if self.background_color is not None:
+            w, h = atlas.measure(self.text)
+            self.gui_system.renderer.box(
+                [(x, y, x + w - 1, y + h - 1)], self.background_color
+            )
+        atlas.draw(self.text, x, y, self.color)
+
     @cached_depends_on("font", "font_size")
     def get_line_height(self) -> int:
         return self.gui_system.font_manager.get_line_height(self.font, self.font_size)
 
     def fit_to_text(self) -> None:
+        if self.draws_from_atlas():
+            width, height = self.get_atlas().measure(self.text)
+            self.width = width
+            self.height = max(height, self.get_line_height())
+            return
         sprite = self.get_rendered_text(self.gui_system)
         self.width = 0 if sprite is None else sprite.size[0]
         if self.max_width is None or sprite is None:
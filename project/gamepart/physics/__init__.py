@@ -5,6 +5,7 @@ from .physicalobject import (  # noqa: F401
     PhysicalObject,
     SimplePhysicalObject,
 )
+from .pool import PhysicsPool  # noqa: F401
 from .utils import make_body, pymunk, typed_property, update_shape  # noqa: F401
 from .vector import Vector  # noqa: F401
-from .world import World  # noqa: F401
+from .world import World, WorldSnapshot  # noqa: F401
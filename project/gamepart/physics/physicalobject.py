@@ -6,6 +6,12 @@ from gamepart.subsystem import SubSystemObject
 
 from .category import Category, cat_none
 
+if typing.TYPE_CHECKING:
+    from .pool import PhysicsPool
+    from .world import World
+
+Transform = tuple[tuple[float, float], float]  # position, angle
+
 
 class PhysicalObject(SubSystemObject):
     def __init__(
@@ -18,6 +24,9 @@ class PhysicalObject(SubSystemObject):
         self.body: pymunk.Body | None = body
         self.shapes = list(shapes)
         self.category = category
+        self.previous_transform: Transform | None = None  # see World.update_transforms
+        self.teleported = False  # moved outside of a step, not interpolated once
+        self.world: World | None = None  # set while in a World
 
     @property
     def position(self) -> tuple[float, float]:
@@ -30,6 +39,27 @@ class PhysicalObject(SubSystemObject):
         if self.body is None:
             raise ValueError("Cannot set position: body is None")
         self.body.position = value
+        self.previous_transform = None  # teleported, do not interpolate
+        self.teleported = True
+        if self.world is not None:
+            self.world.mark_teleported(self)
+
+    def apply_impulse(
+        self,
+        impulse: tuple[float, float],
+        point: tuple[float, float] = (0, 0),
+    ) -> None:
+        """Applies an impulse at a point local to the body and wakes it.
+
+        In a World, aware objects are ticked again from the next step.
+        """
+        if self.body is None:
+            raise ValueError("Cannot apply impulse: body is None")
+        self.body.apply_impulse_at_local_point(impulse, point)
+        if self.world is not None:
+            self.world.wake(self)
+        elif self.body.space is not None:
+            self.body.activate()
 
     @property
     def bodies(self) -> typing.Iterable[pymunk.Body]:
@@ -37,6 +67,13 @@ class PhysicalObject(SubSystemObject):
 
 
 class CollisionObject(PhysicalObject):
+    """Object told about everything touching it.
+
+    World calls collide from the pre_solve phase of a collision handler for
+    the object's category, during the step and before AwareObject.tick.
+    Use World.on_collision to only hear about specific categories.
+    """
+
     def collide(self, arbiter: pymunk.Arbiter, other: "PhysicalObject") -> bool:
         raise NotImplementedError()
 
@@ -50,6 +87,8 @@ T = typing.TypeVar("T", bound=pymunk.Shape)
 
 
 class SimplePhysicalObject(PhysicalObject, typing.Generic[T]):
+    pool: "PhysicsPool[typing.Any] | None" = None  # set on objects made by a pool
+
     def __init__(
         self,
         body: pymunk.Body | None,
@@ -61,3 +100,41 @@ class SimplePhysicalObject(PhysicalObject, typing.Generic[T]):
     @property
     def shape(self) -> T:
         return typing.cast(T, self.shapes[0])
+
+    def in_use(self) -> bool:
+        """Whether the object is in any subsystem."""
+        return bool(self._systems)
+
+    def reuse(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        """Resets a pooled object, takes the arguments of the constructor."""
+        raise NotImplementedError()
+
+    def reset_physics(
+        self,
+        position: tuple[float, float] = (0, 0),
+        velocity: tuple[float, float] = (0, 0),
+        angle: float = 0.0,
+        mass: float | None = None,
+        moment: float | None = None,
+        shape_filter: pymunk.ShapeFilter | None = None,
+    ) -> None:
+        """Puts the body at rest at position and clears removal marks."""
+        body = self.body
+        if body is not None:
+            if mass is not None:
+                body.mass = mass
+            if moment is not None:
+                body.moment = moment
+            body.position = position
+            body.velocity = velocity
+            body.angle = angle
+            body.angular_velocity = 0.0
+            body.force = (0, 0)
+            body.torque = 0.0
+        if shape_filter is not None:
+            self.shape.filter = shape_filter
+        self.previous_transform = None
+        self.teleported = True
+        if self.world is not None:
+            self.world.mark_teleported(self)
+        self._not_removed = True
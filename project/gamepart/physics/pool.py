@@ -0,0 +1,65 @@
+import typing
+
+from .physicalobject import SimplePhysicalObject
+
+P = typing.TypeVar("P", bound=SimplePhysicalObject)
+
+
+class PhysicsPool(typing.Generic[P]):
+    """Recycles physical objects together with their bodies and shapes.
+
+    Objects are created by calling cls the first time and handed back with
+    cls.reuse(*args, **kwargs) afterwards, which takes the same arguments as
+    the constructor and has to reset the state set by it. World.remove
+    returns pooled objects to their pool, the shapes stay attached to their
+    bodies and are added back to the space as they are.
+    """
+
+    def __init__(self, cls: type[P], max_size: int = 1024) -> None:
+        self.cls = cls
+        self.max_size = max_size
+        self.free: list[P] = []
+        self.hits = 0  # acquires served from the pool
+        self.misses = 0  # acquires that created a new object
+        self.dropped = 0  # releases over max_size or of objects still in use
+
+    def __len__(self) -> int:
+        return len(self.free)
+
+    @property
+    def hit_rate(self) -> float:
+        acquired = self.hits + self.misses
+        return self.hits / acquired if acquired else 0.0
+
+    def acquire(self, *args: typing.Any, **kwargs: typing.Any) -> P:
+        free = self.free
+        while free:
+            obj = free.pop()
+            if obj.in_use():
+                self.dropped += 1  # added back to a system after release
+                continue
+            obj.reuse(*args, **kwargs)
+            self.hits += 1
+            return obj
+        obj = self.cls(*args, **kwargs)
+        obj.pool = self
+        self.misses += 1
+        return obj
+
+    def release(self, obj: P) -> None:
+        if len(self.free) >= self.max_size:
+            self.dropped += 1
+            return
+        self.free.append(obj)
+
+    def clear(self) -> None:
+        self.free.clear()
+
+    def reset_stats(self) -> None:
+        self.hits = self.misses = self.dropped = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}({self.cls.__name__}, free={len(self.free)},"
+            f" hit_rate={self.hit_rate:.2f})"
+        )
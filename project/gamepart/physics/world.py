@@ -1,18 +1,151 @@
+import math
+import statistics
+import struct
+import sys
+import time
 import typing
+from array import array
 
 import pymunk
+import pymunk.batch
+from pymunk.batch import BodyFields
 
 from gamepart.subsystem import SubSystem
 
-from .physicalobject import AwareObject, CollisionObject, PhysicalObject
+from .category import Category, cat_all
+from .physicalobject import (
+    AwareObject,
+    CollisionObject,
+    PhysicalObject,
+    SimplePhysicalObject,
+)
+
+# arbiter, object owning arbiter.shapes[0], object owning arbiter.shapes[1]
+CollisionCallback = typing.Callable[
+    [pymunk.Arbiter, PhysicalObject, PhysicalObject], None
+]
+COLLISION_PHASES = ("begin", "pre_solve", "post_solve", "separate")
+Bounds = tuple[float, float, float, float]  # minx, miny, maxx, maxy
+THREADED_SOLVER = sys.platform != "win32"  # pymunk has no threaded solver there
+SNAPSHOT_STRIDE = 6  # x, y, angle, velocity x, velocity y, angular velocity
+_SNAPSHOT_FIELDS = (
+    BodyFields.POSITION
+    | BodyFields.ANGLE
+    | BodyFields.VELOCITY
+    | BodyFields.ANGULAR_VELOCITY
+)
+_ID_TYPECODE = "Q" if struct.calcsize("P") == 8 else "I"  # uintptr_t
+_POSE_FIELDS = BodyFields.BODY_ID | BodyFields.POSITION | BodyFields.ANGLE
+
+
+def collision_type(category: typing.SupportsInt) -> int:
+    """Collision type given to shapes of objects in category."""
+    return int(category)
+
+
+class WorldSnapshot:
+    """State of the bodies of a World packed into flat arrays.
+
+    Row i of state holds SNAPSHOT_STRIDE values for the body with id ids[i],
+    rows are in the order pymunk iterates bodies. sleeping holds the ids of
+    bodies that were asleep.
+    """
+
+    __slots__ = ("ids", "state", "sleeping")
+
+    def __init__(self, ids: array, state: array, sleeping: array) -> None:
+        self.ids = ids
+        self.state = state
+        self.sleeping = sleeping
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in (self.ids, self.state, self.sleeping))
+
+    def row(self, index: int) -> tuple[float, ...]:
+        """x, y, angle, velocity x, velocity y and angular velocity of a body."""
+        offset = index * SNAPSHOT_STRIDE
+        return tuple(self.state[offset : offset + SNAPSHOT_STRIDE])
 
 
 class World(SubSystem[PhysicalObject]):
-    def __init__(self, speed: float = 1.0):
+    def __init__(
+        self,
+        speed: float = 1.0,
+        interpolate: bool = True,
+        threads: int = 1,
+        iterations: int = 10,
+        sleep_time_threshold: float = math.inf,
+        collision_slop: float = 0.1,
+        idle_speed_threshold: float = 0.0,
+    ):
+        """
+        Args:
+            speed: Multiplier of the simulated time.
+            interpolate: Record transforms for render interpolation, see
+                update_transforms.
+            threads: Solver threads, more than one uses pymunk's threaded
+                solver where it is available (pymunk uses at most 2).
+            iterations: Solver iterations per step.
+            sleep_time_threshold: Idle seconds after which bodies sleep,
+                inf disables sleeping.
+            collision_slop: Overlap allowed between shapes.
+            idle_speed_threshold: Speed under which bodies count as idle,
+                0 lets pymunk derive it from gravity.
+        """
         super().__init__()
         self.speed = speed
-        self.space = pymunk.Space()
+        self.interpolate = interpolate  # record transforms for render interpolation
+        threaded = threads > 1 and THREADED_SOLVER
+        self.space = pymunk.Space(threaded=threaded)
+        if threaded:
+            self.space.threads = threads
+        self.space.iterations = iterations
+        self.space.sleep_time_threshold = sleep_time_threshold
+        self.space.collision_slop = collision_slop
+        self.space.idle_speed_threshold = idle_speed_threshold
+        self.spatial_hash: tuple[float, int] | None = None  # dim, count when used
         self.shape_map: dict[pymunk.Shape, PhysicalObject] = {}
+        # Aware objects are ticked from a schedule of steps. Sleeping ones are
+        # only looked at every sleep_check_interval steps, ones farther than
+        # active_radius from focus are ticked every distant_tick_interval
+        # steps with the time accumulated since their last tick.
+        self.focus: tuple[float, float] | None = None
+        self.active_radius: float = math.inf
+        self.distant_tick_interval: int = 8
+        self.sleep_check_interval: int = 8
+        self.steps: int = 0
+        self.elapsed: float = 0.0  # sum of deltas passed to tick
+        self._tick_schedule: dict[int, list[AwareObject]] = {}
+        # scheduled step, step and elapsed time of the last tick by object
+        self._tick_state: dict[AwareObject, tuple[int, int, float]] = {}
+        # objects whose body slept at their last scheduled tick, the tick
+        # after they wake gets only the step's delta
+        self._asleep: set[AwareObject] = set()
+        # callbacks by (collision type a, collision type b or None) and phase
+        self.collision_handlers: dict[
+            tuple[int, int | None], dict[str, list[CollisionCallback]]
+        ] = {}
+        # ids and x, y, angle rows of the bodies before the last step
+        self._pose_ids = array(_ID_TYPECODE)
+        self._poses = array("d")
+        self._pose_rows: dict[int, int] = {}
+        self._pose_rows_ids = array(_ID_TYPECODE)
+        # bodies and their ids of objects without a static body, by object
+        self._moving: dict[PhysicalObject, tuple[pymunk.Body, int]] = {}
+        # objects moved outside of a step since the poses were stored
+        self._teleported: set[PhysicalObject] = set()
+
+    @property
+    def threaded(self) -> bool:
+        return self.space.threaded
+
+    @property
+    def sleeping_enabled(self) -> bool:
+        return self.space.sleep_time_threshold != math.inf
 
     @staticmethod
     def accepts(obj: typing.Any) -> bool:
@@ -21,9 +154,23 @@ class World(SubSystem[PhysicalObject]):
     def add(self, *objects: PhysicalObject) -> typing.Iterable[PhysicalObject]:
         super().add(*objects)
         for obj in objects:
-            self.space.add(*obj.bodies, *obj.shapes)
+            ctype = collision_type(obj.category)
             for shape in obj.shapes:
+                if ctype and not shape.collision_type:
+                    shape.collision_type = ctype
                 self.shape_map[shape] = obj
+            self.space.add(*obj.bodies, *obj.shapes)
+            obj.world = self
+            body = obj.body
+            if body is not None and body.body_type != pymunk.Body.STATIC:
+                self._moving[obj] = body, body.id
+            if obj.teleported:
+                self._teleported.add(obj)
+            if isinstance(obj, CollisionObject):
+                self._subscribe_collide(obj)
+            if isinstance(obj, AwareObject):
+                self._subscribe_wake(obj)
+                self._schedule_tick(obj, self.steps + 1, self.steps, self.elapsed)
         return objects
 
     def remove(self, *objects: PhysicalObject) -> typing.Iterable[PhysicalObject]:
@@ -31,16 +178,449 @@ class World(SubSystem[PhysicalObject]):
             self.space.remove(*obj.bodies, *obj.shapes)
             for shape in obj.shapes:
                 del self.shape_map[shape]
-        return super().remove(*objects)
+            obj.world = None
+            self._moving.pop(obj, None)
+            self._teleported.discard(obj)
+            if isinstance(obj, AwareObject):
+                self._tick_state.pop(obj, None)
+                self._asleep.discard(obj)
+        super().remove(*objects)
+        for obj in objects:
+            if isinstance(obj, SimplePhysicalObject) and obj.pool is not None:
+                obj.pool.release(obj)
+        return objects
+
+    def on_collision(
+        self,
+        category_a: Category | int,
+        category_b: Category | int | None = None,
+        begin: CollisionCallback | None = None,
+        pre_solve: CollisionCallback | None = None,
+        post_solve: CollisionCallback | None = None,
+        separate: CollisionCallback | None = None,
+    ) -> None:
+        """Calls back when objects of two categories touch.
+
+        Without category_b, objects of category_a touching anything are
+        reported. Callbacks get the arbiter and the objects owning its shapes,
+        the category_a object first, and may set arbiter.process_collision.
+        Callbacks add up, registering again does not replace earlier ones.
+        Shapes keep a collision type they had before being added to the
+        world, other shapes get the one of their object's category.
+        """
+        key = (
+            collision_type(category_a),
+            None if category_b is None else collision_type(category_b),
+        )
+        phases = self.collision_handlers.setdefault(key, {})
+        for phase, callback in zip(
+            COLLISION_PHASES, (begin, pre_solve, post_solve, separate)
+        ):
+            if callback is not None:
+                phases.setdefault(phase, []).append(callback)
+        self.space.on_collision(
+            key[0],
+            key[1],
+            data=phases,
+            **{phase: self._dispatch(phase) for phase in phases},
+        )
+
+    def _dispatch(
+        self, phase: str
+    ) -> typing.Callable[[pymunk.Arbiter, pymunk.Space, typing.Any], None]:
+        shape_map = self.shape_map
+
+        def dispatch(
+            arbiter: pymunk.Arbiter,
+            space: pymunk.Space,
+            phases: dict[str, list[CollisionCallback]],
+        ) -> None:
+            shape_a, shape_b = arbiter.shapes
+            obj_a = shape_map.get(shape_a)
+            obj_b = shape_map.get(shape_b)
+            if obj_a is None or obj_b is None:
+                return  # shapes not owned by objects of this world
+            for callback in phases[phase]:
+                callback(arbiter, obj_a, obj_b)
+
+        return dispatch
+
+    def _subscribe_collide(self, obj: CollisionObject) -> None:
+        key = (collision_type(obj.category), None)
+        if self._collide not in self.collision_handlers.get(key, {}).get(
+            "pre_solve", ()
+        ):
+            self.on_collision(obj.category, pre_solve=self._collide)
+
+    def _collide(
+        self, arbiter: pymunk.Arbiter, obj: PhysicalObject, other: PhysicalObject
+    ) -> None:
+        if isinstance(obj, CollisionObject):
+            obj.collide(arbiter, other)
+
+    def _subscribe_wake(self, obj: AwareObject) -> None:
+        key = (collision_type(obj.category), None)
+        if self._wake_touched not in self.collision_handlers.get(key, {}).get(
+            "begin", ()
+        ):
+            self.on_collision(obj.category, begin=self._wake_touched)
+
+    def _wake_touched(
+        self, arbiter: pymunk.Arbiter, obj: PhysicalObject, other: PhysicalObject
+    ) -> None:
+        # pymunk wakes bodies on contact, their ticks resume on this step
+        asleep = self._asleep
+        if obj in asleep:
+            self.wake(obj)
+        if other in asleep:
+            self.wake(other)
+
+    @staticmethod
+    def query_filter(categories: typing.SupportsInt = cat_all) -> pymunk.ShapeFilter:
+        """Filter matching shapes whose filter categories overlap categories."""
+        return pymunk.ShapeFilter(mask=int(categories))
+
+    def _owners(self, shapes: typing.Iterable[pymunk.Shape]) -> list[PhysicalObject]:
+        found: dict[PhysicalObject, None] = {}
+        shape_map = self.shape_map
+        for shape in shapes:
+            obj = shape_map.get(shape)
+            if obj is not None:
+                found[obj] = None
+        return list(found)
 
-    def _collide(self, arbiter: pymunk.Arbiter, obj: CollisionObject) -> None:
-        other = self.shape_map[arbiter.shapes[1]]
-        obj.collide(arbiter, other)
+    def point_query(
+        self,
+        point: tuple[float, float],
+        max_distance: float = 0.0,
+        categories: typing.SupportsInt = cat_all,
+    ) -> list[PhysicalObject]:
+        """Objects with a shape within max_distance of point."""
+        infos = self.space.point_query(
+            point, max_distance, self.query_filter(categories)
+        )
+        return self._owners(info.shape for info in infos)
+
+    def point_query_nearest(
+        self,
+        point: tuple[float, float],
+        max_distance: float,
+        categories: typing.SupportsInt = cat_all,
+    ) -> PhysicalObject | None:
+        """Object with the shape nearest to point, within max_distance."""
+        info = self.space.point_query_nearest(
+            point, max_distance, self.query_filter(categories)
+        )
+        if info is None or info.shape is None:
+            return None
+        return self.shape_map.get(info.shape)
+
+    def segment_query(
+        self,
+        start: tuple[float, float],
+        end: tuple[float, float],
+        radius: float = 0.0,
+        categories: typing.SupportsInt = cat_all,
+    ) -> list[PhysicalObject]:
+        """Objects hit by a segment, in order of distance from start."""
+        infos = self.space.segment_query(
+            start, end, radius, self.query_filter(categories)
+        )
+        infos.sort(key=lambda info: info.alpha)
+        return self._owners(info.shape for info in infos)
+
+    def segment_query_first(
+        self,
+        start: tuple[float, float],
+        end: tuple[float, float],
+        radius: float = 0.0,
+        categories: typing.SupportsInt = cat_all,
+    ) -> PhysicalObject | None:
+        """First object hit by a segment going from start to end."""
+        info = self.space.segment_query_first(
+            start, end, radius, self.query_filter(categories)
+        )
+        if info is None or info.shape is None:
+            return None
+        return self.shape_map.get(info.shape)
+
+    def bb_query(
+        self, bounds: Bounds, categories: typing.SupportsInt = cat_all
+    ) -> list[PhysicalObject]:
+        """Objects with a shape whose bounding box overlaps bounds."""
+        shapes = self.space.bb_query(pymunk.BB(*bounds), self.query_filter(categories))
+        return self._owners(shapes)
+
+    def shape_query(
+        self, shape: pymunk.Shape, categories: typing.SupportsInt = cat_all
+    ) -> list[PhysicalObject]:
+        """Objects overlapping a shape, which does not need to be in the world.
+
+        The shape's own filter is replaced by the categories filter for the
+        duration of the query.
+        """
+        old_filter = shape.filter
+        shape.filter = self.query_filter(categories)
+        try:
+            infos = self.space.shape_query(shape)
+        finally:
+            shape.filter = old_filter
+        return self._owners(info.shape for info in infos)
+
+    def spatial_hash_params(self) -> tuple[float, int]:
+        """Spatial hash cell size and cell count fitting the current shapes.
+
+        Cells are as big as the median non-static shape, and there are ten
+        cells per shape, as pymunk recommends.
+        """
+        sizes = []
+        for shape in self.space.shapes:
+            if shape.body is None or shape.body.body_type == pymunk.Body.STATIC:
+                continue
+            bb = shape.bb
+            sizes.append(max(bb.right - bb.left, bb.top - bb.bottom))
+        dim = max(1.0, statistics.median(sizes)) if sizes else 100.0
+        return dim, max(1000, 10 * len(self.space.shapes))
+
+    def use_spatial_hash(
+        self, dim: float | None = None, count: int | None = None
+    ) -> None:
+        """Replaces the bounding box tree index by a spatial hash.
+
+        Missing parameters come from spatial_hash_params. The space cannot
+        go back to the bounding box tree afterwards.
+        """
+        default_dim, default_count = self.spatial_hash_params()
+        self.spatial_hash = (dim or default_dim, count or default_count)
+        self.space.use_spatial_hash(*self.spatial_hash)
+
+    def autotune(
+        self,
+        steps: int = 20,
+        delta: float = 1 / 128,
+        thread_counts: typing.Sequence[int] = (1, 2),
+    ) -> dict[tuple[int, tuple[float, int] | None], float]:
+        """Benchmarks solver settings on the live space, keeps the fastest.
+
+        Each thread count, when the space is threaded, is timed on the space
+        itself, collision handlers and sleeping bodies included, between a
+        snapshot and a restore. Handlers run during these steps, so call this
+        before their side effects matter. Switching to a spatial hash cannot
+        be undone, so unless one is used already, the hash sized by
+        spatial_hash_params is timed against the current index on two copies
+        of the space and its live timing is scaled by that ratio. Returns
+        seconds per step by candidate (threads, spatial hash dim and count or
+        None).
+        """
+        threads = tuple(thread_counts) if self.threaded else (self.space.threads,)
+        timings: dict[tuple[int, tuple[float, int] | None], float] = {}
+        old_threads = self.space.threads
+        for thread_count in threads:
+            if self.threaded:
+                self.space.threads = thread_count
+            snapshot = self.snapshot()
+            timings[(thread_count, self.spatial_hash)] = self._time_steps(
+                self.space, steps, delta
+            )
+            self.restore(snapshot)
+        if self.threaded:
+            self.space.threads = old_threads
+        if self.spatial_hash is None:
+            thread_count = min(timings, key=timings.__getitem__)[0]
+            params = self.spatial_hash_params()
+            current = self.space.copy()
+            hashed = self.space.copy()
+            hashed.use_spatial_hash(*params)
+            if self.threaded:
+                current.threads = hashed.threads = thread_count
+            ratio = self._time_steps(hashed, steps, delta) / max(
+                self._time_steps(current, steps, delta), 1e-9
+            )
+            timings[(thread_count, params)] = timings[(thread_count, None)] * ratio
+        thread_count, spatial_hash = min(timings, key=timings.__getitem__)
+        if self.threaded:
+            self.space.threads = thread_count
+        if spatial_hash is not None and self.spatial_hash is None:
+            self.use_spatial_hash(*spatial_hash)
+        return timings
+
+    def _time_steps(self, space: pymunk.Space, steps: int, delta: float) -> float:
+        """Seconds per step of space over steps steps."""
+        start = time.perf_counter()
+        for _ in range(steps):
+            space.step(delta * self.speed)
+        return (time.perf_counter() - start) / steps
+
+    def _schedule_tick(
+        self, obj: AwareObject, step: int, last_step: int, last_elapsed: float
+    ) -> None:
+        self._tick_state[obj] = (step, last_step, last_elapsed)
+        due = self._tick_schedule.get(step)
+        if due is None:
+            due = self._tick_schedule[step] = []
+        due.append(obj)
+
+    def wake(self, obj: PhysicalObject) -> None:
+        """Wakes the body of obj and ticks it on the next step if it is aware.
+
+        Called during a step, the object is ticked right after that step.
+        """
+        if obj.body is not None and obj.body.space is not None:
+            obj.body.activate()
+        if isinstance(obj, AwareObject):
+            state = self._tick_state.get(obj)
+            if state is not None and state[0] > self.steps + 1:
+                self._schedule_tick(obj, self.steps + 1, state[1], state[2])
+
+    def _is_distant(self, obj: AwareObject) -> bool:
+        if self.focus is None or obj.body is None:
+            return False
+        x, y = obj.body.position
+        fx, fy = self.focus
+        return (x - fx) ** 2 + (y - fy) ** 2 > self.active_radius**2
+
+    def _tick_aware(self, delta: float) -> None:
+        step = self.steps
+        elapsed = self.elapsed
+        for obj in self._tick_schedule.pop(step, ()):
+            state = self._tick_state.get(obj)
+            if state is None or state[0] != step:
+                continue  # removed or rescheduled
+            body = obj.body
+            if body is not None and body.is_sleeping:
+                # Sleeping objects skip their ticks, the tick after they wake
+                # gets only delta, time is not accumulated
+                self._asleep.add(obj)
+                self._schedule_tick(
+                    obj, step + self.sleep_check_interval, step, elapsed
+                )
+                continue
+            woke = obj in self._asleep
+            if woke:
+                self._asleep.discard(obj)
+            obj.tick(delta if woke or state[1] == step - 1 else elapsed - state[2])
+            if obj not in self._tick_state:
+                continue  # removed itself
+            interval = self.distant_tick_interval if self._is_distant(obj) else 1
+            self._schedule_tick(obj, step + interval, step, elapsed)
 
     def tick(self, delta: float) -> None:
+        if self.interpolate:
+            self._store_poses()
         self.space.step(delta * self.speed)
-        for a_obj in self.get_objects(AwareObject):
-            a_obj.tick(delta)
-        for c_obj in self.get_objects(CollisionObject):
-            for body in c_obj.bodies:
-                body.each_arbiter(self._collide, c_obj)
+        self.steps += 1
+        self.elapsed += delta
+        self._tick_aware(delta)
+
+    def mark_teleported(self, obj: PhysicalObject) -> None:
+        """Draws obj where it is, without interpolation, until the next step."""
+        obj.teleported = True
+        self._teleported.add(obj)
+
+    def _store_poses(self) -> None:
+        for obj in self._teleported:
+            obj.teleported = False  # the poses stored now are after the move
+        self._teleported.clear()
+        buffer = pymunk.batch.Buffer()
+        pymunk.batch.get_space_bodies(self.space, _POSE_FIELDS, buffer)
+        ids = array(_ID_TYPECODE)
+        ids.frombytes(buffer.int_buf())
+        poses = array("d")
+        poses.frombytes(buffer.float_buf())
+        self._pose_ids = ids
+        self._poses = poses
+
+    def update_transforms(self) -> None:
+        """Gives objects the transform they had before the last step.
+
+        tick only reads the poses of all bodies in one batch call, call this
+        once per frame before drawing to set previous_transform from them.
+        Objects whose body was static when added are not looked at, sleeping
+        bodies and objects teleported since the last step are drawn where
+        they are.
+        """
+        if not self.interpolate:
+            return
+        ids = self._pose_ids
+        if ids != self._pose_rows_ids:
+            self._pose_rows = dict(zip(ids, range(0, 3 * len(ids), 3)))
+            self._pose_rows_ids = ids
+        rows = self._pose_rows
+        poses = self._poses
+        check_sleep = self.sleeping_enabled
+        for obj, (body, body_id) in self._moving.items():
+            row = rows.get(body_id)
+            if row is None or obj.teleported or (check_sleep and body.is_sleeping):
+                obj.previous_transform = None
+            else:
+                obj.previous_transform = (poses[row], poses[row + 1]), poses[row + 2]
+
+    def _batch_get(self, fields: BodyFields, typecode: str) -> array:
+        buffer = pymunk.batch.Buffer()
+        pymunk.batch.get_space_bodies(self.space, fields, buffer)
+        values = array(typecode)
+        if typecode == "d":
+            values.frombytes(buffer.float_buf())
+        else:
+            values.frombytes(buffer.int_buf())
+        return values
+
+    def snapshot(self) -> WorldSnapshot:
+        """Captures position, angle, velocities and sleep of all bodies.
+
+        Bodies are keyed by their pymunk id, which stays the same for as long
+        as the body exists, pooled objects included. Values are read in one
+        batch call without going through the Python body wrappers.
+        """
+        ids = self._batch_get(BodyFields.BODY_ID, _ID_TYPECODE)
+        state = self._batch_get(_SNAPSHOT_FIELDS, "d")
+        sleeping = array(_ID_TYPECODE)
+        if self.sleeping_enabled:
+            sleeping.extend(body.id for body in self.space.bodies if body.is_sleeping)
+        return WorldSnapshot(ids, state, sleeping)
+
+    def restore(self, snapshot: WorldSnapshot) -> None:
+        """Puts bodies back into the state captured by snapshot.
+
+        Only bodies still in the space are touched: bodies added since keep
+        their state and removed ones are not added back. Shapes follow their
+        bodies and are not rebuilt. Restoring is a single batch call when the
+        bodies are iterated in the same order as when the snapshot was taken,
+        which holds unless bodies were added, removed, put to sleep or woken.
+        """
+        bodies: dict[int, pymunk.Body] = {}
+        if self.sleeping_enabled:
+            # Waking bodies while pymunk iterates them skips bodies, wake first
+            bodies = {body.id: body for body in self.space.bodies}
+            for body in bodies.values():
+                if body.is_sleeping:
+                    body.activate()
+        ids = self._batch_get(BodyFields.BODY_ID, _ID_TYPECODE)
+        state = snapshot.state
+        if ids != snapshot.ids:
+            state = self._reorder(snapshot, ids)
+        buffer = pymunk.batch.Buffer()
+        buffer.set_float_buf(state)
+        pymunk.batch.set_space_bodies(self.space, _SNAPSHOT_FIELDS, buffer)
+        for body_id in snapshot.sleeping:
+            sleeper = bodies.get(body_id)
+            if sleeper is not None and sleeper.body_type == pymunk.Body.DYNAMIC:
+                sleeper.sleep()
+        if self.interpolate:
+            self._pose_ids = array(_ID_TYPECODE)
+            self._poses = array("d")
+            for obj in self.objects:
+                obj.previous_transform = None  # teleported, do not interpolate
+
+    def _reorder(self, snapshot: WorldSnapshot, ids: array) -> array:
+        """Snapshot state in the order of ids, current state for new bodies."""
+        state = self._batch_get(_SNAPSHOT_FIELDS, "d")
+        saved = snapshot.state
+        rows = dict(zip(snapshot.ids, range(0, len(saved), SNAPSHOT_STRIDE)))
+        for offset, body_id in zip(range(0, len(state), SNAPSHOT_STRIDE), ids):
+            row = rows.get(body_id)
+            if row is not None:
+                state[offset : offset + SNAPSHOT_STRIDE] = saved[
+                    row : row + SNAPSHOT_STRIDE
+                ]
+        return state
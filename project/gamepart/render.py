@@ -1,5 +1,9 @@
+import collections
 import ctypes
+import functools
+import math
 import typing
+from array import array
 from collections.abc import Generator, Sequence
 from contextlib import contextmanager
 from typing import Any, TypeVarTuple
@@ -12,12 +16,542 @@ from sdl2.stdinc import Sint16
 _Ts = TypeVarTuple("_Ts")
 _Color = sdl2.ext.Color | tuple[int, int, int] | tuple[int, int, int, int] | int | str
 
+_color_cache: dict[typing.Any, int] = {}
+
+
+def pack_color(color: _Color) -> int:
+    """Packs a color into a sortable RGBA int, caching conversions."""
+    if isinstance(color, sdl2.ext.Color):
+        return (color.r << 24) | (color.g << 16) | (color.b << 8) | color.a
+    packed = _color_cache.get(color)
+    if packed is None:
+        packed = pack_color(sdl2.ext.convert_to_color(color))
+        _color_cache[color] = packed
+    return packed
+
+
+def unpack_color(packed: int) -> sdl2.ext.Color:
+    return sdl2.ext.Color(
+        (packed >> 24) & 0xFF,
+        (packed >> 16) & 0xFF,
+        (packed >> 8) & 0xFF,
+        packed & 0xFF,
+    )
+
+
+CIRCLE_TOLERANCE = 0.5  # max distance in pixels between a circle and its polygon
+CIRCLE_MIN_SEGMENTS = 8
+CIRCLE_MAX_SEGMENTS = 128
+
+
+def circle_segments(radius: float) -> int:
+    """Number of segments needed to approximate a circle of given radius."""
+    if radius <= CIRCLE_TOLERANCE * 2:
+        return CIRCLE_MIN_SEGMENTS
+    segments = math.ceil(math.pi / math.acos(1 - CIRCLE_TOLERANCE / radius))
+    segments = (segments + 3) & ~3  # round up to multiple of 4 to share tables
+    return max(CIRCLE_MIN_SEGMENTS, min(CIRCLE_MAX_SEGMENTS, segments))
+
+
+@functools.cache
+def _unit_circle(segments: int) -> tuple[tuple[float, float], ...]:
+    step = 2 * math.pi / segments
+    return tuple((math.cos(i * step), math.sin(i * step)) for i in range(segments))
+
+
+@functools.cache
+def _fan_indices(rim: int, centered: bool) -> tuple[int, ...]:
+    """Triangle fan indices, relative to the first vertex.
+
+    With centered=True vertex 0 is the fan center followed by a closed rim of
+    `rim` vertices, otherwise the fan is spanned from the first rim vertex.
+    """
+    if centered:
+        return tuple(i for k in range(rim) for i in (0, k + 1, (k + 1) % rim + 1))
+    return tuple(i for k in range(1, rim - 1) for i in (0, k, k + 1))
+
+
+def _cross(ax: float, ay: float, bx: float, by: float, cx: float, cy: float) -> float:
+    return (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+
+
+Coords = Sequence[float]  # flat interleaved (x0, y0, x1, y1, ...) coordinates
+
+
+def flat_coords(points: typing.Any) -> Coords:
+    """Interleaved x, y coordinates of points given as (x, y) pairs or flat."""
+    if len(points) and hasattr(points[0], "__len__"):
+        return [c for p in points for c in p]
+    return points
+
+
+def float_buffer(coords: typing.Any) -> array:
+    """Flat coordinates as array('f'), array('f') input is returned as is."""
+    if isinstance(coords, array) and coords.typecode == "f":
+        return coords
+    try:
+        view = memoryview(coords)
+    except TypeError:
+        return array("f", flat_coords(coords))
+    if view.c_contiguous and view.format == "f":
+        out = array("f")
+        out.frombytes(view.cast("B"))
+        return out
+    if view.c_contiguous and view.format == "d":
+        return array("f", view.cast("B").cast("d"))
+    return array("f", flat_coords(coords))
+
+
+def triangulate(points: typing.Any) -> list[int]:
+    """Triangulate a simple polygon, returns vertex indices.
+
+    Points are (x, y) pairs or flat coordinates. Convex polygons are fanned,
+    others are ear clipped.
+    """
+    coords = flat_coords(points)
+    xs, ys = list(coords[0::2]), list(coords[1::2])
+    n = len(xs)
+    if n < 3:
+        return []
+    area = 0.0
+    for i in range(n):
+        area += xs[i - 1] * ys[i] - xs[i] * ys[i - 1]
+    sign = 1.0 if area >= 0 else -1.0
+    if all(
+        _cross(xs[i - 2], ys[i - 2], xs[i - 1], ys[i - 1], xs[i], ys[i]) * sign >= 0
+        for i in range(n)
+    ):
+        return list(_fan_indices(n, False))
+
+    remaining = list(range(n))
+    result: list[int] = []
+    while len(remaining) > 3:
+        count = len(remaining)
+        for k in range(count):
+            a, b, c = remaining[k - 1], remaining[k], remaining[(k + 1) % count]
+            ax, ay = xs[a], ys[a]
+            bx, by = xs[b], ys[b]
+            cx, cy = xs[c], ys[c]
+            if _cross(ax, ay, bx, by, cx, cy) * sign <= 0:
+                continue  # reflex or degenerate corner
+            if any(
+                _cross(ax, ay, bx, by, xs[p], ys[p]) * sign >= 0
+                and _cross(bx, by, cx, cy, xs[p], ys[p]) * sign >= 0
+                and _cross(cx, cy, ax, ay, xs[p], ys[p]) * sign >= 0
+                for p in remaining
+                if p not in (a, b, c)
+            ):
+                continue  # another vertex inside the ear
+            result.extend((a, b, c))
+            del remaining[k]
+            break
+        else:
+            break  # self-intersecting polygon, give up on the rest
+    if len(remaining) == 3:
+        result.extend(remaining)
+    return result
+
+
+def _line_quad(
+    x1: float, y1: float, x2: float, y2: float, half: float
+) -> tuple[float, float, float, float, float, float, float, float]:
+    """Corners of a line of width 2 * half between two points."""
+    dx, dy = x2 - x1, y2 - y1
+    length = math.hypot(dx, dy)
+    if length == 0:  # degenerate line, draw a dot
+        nx, ny, x1, x2 = 0.0, half, x1 - half, x2 + half
+    else:
+        nx, ny = -dy / length * half, dx / length * half
+    return x1 + nx, y1 + ny, x2 + nx, y2 + ny, x2 - nx, y2 - ny, x1 - nx, y1 - ny
+
+
+class GeometryBatch:
+    """Triangles collected into shared vertex/index buffers.
+
+    Everything added to a batch is submitted with a single SDL_RenderGeometry
+    call. Coordinates follow SDL2_gfx conventions: integer pixel coordinates
+    address pixel centers and shape bounds are inclusive.
+    """
+
+    __slots__ = ("texture", "xy", "colors", "uv", "indices")
+
+    def __init__(self, texture: typing.Any = None) -> None:
+        self.texture = texture
+        self.xy = array("f")
+        self.colors = array("B")
+        self.uv = array("f")
+        self.indices = array("i")
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self.xy) // 2
+
+    def clear(self) -> None:
+        del self.xy[:]
+        del self.colors[:]
+        del self.uv[:]
+        del self.indices[:]
+
+    def add_triangles(
+        self,
+        xy: Sequence[float],
+        indices: Sequence[int],
+        color: sdl2.ext.Color,
+        uv: Sequence[float] | None = None,
+    ) -> None:
+        """Adds vertices and triangle indices (relative to the added vertices)."""
+        base = self.vertex_count
+        count = len(xy) // 2
+        self.xy.extend(xy)
+        self.colors.frombytes(bytes((color.r, color.g, color.b, color.a)) * count)
+        if self.texture is not None:
+            self.uv.extend(uv if uv is not None else [0.0] * (count * 2))
+        self.indices.extend([base + i for i in indices])
+
+    def add_circle(self, x: float, y: float, r: float, color: sdl2.ext.Color) -> None:
+        cx, cy, cr = x + 0.5, y + 0.5, r + 0.5
+        segments = circle_segments(cr)
+        xy = [cx, cy]
+        for ux, uy in _unit_circle(segments):
+            xy.append(cx + ux * cr)
+            xy.append(cy + uy * cr)
+        self.add_triangles(xy, _fan_indices(segments, True), color)
+
+    def add_polygon(self, points: typing.Any, color: sdl2.ext.Color) -> None:
+        """Adds a polygon given as (x, y) pairs or flat coordinates."""
+        coords = flat_coords(points)
+        xy = [c + 0.5 for c in coords]
+        self.add_triangles(xy, triangulate(coords), color)
+
+    def add_quad(
+        self,
+        xy: Sequence[float],
+        color: sdl2.ext.Color,
+        uv: Sequence[float] | None = None,
+    ) -> None:
+        """Adds a quad given by 4 corners in order."""
+        self.add_triangles(xy, (0, 1, 2, 0, 2, 3), color, uv)
+
+    def add_box(
+        self, x1: float, y1: float, x2: float, y2: float, color: sdl2.ext.Color
+    ) -> None:
+        x1, x2 = min(x1, x2), max(x1, x2) + 1
+        y1, y2 = min(y1, y2), max(y1, y2) + 1
+        self.add_quad((x1, y1, x2, y1, x2, y2, x1, y2), color)
+
+    def add_line(
+        self,
+        x1: float,
+        y1: float,
+        x2: float,
+        y2: float,
+        width: float,
+        color: sdl2.ext.Color,
+    ) -> None:
+        self.add_quad(
+            _line_quad(x1 + 0.5, y1 + 0.5, x2 + 0.5, y2 + 0.5, width / 2), color
+        )
+
+    def add_polyline(self, coords: Coords, width: float, color: sdl2.ext.Color) -> None:
+        """Adds connected lines through flat coordinates."""
+        half = width / 2
+        xs = [x + 0.5 for x in coords[0::2]]
+        ys = [y + 0.5 for y in coords[1::2]]
+        xy: list[float] = []
+        for i in range(len(xs) - 1):
+            xy.extend(_line_quad(xs[i], ys[i], xs[i + 1], ys[i + 1], half))
+        quads = len(xy) // 8
+        indices = [4 * k + i for k in range(quads) for i in (0, 1, 2, 0, 2, 3)]
+        self.add_triangles(xy, indices, color)
+
+    def submit(self, sdlrenderer: typing.Any) -> None:
+        """Renders collected triangles and clears the batch."""
+        if not self.indices:
+            return
+        texture = self.texture
+        if isinstance(texture, sdl2.ext.TextureSprite):
+            texture = texture.texture
+        float_p = ctypes.POINTER(ctypes.c_float)
+        ret = sdl2.SDL_RenderGeometryRaw(
+            sdlrenderer,
+            texture,
+            ctypes.cast(self.xy.buffer_info()[0], float_p),
+            2 * self.xy.itemsize,
+            ctypes.cast(  # type: ignore[arg-type]
+                self.colors.buffer_info()[0], ctypes.POINTER(sdl2.SDL_Color)
+            ),
+            4 * self.colors.itemsize,
+            ctypes.cast(self.uv.buffer_info()[0], float_p) if self.uv else None,
+            2 * self.uv.itemsize,
+            self.vertex_count,
+            self.indices.buffer_info()[0],
+            len(self.indices),
+            self.indices.itemsize,
+        )
+        self.clear()
+        if ret:
+            raise sdl2.ext.SDLError()
+
+
+_WHITE = sdl2.ext.Color(255, 255, 255, 255)
+_QUAD_UV = (0.0, 0.0, 1.0, 0.0, 1.0, 1.0, 0.0, 1.0)
+
+_Rasterizer = typing.Callable[[typing.Any, int, int, int, sdl2.ext.Color, bool], None]
+
+
+def _rasterize_filled_circle(
+    sdlrenderer: typing.Any,
+    x: int,
+    y: int,
+    r: int,
+    clr: sdl2.ext.Color,
+    antialias: bool,
+) -> None:
+    sdl2.sdlgfx.filledCircleRGBA(sdlrenderer, x, y, r, clr.r, clr.g, clr.b, 255)
+    if antialias:
+        sdl2.sdlgfx.aacircleRGBA(sdlrenderer, x, y, r, clr.r, clr.g, clr.b, 255)
+
+
+def _rasterize_circle(
+    sdlrenderer: typing.Any,
+    x: int,
+    y: int,
+    r: int,
+    clr: sdl2.ext.Color,
+    antialias: bool,
+) -> None:
+    fun = sdl2.sdlgfx.aacircleRGBA if antialias else sdl2.sdlgfx.circleRGBA
+    fun(sdlrenderer, x, y, r, clr.r, clr.g, clr.b, 255)
+
+
+class SpriteCache:
+    """LRU cache of primitives pre-rasterized into SDL textures.
+
+    Textures are keyed by (shape, radius bucket, RGB color) and evicted
+    least recently used first once their total size exceeds `budget` bytes.
+    They are rasterized opaque, alpha is applied when they are drawn. Radii
+    above `max_radius` are not cached.
+    """
+
+    rasterizers: dict[str, _Rasterizer] = {
+        "filled_circle": _rasterize_filled_circle,
+        "circle": _rasterize_circle,
+    }
+
+    def __init__(
+        self,
+        renderer: "GfxRenderer",
+        budget: int = 16 * 2**20,
+        antialias: bool = False,
+        max_radius: int = 128,
+    ) -> None:
+        self.renderer = renderer
+        self.budget = budget
+        self.antialias = antialias
+        self.max_radius = max_radius
+        self.usage: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: collections.OrderedDict[
+            tuple[str, int, int], tuple[typing.Any, int]
+        ] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def radius_bucket(radius: int) -> int:
+        """Quantizes radius, coarser for bigger radii where scaling is invisible."""
+        if radius < 16:
+            return radius
+        if radius < 32:
+            return (radius + 1) & ~1
+        return (radius + 3) & ~3
+
+    def cacheable(self, radius: int) -> bool:
+        return 0 < radius <= self.max_radius
+
+    def get(self, shape: str, bucket: int, color: sdl2.ext.Color) -> typing.Any:
+        """Returns opaque texture with shape of radius bucket, rasterizing on miss."""
+        key = (shape, bucket, pack_color(color) >> 8)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        size = 2 * bucket + 1
+        nbytes = size * size * 4
+        self._evict(self.budget - nbytes)
+        opaque = sdl2.ext.Color(color.r, color.g, color.b, 255)
+        texture = self._rasterize(self.rasterizers[shape], bucket, opaque)
+        self._entries[key] = (texture, nbytes)
+        self.usage += nbytes
+        return texture
+
+    def _rasterize(
+        self, rasterizer: _Rasterizer, r: int, clr: sdl2.ext.Color
+    ) -> typing.Any:
+        renderer = self.renderer
+        sdlrenderer = renderer.sdlrenderer
+        size = 2 * r + 1
+        texture = sdl2.SDL_CreateTexture(
+            sdlrenderer,
+            sdl2.SDL_PIXELFORMAT_ARGB8888,
+            sdl2.SDL_TEXTUREACCESS_TARGET,
+            size,
+            size,
+        )
+        if not texture:
+            raise sdl2.ext.SDLError()
+        renderer.flush()  # pending geometry belongs to the current target
+        old_target = sdl2.SDL_GetRenderTarget(sdlrenderer)
+        with renderer.keep_color(), renderer.keep_blendmode():
+            sdl2.SDL_SetRenderTarget(sdlrenderer, texture)
+            # Transparent background of the same color keeps blended edges
+            # from darkening.
+            sdl2.SDL_SetRenderDrawColor(sdlrenderer, clr.r, clr.g, clr.b, 0)
+            sdl2.SDL_RenderClear(sdlrenderer)
+            rasterizer(sdlrenderer, r, r, r, clr, self.antialias)
+            sdl2.SDL_SetRenderTarget(sdlrenderer, old_target or None)
+        sdl2.SDL_SetTextureBlendMode(texture, sdl2.SDL_BLENDMODE_BLEND)
+        return texture
+
+    def _evict(self, target_usage: int) -> None:
+        while self._entries and self.usage > target_usage:
+            _, (texture, nbytes) = self._entries.popitem(last=False)
+            self._destroy(texture)
+            self.usage -= nbytes
+
+    def _destroy(self, texture: typing.Any) -> None:
+        if self.renderer.geometry.texture is texture:
+            self.renderer.flush()
+            self.renderer.geometry.texture = None
+        sdl2.SDL_DestroyTexture(texture)
+
+    def clear(self) -> None:
+        self._evict(-1)
+
+    def draw(
+        self,
+        shape: str,
+        circles: Sequence[tuple[int, int, int]],
+        color: sdl2.ext.Color,
+    ) -> list[tuple[int, int, int]]:
+        """Draws circles from cached textures, returns those not cacheable."""
+        uncached: list[tuple[int, int, int]] = []
+        by_bucket: dict[int, list[tuple[int, int, int]]] = {}
+        for circle in circles:
+            r = circle[2]
+            if self.cacheable(r):
+                by_bucket.setdefault(self.radius_bucket(r), []).append(circle)
+            else:
+                uncached.append(circle)
+        renderer = self.renderer
+        # SDL_RenderGeometry ignores the texture alpha mod, the vertices carry it
+        tint = _WHITE if color.a == 255 else sdl2.ext.Color(255, 255, 255, color.a)
+        for bucket, group in by_bucket.items():
+            texture = self.get(shape, bucket, color)
+            if renderer.batching:
+                geometry = renderer.get_geometry(texture)
+                for x, y, r in group:
+                    x1, y1, x2, y2 = x - r, y - r, x + r + 1, y + r + 1
+                    geometry.add_quad((x1, y1, x2, y1, x2, y2, x1, y2), tint, _QUAD_UV)
+            else:
+                renderer.flush()
+                sdl2.SDL_SetTextureAlphaMod(texture, color.a)
+                for x, y, r in group:
+                    size = 2 * r + 1
+                    dst = sdl2.SDL_Rect(x - r, y - r, size, size)
+                    sdl2.SDL_RenderCopy(
+                        renderer.sdlrenderer,
+                        texture,
+                        None,  # type: ignore[arg-type]
+                        ctypes.byref(dst),  # type: ignore[arg-type]
+                    )
+        return uncached
+
 
 class GfxRenderer(sdl2.ext.Renderer):
-    """Renderer with sdl2_gfx support."""
+    """Renderer with sdl2_gfx support.
+
+    When `batching` is enabled filled circles, filled polygons, boxes, lines
+    and pixels are tessellated into a shared GeometryBatch instead of being
+    drawn one by one. The batch is flushed before anything else touches the
+    renderer state (other primitives, copies, clip and blend mode changes)
+    and on present, so drawing order is preserved.
+
+    With a `sprite_cache` set, filled circles are drawn from pre-rasterized
+    textures instead.
+    """
 
     color: sdl2.ext.Color
 
+    def __init__(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.batching: bool = False
+        self.geometry = GeometryBatch()
+        self.sprite_cache: SpriteCache | None = None
+        self.frames: int = 0  # presented so far
+        self.target_resets: int = 0  # times render target contents were lost
+
+    def get_geometry(self, texture: typing.Any = None) -> GeometryBatch:
+        """Returns the pending batch for texture, flushing a different one."""
+        if self.geometry.texture is not texture:
+            self.flush()
+            self.geometry.texture = texture
+        return self.geometry
+
+    def reset_targets(self) -> None:
+        """Forgets render target contents, lost on SDL_RENDER_TARGETS_RESET."""
+        if self.sprite_cache is not None:
+            self.sprite_cache.clear()
+        self.target_resets += 1
+
+    def flush(self) -> None:
+        """Submits pending batched geometry."""
+        if self.geometry.indices:
+            self.geometry.submit(self.sdlrenderer)
+
+    @contextmanager
+    def batched(self, enable: bool = True) -> Generator[None, None, None]:
+        old_batching = self.batching
+        self.batching = enable
+        try:
+            yield
+        finally:
+            self.flush()
+            self.batching = old_batching
+
+    @property
+    def blendmode(self) -> typing.Any:
+        return super().blendmode
+
+    @blendmode.setter
+    def blendmode(self, value: typing.Any) -> None:
+        self.flush()
+        sdl2.ext.Renderer.blendmode.fset(self, value)  # type: ignore[attr-defined]
+
+    def clear(self, color: _Color | None = None) -> None:
+        self.geometry.clear()  # pending geometry would be overdrawn anyway
+        super().clear(color)
+
+    def copy(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        self.flush()
+        super().copy(*args, **kwargs)
+
+    def fill(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        self.flush()
+        super().fill(*args, **kwargs)
+
+    def present(self) -> None:
+        self.flush()
+        super().present()
+        self.frames += 1
+
     @property
     def clip(self) -> tuple[int, int, int, int]:
         rect = sdl2.SDL_Rect()
@@ -29,6 +563,7 @@ class GfxRenderer(sdl2.ext.Renderer):
 
     @clip.setter
     def clip(self, value: tuple[int, int, int, int]) -> None:
+        self.flush()
         rect = sdl2.SDL_Rect(*value)
         ret = sdl2.SDL_RenderSetClipRect(
             self.sdlrenderer,
@@ -63,6 +598,7 @@ class GfxRenderer(sdl2.ext.Renderer):
         gfx_fun: typing.Callable[[Any, *_Ts, int, int, int, int], int],
     ) -> None:
         """Draws multiple shapes on the renderer using the provided gfx function."""
+        self.flush()
         with self.keep_blendmode():
             clr = sdl2.ext.convert_to_color(color)
             for cords in shapes:
@@ -101,6 +637,17 @@ class GfxRenderer(sdl2.ext.Renderer):
             circles: Sequence of (x, y, radius) tuples where x, y is the center.
             color: The color to draw with.
         """
+        if self.sprite_cache is not None:
+            clr = sdl2.ext.convert_to_color(color)
+            circles = self.sprite_cache.draw("filled_circle", circles, clr)
+            if not circles:
+                return None
+        if self.batching:
+            clr = sdl2.ext.convert_to_color(color)
+            geometry = self.get_geometry()
+            for x, y, r in circles:
+                geometry.add_circle(x, y, r, clr)
+            return None
         return self._shape(circles, color, gfx_fun=sdl2.sdlgfx.filledCircleRGBA)
 
     def aa_circle(
@@ -127,8 +674,50 @@ class GfxRenderer(sdl2.ext.Renderer):
             pixels: Sequence of (x, y) coordinate tuples.
             color: The color to draw with.
         """
+        if self.batching:
+            clr = sdl2.ext.convert_to_color(color)
+            geometry = self.get_geometry()
+            for x, y in pixels:
+                geometry.add_box(x, y, x, y, clr)
+            return None
         return self._shape(pixels, color, gfx_fun=sdl2.sdlgfx.pixelRGBA)
 
+    def points(self, buffers: Sequence[Coords], color: _Color) -> None:
+        """Draws single pixels from flat coordinate buffers.
+
+        Unlike `pixel` no per point tuples are built, float32 buffers such as
+        array('f') are handed to SDL without copying.
+
+        Args:
+            buffers: Sequence of flat (x0, y0, x1, y1, ...) coordinate buffers.
+            color: The color to draw with.
+        """
+        clr = sdl2.ext.convert_to_color(color)
+        if self.batching:
+            geometry = self.get_geometry()
+            for coords in buffers:
+                xs, ys = coords[0::2], coords[1::2]
+                for i in range(len(xs)):
+                    geometry.add_box(xs[i], ys[i], xs[i], ys[i], clr)
+            return
+        self.flush()
+        with self.keep_color(), self.keep_blendmode():
+            self.color = clr
+            self.blendmode = (
+                sdl2.SDL_BLENDMODE_NONE if clr.a == 255 else sdl2.SDL_BLENDMODE_BLEND
+            )
+            for coords in buffers:
+                buf = float_buffer(coords)
+                ret = sdl2.SDL_RenderDrawPointsF(
+                    self.sdlrenderer,
+                    ctypes.cast(  # type: ignore[arg-type]
+                        buf.buffer_info()[0], ctypes.POINTER(sdl2.SDL_FPoint)
+                    ),
+                    len(buf) // 2,
+                )
+                if ret:
+                    raise sdl2.ext.SDLError()
+
     def rounded_rectangle(
         self,
         rects: Sequence[tuple[int, int, int, int, int]],
@@ -170,6 +759,12 @@ class GfxRenderer(sdl2.ext.Renderer):
             lines: Sequence of (x1, y1, x2, y2) tuples defining line endpoints.
             color: The color to draw with.
         """
+        if self.batching:
+            clr = sdl2.ext.convert_to_color(color)
+            geometry = self.get_geometry()
+            for x1, y1, x2, y2 in lines:
+                geometry.add_line(x1, y1, x2, y2, 1, clr)
+            return None
         return self._shape(lines, color, gfx_fun=sdl2.sdlgfx.lineRGBA)
 
     def aa_line(
@@ -197,8 +792,39 @@ class GfxRenderer(sdl2.ext.Renderer):
                 endpoints and thickness in pixels (1-255).
             color: The color to draw with.
         """
+        if self.batching:
+            clr = sdl2.ext.convert_to_color(color)
+            geometry = self.get_geometry()
+            for x1, y1, x2, y2, width in lines:
+                geometry.add_line(x1, y1, x2, y2, width, clr)
+            return None
         return self._shape(lines, color, gfx_fun=sdl2.sdlgfx.thickLineRGBA)
 
+    def polyline(
+        self,
+        polylines: Sequence[tuple[Coords, float]],
+        color: _Color,
+    ) -> None:
+        """Draws connected lines.
+
+        Polylines are always drawn as batched geometry, flushed right away
+        when batching is disabled.
+
+        Args:
+            polylines: Sequence of (coords, width) tuples where coords are flat
+                (x0, y0, x1, y1, ...) vertex coordinates and width is the line
+                thickness in pixels.
+            color: The color to draw with.
+        """
+        if not self.batching:
+            with self.batched():
+                self.polyline(polylines, color)
+            return
+        clr = sdl2.ext.convert_to_color(color)
+        geometry = self.get_geometry()
+        for coords, width in polylines:
+            geometry.add_polyline(coords, width, clr)
+
     def arc(
         self,
         arcs: Sequence[tuple[int, int, int, int, int]],
@@ -330,7 +956,7 @@ class GfxRenderer(sdl2.ext.Renderer):
 
     def _polygon(
         self,
-        polygons: Sequence[Sequence[tuple[int, int]]],
+        polygons: Sequence[Sequence[tuple[int, int]] | Coords],
         color: _Color,
         *,
         gfx_fun: typing.Callable[..., int],
@@ -339,16 +965,18 @@ class GfxRenderer(sdl2.ext.Renderer):
 
         Args:
             polygons: Sequence of polygons, where each polygon is a sequence of
-                (x, y) vertex tuples.
+                (x, y) vertex tuples or flat (x0, y0, x1, y1, ...) coordinates.
             color: The color to draw with.
             gfx_fun: The SDL2_gfx function to use for drawing.
         """
+        self.flush()
         with self.keep_blendmode():
             clr = sdl2.ext.convert_to_color(color)
             for points in polygons:
-                num = len(points)
-                vx = (Sint16 * num)(*[int(p[0]) for p in points])
-                vy = (Sint16 * num)(*[int(p[1]) for p in points])
+                coords = flat_coords(points)
+                num = len(coords) // 2
+                vx = (Sint16 * num)(*map(int, coords[0::2]))
+                vy = (Sint16 * num)(*map(int, coords[1::2]))
                 ret = gfx_fun(self.sdlrenderer, vx, vy, num, clr.r, clr.g, clr.b, clr.a)
                 if ret:
                     raise sdl2.ext.SDLError()
@@ -383,16 +1011,23 @@ class GfxRenderer(sdl2.ext.Renderer):
 
     def filled_polygon(
         self,
-        polygons: Sequence[Sequence[tuple[int, int]]],
+        polygons: Sequence[Sequence[tuple[int, int]] | Coords],
         color: _Color,
     ) -> None:
         """Draws filled polygons.
 
         Args:
             polygons: Sequence of polygons, where each polygon is a sequence of
-                (x, y) vertex tuples defining the polygon outline.
+                (x, y) vertex tuples or flat (x0, y0, x1, y1, ...) coordinates
+                defining the polygon outline.
             color: The color to draw with.
         """
+        if self.batching:
+            clr = sdl2.ext.convert_to_color(color)
+            geometry = self.get_geometry()
+            for points in polygons:
+                geometry.add_polygon(points, clr)
+            return None
         return self._polygon(polygons, color, gfx_fun=sdl2.sdlgfx.filledPolygonRGBA)
 
     def textured_polygon(
@@ -416,6 +1051,7 @@ class GfxRenderer(sdl2.ext.Renderer):
                 - dx: X offset of the texture relative to renderer's top-left
                 - dy: Y offset of the texture relative to renderer's top-left
         """
+        self.flush()
         for points, surface, dx, dy in polygons:
             num = len(points)
             vx = (Sint16 * num)(*[int(p[0]) for p in points])
@@ -439,6 +1075,7 @@ class GfxRenderer(sdl2.ext.Renderer):
                 is a sequence of (x, y) vertex tuples (minimum 3 points).
             color: The color to draw with.
         """
+        self.flush()
         clr = sdl2.ext.convert_to_color(color)
         for steps, points in beziers:
             num = len(points)
@@ -504,6 +1141,12 @@ class GfxRenderer(sdl2.ext.Renderer):
                 top-left corner and (x2, y2) is the bottom-right corner.
             color: The color to draw with.
         """
+        if self.batching:
+            clr = sdl2.ext.convert_to_color(color)
+            geometry = self.get_geometry()
+            for x1, y1, x2, y2 in boxes:
+                geometry.add_box(x1, y1, x2, y2, clr)
+            return None
         return self._shape(boxes, color, gfx_fun=sdl2.sdlgfx.boxRGBA)
 
     def character(
@@ -518,6 +1161,7 @@ class GfxRenderer(sdl2.ext.Renderer):
                 corner and char is a single character string.
             color: The color to draw with.
         """
+        self.flush()
         clr = sdl2.ext.convert_to_color(color)
         for x, y, char in chars:
             c = char.encode("ascii")[0:1]
@@ -542,6 +1186,7 @@ class GfxRenderer(sdl2.ext.Renderer):
                 corner and text is the string to render.
             color: The color to draw with.
         """
+        self.flush()
         clr = sdl2.ext.convert_to_color(color)
         for x, y, text in strings:
             s = text.encode("ascii")
@@ -555,6 +1200,7 @@ class GfxRenderer(sdl2.ext.Renderer):
         Args:
             color: The color to fill with, or None to use the current color.
         """
+        self.flush()
         with self.keep_blendmode(), self.keep_clip():
             if color is not None:
                 self.color = sdl2.ext.convert_to_color(color)
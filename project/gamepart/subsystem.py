@@ -1,12 +1,18 @@
+import collections
+import itertools
 import typing
 
 
 class SubSystemObject:
     def __init__(self) -> None:
         self._not_removed: bool = True
+        self._systems: list[SubSystem] = []  # systems this object was added to
 
     def mark_for_removal(self) -> None:
-        self._not_removed = False
+        if self._not_removed:
+            self._not_removed = False
+            for system in self._systems:
+                system.removal_queue[self] = None
 
     def __bool__(self) -> bool:
         return self._not_removed
@@ -25,35 +31,123 @@ class SubSystemObject:
 
 T = typing.TypeVar("T", bound=SubSystemObject, contravariant=True)
 ST = typing.TypeVar("ST", bound=SubSystemObject)
+V = typing.TypeVar("V")
+
+
+class ObjectSet(typing.Generic[V]):
+    """Insertion ordered set with O(1) add and discard.
+
+    Iteration walks the set itself, iterate over a list() of it to add or
+    remove objects while iterating.
+    """
+
+    __slots__ = ("_items",)
+
+    def __init__(self, objects: typing.Iterable[V] = ()) -> None:
+        self._items: dict[V, None] = dict.fromkeys(objects)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def __contains__(self, obj: object) -> bool:
+        return obj in self._items
+
+    def __iter__(self) -> typing.Iterator[V]:
+        return iter(self._items)
+
+    def __getitem__(self, index: int) -> V:
+        """Object by insertion position, O(n)."""
+        if index < 0:
+            index += len(self._items)
+        if not 0 <= index < len(self._items):
+            raise IndexError(index)
+        return next(itertools.islice(self._items, index, None))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self._items)!r})"
+
+    def add(self, obj: V) -> None:
+        self._items[obj] = None
+
+    def extend(self, objects: typing.Iterable[V]) -> None:
+        self._items.update(dict.fromkeys(objects))
+
+    def remove(self, obj: V) -> None:
+        del self._items[obj]
+
+    def discard(self, obj: V) -> None:
+        self._items.pop(obj, None)
+
+    def clear(self) -> None:
+        self._items.clear()
 
 
 class SubSystem(SubSystemObject, typing.Generic[T]):
+    # Whether accepts() depends only on the class of the object, which lets
+    # SystemManager route objects by class without asking every time
+    accepts_by_type: bool = True
+
     def __init__(self) -> None:
         super().__init__()
-        self.objects: list[T] = []  # TODO: Pre-split object types
+        self.objects: ObjectSet[T] = ObjectSet()
+        # objects marked for removal, see SubSystemObject.mark_for_removal
+        self.removal_queue: dict[SubSystemObject, None] = {}
+        # get_objects results by requested types, kept up to date once created
+        self._buckets: dict[tuple[type, ...], ObjectSet[T]] = {}
+        # buckets an object of a given class belongs to
+        self._routes: dict[type, list[ObjectSet[T]]] = {}
 
     @staticmethod
     def accepts(obj: typing.Any) -> bool:
         return isinstance(obj, SubSystemObject)
 
-    def get_objects(self, *types: type[ST]) -> typing.Generator[ST, None, None]:
-        for obj in self.objects:
-            if isinstance(obj, types):
-                yield typing.cast(ST, obj)
+    def _get_routes(self, cls: type) -> list[ObjectSet[T]]:
+        routes = self._routes.get(cls)
+        if routes is None:
+            routes = self._routes[cls] = [
+                bucket
+                for types, bucket in self._buckets.items()
+                if issubclass(cls, types)
+            ]
+        return routes
+
+    def get_objects(self, *types: type[ST]) -> typing.Iterator[ST]:
+        bucket = self._buckets.get(types)
+        if bucket is None:
+            matching = [obj for obj in self.objects if isinstance(obj, types)]
+            bucket = self._buckets[types] = ObjectSet(typing.cast(list[T], matching))
+            self._routes.clear()
+        return typing.cast(typing.Iterator[ST], iter(bucket))
 
     def add(self, *objects: T) -> typing.Iterable[T]:
         for obj in objects:
             assert self.accepts(obj), obj
         self.objects.extend(objects)
+        for obj in objects:
+            if self not in obj._systems:
+                obj._systems.append(self)
+            for bucket in self._get_routes(type(obj)):
+                bucket.add(obj)
+            if not obj:
+                self.removal_queue[obj] = None
         return objects
 
     def remove(self, *objects: T) -> typing.Iterable[T]:
         for obj in objects:
             self.objects.remove(obj)
+            obj._systems.remove(self)
+            for bucket in self._get_routes(type(obj)):
+                bucket.discard(obj)
+            self.removal_queue.pop(obj, None)
         return objects
 
     def remove_queued(self) -> typing.Iterable[T]:
-        return self.remove(*[obj for obj in self.objects if not obj])
+        queued = [obj for obj in self.removal_queue if obj in self.objects]
+        self.removal_queue.clear()
+        return self.remove(*typing.cast(list[T], queued))
 
     def clear(self) -> typing.Iterable[T]:
         return self.remove(*self.objects)
@@ -63,10 +157,25 @@ class SubSystem(SubSystemObject, typing.Generic[T]):
 
 
 class SystemManager(SubSystem[SubSystem]):
+    def __init__(self) -> None:
+        super().__init__()
+        # subsystems accepting objects of a class, and subsystems to ask per object
+        self._routes_by_type: dict[type, tuple[list[SubSystem], list[SubSystem]]] = {}
+        self.added_counts: collections.Counter[SubSystem] = collections.Counter()
+        self.removed_counts: collections.Counter[SubSystem] = collections.Counter()
+
     @staticmethod
     def accepts(obj: typing.Any) -> bool:
         return isinstance(obj, SubSystem)
 
+    def add(self, *objects: SubSystem) -> typing.Iterable[SubSystem]:
+        self._routes_by_type.clear()
+        return super().add(*objects)
+
+    def remove(self, *objects: SubSystem) -> typing.Iterable[SubSystem]:
+        self._routes_by_type.clear()
+        return super().remove(*objects)
+
     def get_objects_all(self, *types: type[ST]) -> typing.Generator[ST, None, None]:
         seen: set[SubSystemObject] = set()
         for system in self.objects:
@@ -75,16 +184,62 @@ class SystemManager(SubSystem[SubSystem]):
                     seen.add(obj)
                     yield obj
 
-    def add_all(self, *objects: ST) -> typing.Iterable[ST]:
-        for system in self.objects:
-            system.add(*[obj for obj in objects if system.accepts(obj)])
+    def _route(self, objects: tuple[ST, ...]) -> dict[SubSystem, list[ST]]:
+        """Splits objects into one batch per accepting subsystem."""
+        batches: dict[SubSystem, list[ST]] = {}
+        routes_by_type = self._routes_by_type
+        for obj in objects:
+            cls = type(obj)
+            routes = routes_by_type.get(cls)
+            if routes is None:
+                by_type = [
+                    system
+                    for system in self.objects
+                    if system.accepts_by_type and system.accepts(obj)
+                ]
+                per_object = [
+                    system for system in self.objects if not system.accepts_by_type
+                ]
+                routes = routes_by_type[cls] = (by_type, per_object)
+            for system in routes[0]:
+                batch = batches.get(system)
+                if batch is None:
+                    batch = batches[system] = []
+                batch.append(obj)
+            for system in routes[1]:
+                if system.accepts(obj):
+                    batch = batches.get(system)
+                    if batch is None:
+                        batch = batches[system] = []
+                    batch.append(obj)
+        return {system: batches[system] for system in self.objects if system in batches}
+
+    def add_all(
+        self, *objects: ST, exclude: tuple[type[SubSystem], ...] = ()
+    ) -> typing.Iterable[ST]:
+        """Adds objects to every accepting subsystem not of an exclude type."""
+        for system, batch in self._route(objects).items():
+            if isinstance(system, exclude):
+                continue
+            system.add(*batch)
+            self.added_counts[system] += len(batch)
         return objects
 
-    def remove_all(self, *objects: ST) -> typing.Iterable[ST]:
-        for system in self.objects:
-            system.remove(*[obj for obj in objects if system.accepts(obj)])
+    def remove_all(
+        self, *objects: ST, exclude: tuple[type[SubSystem], ...] = ()
+    ) -> typing.Iterable[ST]:
+        """Removes objects from every accepting subsystem not of an exclude type."""
+        for system, batch in self._route(objects).items():
+            if isinstance(system, exclude):
+                continue
+            system.remove(*batch)
+            self.removed_counts[system] += len(batch)
         return objects
 
+    def reset_counts(self) -> None:
+        self.added_counts.clear()
+        self.removed_counts.clear()
+
     def remove_queued_all(self) -> typing.Iterable[SubSystemObject]:
         all_objects: set[SubSystemObject] = set()
         for system in self.objects:
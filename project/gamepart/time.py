@@ -1,90 +1,137 @@
 import collections
+import itertools
 import logging
+import operator
 import time
 import typing
+from array import array
 
 logger = logging.getLogger(__name__)
 
 
 class FPSCounter:
-    """FPS counter with throttling functionality"""
+    """FPS counter with throttling functionality
+
+    Sums over the history are kept up to date on every frame, and frame times
+    are also written to `frame_times`, a preallocated ring buffer whose oldest
+    entry is at `frame_index`, for drawing graphs without copying.
+    """
 
     def __init__(self, maxlen: int = 120):
         self.history: collections.deque[float] = collections.deque(maxlen=maxlen)
         self.sleep_history: collections.deque[float] = collections.deque(maxlen=maxlen)
         self.last_frame: int = time.perf_counter_ns()
         self.less_sleep: float = 0.001  # compensate for inaccuracy of sleep
+        self.total_time: float = 0.0  # sum of history
+        self.sleep_time: float = 0.0  # sum of sleep_history
+        self.frame_times: array = array("d", bytes(8 * maxlen))
+        self.frame_index: int = 0
 
     def frame(self) -> float:
         new_frame = time.perf_counter_ns()
         delta = new_frame - self.last_frame
         delta_f = delta / 1_000_000_000.0
-        self.history.append(delta_f)
+        history = self.history
+        if len(history) == history.maxlen:
+            self.total_time -= history[0]
+        history.append(delta_f)
+        self.total_time += delta_f
+        self.frame_times[self.frame_index] = delta_f
+        self.frame_index = (self.frame_index + 1) % len(self.frame_times)
+        if not self.frame_index:
+            # Drop rounding errors accumulated by the running sums
+            self.total_time = sum(history)
+            self.sleep_time = sum(self.sleep_history)
         self.last_frame = new_frame
         return (1.0 / delta_f) if delta_f else 0.0
 
+    def _add_sleep(self, sleep: float) -> None:
+        sleep_history = self.sleep_history
+        if len(sleep_history) == sleep_history.maxlen:
+            self.sleep_time -= sleep_history[0]
+        sleep_history.append(sleep)
+        self.sleep_time += sleep
+
     def target_fps(self, fps: float = 120.0, recent: int | None = None) -> None:
         if recent is None:
             recent = int(len(self.history) / 10)
-        history = list(self.history)[-recent:]
+        if recent > 0:
+            history = list(itertools.islice(reversed(self.history), recent))
+        else:
+            history = list(self.history)
         len_ = len(history)
         sum_ = sum(history)
         sleep = min((len_ / fps) - sum_, 1.0 / fps)
         if sleep <= 0:
-            self.sleep_history.append(0.0)
+            self._add_sleep(0.0)
         else:
             start = time.perf_counter_ns()
             time.sleep(max(0.0, sleep - self.less_sleep))
             actual = (time.perf_counter_ns() - start) / 1_000_000_000.0
-            self.sleep_history.append(actual)
+            self._add_sleep(actual)
             logger.log(
                 0,
                 "FPS inhibition: %fms (%fms actual) FPS=%f",
                 sleep * 1000.0,
                 actual * 1000.0,
-                1.0 / history[-1],
+                1.0 / history[0],
             )
 
     def clear(self) -> None:
         self.last_frame = time.perf_counter_ns()
-        while self.history:
-            self.history.pop()
-        while self.sleep_history:
-            self.sleep_history.pop()
+        self.history.clear()
+        self.sleep_history.clear()
+        self.total_time = 0.0
+        self.sleep_time = 0.0
+        for i in range(len(self.frame_times)):
+            self.frame_times[i] = 0.0
+        self.frame_index = 0
 
     def get_fps(self) -> float:
         len_ = len(self.history)
-        sum_ = sum(self.history)
-        return (len_ / sum_) if sum_ else 0.0
+        sum_ = self.total_time
+        return (len_ / sum_) if sum_ > 0 else 0.0
 
     def get_fps_summary(self) -> str:
-        total_time_data = []
-        frame_time_data = []
-        usage_data = []
-        count = 0
-        for total_time, sleep_time in zip(
-            reversed(self.history), reversed(self.sleep_history)
-        ):
-            count += 1
-            frame_time = total_time - sleep_time
-            total_time_data.append(total_time)
-            frame_time_data.append(frame_time)
-            usage_data.append(100.0 * frame_time / total_time)
+        """Table of FPS, frame times and usage over the history.
+
+        Averages come from the running sums. Usage is the share of time not
+        spent sleeping, the average is taken over the whole history.
+        """
+        history = self.history
+        sleep_history = self.sleep_history
+        count = min(len(history), len(sleep_history))
         if count == 0:
             return "No data"
+        if len(history) == len(sleep_history):
+            totals: typing.Sequence[float] = history
+            sleeps: typing.Sequence[float] = sleep_history
+            total_sum = self.total_time
+            sleep_sum = self.sleep_time
+        else:  # only the most recent frames are in both histories
+            totals = list(itertools.islice(history, len(history) - count, None))
+            sleeps = list(
+                itertools.islice(sleep_history, len(sleep_history) - count, None)
+            )
+            total_sum = sum(totals)
+            sleep_sum = sum(sleeps)
+        frames = list(map(operator.sub, totals, sleeps))
+        usages = list(map(operator.truediv, frames, totals))
+        min_total = min(totals)
+        max_total = max(totals)
+        last_total = totals[-1]
 
         rows: list[tuple[str, str, list[float | str]]] = []
-        # Why FPS avg is wrong?
         rows.append(("Metric", "", ["avg", "min", "max", "last"]))
         rows.append(
             (
                 "FPS",
                 "",
                 [
-                    count / sum(total_time_data),
-                    1.0 / max(total_time_data),
-                    1.0 / min(total_time_data),
-                    1.0 / total_time_data[0],
+                    count / total_sum,
+                    1.0 / max_total,
+                    1.0 / min_total,
+                    1.0 / last_total,
                 ],
             )
         )
@@ -93,10 +140,10 @@ class FPSCounter:
                 "Total",
                 "ms",
                 [
-                    1000.0 * sum(total_time_data) / count,
-                    1000.0 * min(total_time_data),
-                    1000.0 * max(total_time_data),
-                    1000.0 * total_time_data[0],
+                    1000.0 * total_sum / count,
+                    1000.0 * min_total,
+                    1000.0 * max_total,
+                    1000.0 * last_total,
                 ],
             )
         )
@@ -105,10 +152,10 @@ class FPSCounter:
                 "Frame",
                 "ms",
                 [
-                    1000.0 * sum(frame_time_data) / count,
-                    1000.0 * min(frame_time_data),
-                    1000.0 * max(frame_time_data),
-                    1000.0 * frame_time_data[0],
+                    1000.0 * (total_sum - sleep_sum) / count,
+                    1000.0 * min(frames),
+                    1000.0 * max(frames),
+                    1000.0 * frames[-1],
                 ],
             )
         )
@@ -117,10 +164,10 @@ class FPSCounter:
                 "Usage",
                 "%",
                 [
-                    sum(usage_data) / count,
-                    min(usage_data),
-                    max(usage_data),
-                    usage_data[0],
+                    100.0 * (total_sum - sleep_sum) / total_sum,
+                    100.0 * min(usages),
+                    100.0 * max(usages),
+                    100.0 * usages[-1],
                 ],
             )
         )
@@ -165,3 +212,14 @@ class TimeFeeder:
     @property
     def lag(self) -> float:
         return self.system_time - self.world_time
+
+    @property
+    def alpha(self) -> float:
+        """Interpolation factor between the previous and the last step.
+
+        World time runs ahead of system time by up to one step, alpha tells
+        how far between the two last steps the system time currently is.
+        """
+        if not self.time_step:
+            return 1.0
+        return min(1.0, max(0.0, 1.0 + self.lag / self.time_step))
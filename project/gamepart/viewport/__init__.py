@@ -1,10 +1,15 @@
+from .commands import DrawCommands  # noqa: F401
 from .graphicalobject import (  # noqa: F401
     Circle,
     GFXObject,
     GraphicalObject,
     Line,
     Point,
+    PointField,
     Polygon,
+    Polyline,
     TexturedObject,
 )
+from .lod import LevelOfDetail  # noqa: F401
+from .spatial import SpatialGrid  # noqa: F401
 from .viewport import CulledFlippedViewPort, FlippedViewPort, ViewPort  # noqa: F401
@@ -0,0 +1,132 @@
+import itertools
+import typing
+from operator import itemgetter
+
+from gamepart.render import GfxRenderer, pack_color, unpack_color
+
+PIXEL = 0
+LINE = 1
+FILLED_CIRCLE = 2
+FILLED_POLYGON = 3
+COPY = 4
+POLYLINE = 5
+POINTS = 6
+BOX = 7
+
+DEFAULT_BLENDMODE = -1  # keep the renderer blend mode
+
+_ColorLike = typing.Any
+_Key = tuple[float, int, int, int, int, int]
+
+
+class DrawCommands:
+    """Draw commands collected during a frame and flushed sorted by state.
+
+    Commands are sorted by (layer, sublayer, texture, blend mode, color, kind)
+    and consecutive commands sharing that state are submitted with a single
+    GfxRenderer call. Textures are ordered by their first use in the frame.
+    The sort is stable, so commands with equal state keep their insertion
+    order. Drawing order between objects in the same layer is otherwise not
+    preserved, use layers where it matters.
+    """
+
+    __slots__ = ("commands", "last_groups", "last_count", "_textures")
+
+    def __init__(self) -> None:
+        self.commands: list[tuple[_Key, typing.Any]] = []
+        # sort position of the textures used since the last flush, by id
+        self._textures: dict[int, int] = {}
+        self.last_groups: int = 0  # renderer calls made by the last flush
+        self.last_count: int = 0  # commands submitted by the last flush
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    def add(
+        self,
+        kind: int,
+        args: typing.Any,
+        color: _ColorLike = None,
+        layer: float = 0,
+        sublayer: int = 0,
+        texture: typing.Any = None,
+        blendmode: int = DEFAULT_BLENDMODE,
+    ) -> None:
+        """Queues a command.
+
+        Args:
+            kind: One of PIXEL, LINE, FILLED_CIRCLE, FILLED_POLYGON, COPY,
+                POLYLINE, POINTS, BOX.
+            args: Shape tuple as accepted by the matching GfxRenderer method,
+                or (texture, srcrect, dstrect, angle, center, flip) for COPY.
+            color: Color of the shape, ignored for COPY.
+            layer: Layer of the owning object, lower layers are drawn first.
+            sublayer: Ordering of commands issued by one object within a layer.
+            texture: Texture used by the command.
+            blendmode: Renderer blend mode to draw with.
+        """
+        if texture is None:
+            order = 0
+        else:
+            textures = self._textures
+            order = textures.get(id(texture), 0)
+            if not order:
+                order = textures[id(texture)] = len(textures) + 1
+        key = (
+            layer,
+            sublayer,
+            order,
+            blendmode,
+            0 if color is None else pack_color(color),
+            kind,
+        )
+        self.commands.append((key, args))
+
+    def clear(self) -> None:
+        self.commands.clear()
+        self._textures.clear()
+
+    def flush(self, renderer: GfxRenderer) -> None:
+        """Submits all queued commands to the renderer and clears the queue."""
+        commands = self.commands
+        self.last_count = len(commands)
+        self.last_groups = 0
+        self._textures.clear()
+        if not commands:
+            return
+        commands.sort(key=itemgetter(0))
+        for key, group in itertools.groupby(commands, key=itemgetter(0)):
+            self.last_groups += 1
+            blendmode = key[3]
+            if blendmode == DEFAULT_BLENDMODE:
+                self._submit(renderer, key, [args for _, args in group])
+            else:
+                with renderer.keep_blendmode():
+                    renderer.blendmode = blendmode
+                    self._submit(renderer, key, [args for _, args in group])
+        commands.clear()
+
+    @staticmethod
+    def _submit(renderer: GfxRenderer, key: _Key, payloads: list[typing.Any]) -> None:
+        kind = key[5]
+        if kind == COPY:
+            for args in payloads:
+                renderer.copy(*args)
+            return
+        color = unpack_color(key[4])
+        if kind == FILLED_CIRCLE:
+            renderer.filled_circle(payloads, color)
+        elif kind == LINE:
+            renderer.line(payloads, color)
+        elif kind == FILLED_POLYGON:
+            renderer.filled_polygon(payloads, color)
+        elif kind == PIXEL:
+            renderer.pixel(payloads, color)
+        elif kind == POLYLINE:
+            renderer.polyline(payloads, color)
+        elif kind == POINTS:
+            renderer.points(payloads, color)
+        elif kind == BOX:
+            renderer.box(payloads, color)
+        else:
+            raise ValueError(f"Unknown draw command kind {kind!r}")
@@ -6,14 +6,50 @@ import sdl2.ext
 from gamepart.physics.vector import Vector
 from gamepart.subsystem import SubSystemObject
 
+from .commands import (
+    COPY,
+    FILLED_CIRCLE,
+    FILLED_POLYGON,
+    LINE,
+    PIXEL,
+    POINTS,
+    POLYLINE,
+)
+from .spatial import Bounds
+
+Transform = tuple[tuple[float, float], float]  # position, angle
+
+ORIENTATION_COLOR = sdl2.ext.Color(0, 0, 0)
+
 
 class GraphicalObject(SubSystemObject):
     position: tuple[float, float]
     angle: float
+    layer: float = 0
+    static: bool = False  # static objects are not re-indexed by culling viewports
+    baked: bool = False  # drawn by a ChunkRenderCache, kept out of viewports
+    previous_transform: Transform | None = None  # before the last physics step
 
     def draw(self, vp: "ViewPort") -> None:
         raise NotImplementedError()
 
+    def interpolated(self, alpha: float) -> Transform:
+        """Position and angle between the previous and the current step."""
+        previous = self.previous_transform
+        if previous is None or alpha >= 1:
+            return self.position, self.angle
+        (px, py), pa = previous
+        x, y = self.position
+        return (
+            (px + (x - px) * alpha, py + (y - py) * alpha),
+            pa + (self.angle - pa) * alpha,
+        )
+
+    def get_bounds(self) -> Bounds:
+        """World space bounding box as (minx, miny, maxx, maxy)."""
+        px, py = self.position
+        return px, py, px, py
+
 
 class ComplexGraphicalObject(GraphicalObject):
     def __init__(self, objects: typing.Iterable[GraphicalObject] = ()) -> None:
@@ -26,20 +62,51 @@ class ComplexGraphicalObject(GraphicalObject):
         for obj in self.objects:
             obj.draw(vp)
 
+    def get_bounds(self) -> Bounds:
+        if not self.objects:
+            return super().get_bounds()
+        bounds = [obj.get_bounds() for obj in self.objects]
+        return (
+            min(b[0] for b in bounds),
+            min(b[1] for b in bounds),
+            max(b[2] for b in bounds),
+            max(b[3] for b in bounds),
+        )
+
 
 class TexturedObject(GraphicalObject):
     texture: sdl2.ext.TextureSprite
     scale: float = 1.0
+    lod_color: tuple[int, int, int] = (128, 128, 128)  # stand-in when tiny
 
     def draw(self, vp: "ViewPort") -> None:
         texture = self.texture
         w, h = texture.size
         w, h = vp.d_to_view(w) * self.scale, vp.d_to_view(h) * self.scale
-        x, y = vp.to_view(self.position)
+        position, angle = self.interpolated(vp.alpha)
+        x, y = vp.to_view(position)
+        lod = vp.lod
+        if lod is not None and lod.simplify(
+            vp, x, y, max(w, h) / 2, self.lod_color, self.layer
+        ):
+            return
         x, y = x - w / 2, y - h / 2
-        angle = (self.angle / (2 * math.pi)) * 360 + texture.angle
+        angle = (angle / (2 * math.pi)) * 360 + texture.angle
         dst = (int(x), int(y), int(w), int(h))
-        vp.renderer.copy(texture.texture, None, dst, angle, None, texture.flip)
+        vp.commands.add(
+            COPY,
+            (texture.texture, None, dst, angle, None, texture.flip),
+            None,
+            self.layer,
+            texture=texture.texture,
+        )
+
+    def get_bounds(self) -> Bounds:
+        w, h = self.texture.size
+        # Rotated texture fits in the circle around its diagonal
+        r = math.hypot(w, h) * self.scale / 2
+        px, py = self.position
+        return px - r, py - r, px + r, py + r
 
 
 class GFXObject(GraphicalObject):
@@ -48,7 +115,8 @@ class GFXObject(GraphicalObject):
 
 class Point(GFXObject):
     def draw(self, vp: "ViewPort") -> None:
-        vp.renderer.pixel([vp.to_view_int(self.position)], self.color)
+        position, _ = self.interpolated(vp.alpha)
+        vp.commands.add(PIXEL, vp.to_view_int(position), self.color, self.layer)
 
 
 class Line(GFXObject):
@@ -58,28 +126,104 @@ class Line(GFXObject):
         start, end = self.end_points
         sx, sy = vp.to_view_int(start)
         ex, ey = vp.to_view_int(end)
-        vp.renderer.line([(int(sx), int(sy), int(ex), int(ey))], self.color)
+        vp.commands.add(LINE, (sx, sy, ex, ey), self.color, self.layer)
+
+    def get_bounds(self) -> Bounds:
+        (sx, sy), (ex, ey) = self.end_points
+        return min(sx, ex), min(sy, ey), max(sx, ex), max(sy, ey)
+
+
+def _coords_bounds(coords: typing.Any) -> Bounds:
+    xs, ys = coords[0::2], coords[1::2]
+    return min(xs), min(ys), max(xs), max(ys)
 
 
 class Polygon(GFXObject):
     points: typing.Iterable[tuple[float, float]]
 
     def draw(self, vp: "ViewPort") -> None:
-        vp.renderer.filled_polygon(
-            [[vp.to_view_int(p) for p in self.points]], self.color
-        )
+        coords = [c for p in self.points for c in p]
+        if self.previous_transform is not None and vp.alpha < 1:
+            # Shift the outline along with the interpolated position
+            (ix, iy), _ = self.interpolated(vp.alpha)
+            x, y = self.position
+            dx, dy = ix - x, iy - y
+            coords = [c + (dy if i & 1 else dx) for i, c in enumerate(coords)]
+        coords = vp.to_view_many(coords)
+        lod = vp.lod
+        if lod is not None and coords:
+            minx, miny, maxx, maxy = _coords_bounds(coords)
+            radius = max(maxx - minx, maxy - miny) / 2
+            cx, cy = (minx + maxx) / 2, (miny + maxy) / 2
+            if lod.simplify(vp, cx, cy, radius, self.color, self.layer):
+                return
+        vp.commands.add(FILLED_POLYGON, coords, self.color, self.layer)
+
+    def get_bounds(self) -> Bounds:
+        points = list(self.points)
+        if not points:
+            return super().get_bounds()
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        return min(xs), min(ys), max(xs), max(ys)
+
+
+class Polyline(GFXObject):
+    """Connected lines through flat (x0, y0, x1, y1, ...) world coordinates."""
+
+    coords: typing.Any  # array('d'), NumPy array or sequence of floats
+    width: float = 1  # in pixels
+
+    def draw(self, vp: "ViewPort") -> None:
+        coords = vp.to_view_many(self.coords)
+        vp.commands.add(POLYLINE, (coords, self.width), self.color, self.layer)
+
+    def get_bounds(self) -> Bounds:
+        if len(self.coords) < 2:
+            return super().get_bounds()
+        return _coords_bounds(self.coords)
+
+
+class PointField(GFXObject):
+    """Single pixels at flat (x0, y0, x1, y1, ...) world coordinates."""
+
+    coords: typing.Any  # array('d'), NumPy array or sequence of floats
+
+    def draw(self, vp: "ViewPort") -> None:
+        coords = vp.to_view_many(self.coords)
+        vp.commands.add(POINTS, coords, self.color, self.layer)
+
+    def get_bounds(self) -> Bounds:
+        if len(self.coords) < 2:
+            return super().get_bounds()
+        return _coords_bounds(self.coords)
 
 
 class Circle(GFXObject):
     radius: float
 
     def draw(self, vp: "ViewPort") -> None:
-        r = int(vp.d_to_view(self.radius))
-        px, py = vp.to_view_int(self.position)
-        polar_vec = Vector.polar(r, self.angle)
+        radius = vp.d_to_view(self.radius)
+        position, angle = self.interpolated(vp.alpha)
+        x, y = vp.to_view(position)
+        lod = vp.lod
+        if lod is not None and lod.simplify(vp, x, y, radius, self.color, self.layer):
+            return
+        r = int(radius)
+        px, py = int(x), int(y)
+        vp.commands.add(FILLED_CIRCLE, (px, py, r), self.color, self.layer)
+        if lod is not None and radius < lod.orientation_radius:
+            return
+        polar_vec = Vector.polar(r, angle)
         lx, ly = int(px + polar_vec.x), int(py + polar_vec.y)
-        vp.renderer.filled_circle([(px, py, r)], self.color)
-        vp.renderer.line([(px, py, lx, ly)], sdl2.ext.Color(0, 0, 0))
+        vp.commands.add(
+            LINE, (px, py, lx, ly), ORIENTATION_COLOR, self.layer, sublayer=1
+        )
+
+    def get_bounds(self) -> Bounds:
+        px, py = self.position
+        r = self.radius
+        return px - r, py - r, px + r, py + r
 
 
 from .viewport import ViewPort  # noqa
@@ -0,0 +1,65 @@
+import typing
+
+from .commands import BOX, PIXEL
+
+if typing.TYPE_CHECKING:
+    from .viewport import ViewPort
+
+
+class LevelOfDetail:
+    """Thresholds for drawing small objects with cheaper primitives.
+
+    Thresholds are projected radii in pixels. Objects below `subpixel_radius`
+    are skipped, or with `aggregate` merged into one pixel per screen pixel,
+    objects below `point_radius` become pixels and below `box_radius` filled
+    boxes. Circles drop their orientation line below `orientation_radius`.
+    """
+
+    def __init__(
+        self,
+        subpixel_radius: float = 0.5,
+        point_radius: float = 1.0,
+        box_radius: float = 2.0,
+        orientation_radius: float = 4.0,
+        aggregate: bool = True,
+    ) -> None:
+        self.subpixel_radius = subpixel_radius
+        self.point_radius = point_radius
+        self.box_radius = box_radius
+        self.orientation_radius = orientation_radius
+        self.aggregate = aggregate
+        self.simplified = 0  # objects drawn simplified since the last reset
+        self._occupied: set[tuple[int, int]] = set()
+
+    def reset(self) -> None:
+        """Starts a new frame."""
+        self.simplified = 0
+        self._occupied.clear()
+
+    def simplify(
+        self,
+        vp: "ViewPort",
+        x: float,
+        y: float,
+        radius: float,
+        color: typing.Any,
+        layer: float = 0,
+    ) -> bool:
+        """Queues a cheap stand-in for an object at view (x, y).
+
+        Returns False when the object is big enough to be drawn in full.
+        """
+        if radius >= self.box_radius:
+            return False
+        self.simplified += 1
+        px, py = int(x), int(y)
+        if radius < self.subpixel_radius:
+            if self.aggregate and (px, py) not in self._occupied:
+                self._occupied.add((px, py))
+                vp.commands.add(PIXEL, (px, py), color, layer)
+        elif radius < self.point_radius:
+            vp.commands.add(PIXEL, (px, py), color, layer)
+        else:
+            r = int(radius)
+            vp.commands.add(BOX, (px - r, py - r, px + r, py + r), color, layer)
+        return True
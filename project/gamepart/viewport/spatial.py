@@ -0,0 +1,104 @@
+import typing
+
+T = typing.TypeVar("T")
+
+Bounds = tuple[float, float, float, float]  # minx, miny, maxx, maxy
+_CellRange = tuple[int, int, int, int]
+
+
+class SpatialGrid(typing.Generic[T]):
+    """Uniform grid of axis aligned bounding boxes.
+
+    Every object is stored in all cells its bounds overlap. Objects spanning
+    more than `max_cells` cells are kept in a separate list returned by every
+    query instead of being spread over the grid.
+    """
+
+    def __init__(self, cell_size: float = 256.0, max_cells: int = 64) -> None:
+        self.cell_size = cell_size
+        self.max_cells = max_cells
+        self._cells: dict[tuple[int, int], dict[T, None]] = {}
+        self._ranges: dict[T, _CellRange | None] = {}
+        self._oversized: dict[T, None] = {}
+
+    def __len__(self) -> int:
+        return len(self._ranges)
+
+    def __contains__(self, obj: T) -> bool:
+        return obj in self._ranges
+
+    def cell_range(self, bounds: Bounds) -> _CellRange:
+        size = self.cell_size
+        minx, miny, maxx, maxy = bounds
+        return (
+            int(minx // size),
+            int(miny // size),
+            int(maxx // size),
+            int(maxy // size),
+        )
+
+    def insert(self, obj: T, bounds: Bounds) -> None:
+        if obj in self._ranges:
+            self.remove(obj)
+        cells = self.cell_range(bounds)
+        x1, y1, x2, y2 = cells
+        if (x2 - x1 + 1) * (y2 - y1 + 1) > self.max_cells:
+            self._ranges[obj] = None
+            self._oversized[obj] = None
+            return
+        self._ranges[obj] = cells
+        for cx in range(x1, x2 + 1):
+            for cy in range(y1, y2 + 1):
+                cell = self._cells.get((cx, cy))
+                if cell is None:
+                    cell = self._cells[(cx, cy)] = {}
+                cell[obj] = None
+
+    def remove(self, obj: T) -> None:
+        cells = self._ranges.pop(obj)
+        if cells is None:
+            del self._oversized[obj]
+            return
+        x1, y1, x2, y2 = cells
+        for cx in range(x1, x2 + 1):
+            for cy in range(y1, y2 + 1):
+                cell = self._cells[(cx, cy)]
+                del cell[obj]
+                if not cell:
+                    del self._cells[(cx, cy)]
+
+    def update(self, obj: T, bounds: Bounds) -> bool:
+        """Moves obj to new bounds, returns whether its cells changed."""
+        cells = self._ranges.get(obj)
+        if cells is not None and cells == self.cell_range(bounds):
+            return False
+        self.insert(obj, bounds)
+        return True
+
+    def query(self, bounds: Bounds) -> typing.Iterator[T]:
+        """Yields objects in cells overlapping bounds, each once."""
+        yield from self._oversized
+        x1, y1, x2, y2 = self.cell_range(bounds)
+        cells = self._cells
+        if (x2 - x1 + 1) * (y2 - y1 + 1) > len(cells):
+            # Query is bigger than the populated area, walk cells directly
+            keys: typing.Iterable[tuple[int, int]] = [
+                key for key in cells if x1 <= key[0] <= x2 and y1 <= key[1] <= y2
+            ]
+        else:
+            keys = [(cx, cy) for cx in range(x1, x2 + 1) for cy in range(y1, y2 + 1)]
+        seen: set[T] = set()
+        for key in keys:
+            cell = cells.get(key)
+            if cell is None:
+                continue
+            for obj in cell:
+                if obj in seen:
+                    continue
+                seen.add(obj)
+                yield obj
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._ranges.clear()
+        self._oversized.clear()
@@ -1,11 +1,49 @@
 import typing
+from array import array
 
 from gamepart.render import GfxRenderer
 from gamepart.subsystem import SubSystem
 
+from .commands import DrawCommands
+from .lod import LevelOfDetail
+from .spatial import SpatialGrid
+
+
+def transform_coords(
+    coords: typing.Any, sx: float, tx: float, sy: float, ty: float
+) -> typing.Any:
+    """Applies x * sx + tx, y * sy + ty to flat interleaved coordinates.
+
+    Sequences and array.array buffers give an array('d') (array('f') input
+    stays float32), NumPy arrays give a new array of the same shape.
+    """
+    if isinstance(coords, array | list | tuple):
+        typecode = "f" if isinstance(coords, array) and coords.typecode == "f" else "d"
+        out = array(typecode, coords)
+        out[0::2] = array(typecode, [x * sx + tx for x in out[0::2]])
+        out[1::2] = array(typecode, [y * sy + ty for y in out[1::2]])
+        return out
+    out = coords * 1.0  # NumPy style array, copied as floats
+    flat = out.reshape(-1)
+    flat[0::2] *= sx
+    flat[0::2] += tx
+    flat[1::2] *= sy
+    flat[1::2] += ty
+    return out
+
 
 class ViewPort(SubSystem["GraphicalObject"]):
-    __slots__ = ("renderer", "width", "height", "zoom", "x", "y")
+    __slots__ = (
+        "renderer",
+        "width",
+        "height",
+        "zoom",
+        "x",
+        "y",
+        "commands",
+        "alpha",
+        "lod",
+    )
 
     def __init__(
         self,
@@ -23,14 +61,20 @@ class ViewPort(SubSystem["GraphicalObject"]):
         self.zoom = zoom
         self.x = x
         self.y = y
+        self.commands = DrawCommands()
+        self.alpha = 1.0  # interpolation between physics steps, see TimeFeeder
+        self.lod: LevelOfDetail | None = LevelOfDetail()  # None draws full detail
 
     @staticmethod
     def accepts(obj: typing.Any) -> bool:
         return isinstance(obj, GraphicalObject)
 
     def draw(self) -> None:
+        if self.lod is not None:
+            self.lod.reset()
         for obj in self.objects:
             obj.draw(self)
+        self.commands.flush(self.renderer)
 
     def x_to_view(self, x: float) -> float:
         return (x - self.x) * self.zoom
@@ -59,6 +103,23 @@ class ViewPort(SubSystem["GraphicalObject"]):
     def d_to_world(self, d: float) -> float:
         return d / self.zoom
 
+    def view_transform(self) -> tuple[float, float, float, float]:
+        """World to view transform as (sx, tx, sy, ty).
+
+        View coordinates are x * sx + tx and y * sy + ty.
+        """
+        zoom = self.zoom
+        return zoom, -self.x * zoom, zoom, -self.y * zoom
+
+    def to_view_many(self, coords: typing.Any) -> typing.Any:
+        """Transforms flat (x0, y0, x1, y1, ...) world coordinates to view."""
+        return transform_coords(coords, *self.view_transform())
+
+    def to_world_many(self, coords: typing.Any) -> typing.Any:
+        """Transforms flat (x0, y0, x1, y1, ...) view coordinates to world."""
+        sx, tx, sy, ty = self.view_transform()
+        return transform_coords(coords, 1 / sx, -tx / sx, 1 / sy, -ty / sy)
+
     @property
     def center(self) -> tuple[float, float]:
         return self.to_world((self.width / 2, self.height / 2))
@@ -69,6 +130,13 @@ class ViewPort(SubSystem["GraphicalObject"]):
         self.x += value[0] - cx
         self.y += value[1] - cy
 
+    @property
+    def world_rect(self) -> tuple[float, float, float, float]:
+        """Visible world area as (minx, miny, maxx, maxy)."""
+        x1, x2 = self.x_to_world(0), self.x_to_world(self.width)
+        y1, y2 = self.y_to_world(0), self.y_to_world(self.height)
+        return min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
+
     def change_zoom(
         self, change: float = 1, pos: tuple[float, float] | None = None
     ) -> None:
@@ -126,9 +194,30 @@ class FlippedViewPort(ViewPort):
     def y_to_world(self, y: float) -> float:
         return ((self.height - y) / self.zoom) + self.y  # flip y
 
+    def view_transform(self) -> tuple[float, float, float, float]:
+        zoom = self.zoom
+        return zoom, -self.x * zoom, -zoom, self.height + self.y * zoom  # flip y
+
 
 class CulledFlippedViewPort(FlippedViewPort):
-    __slots__ = ("renderer", "width", "height", "zoom", "x", "y", "cull_margin")
+    """Flipped viewport drawing only objects near the visible area.
+
+    Object bounds are kept in a SpatialGrid. Static objects are indexed once
+    when added (call `moved` after changing them), others are re-indexed on
+    every draw.
+    """
+
+    __slots__ = (
+        "renderer",
+        "width",
+        "height",
+        "zoom",
+        "x",
+        "y",
+        "cull_margin",
+        "grid",
+        "_dynamic",
+    )
 
     def __init__(
         self,
@@ -139,27 +228,55 @@ class CulledFlippedViewPort(FlippedViewPort):
         x: float = 0,
         y: float = 0,
         cull_margin: float = 100.0,
+        cell_size: float = 256.0,
     ) -> None:
         super().__init__(renderer, width, height, zoom=zoom, x=x, y=y)
         self.cull_margin = cull_margin
+        self.grid: SpatialGrid[GraphicalObject] = SpatialGrid(cell_size)
+        self._dynamic: dict[GraphicalObject, None] = {}
+
+    def add(self, *objects: "GraphicalObject") -> typing.Iterable["GraphicalObject"]:
+        super().add(*objects)
+        for obj in objects:
+            self.grid.insert(obj, obj.get_bounds())
+            if not obj.static:
+                self._dynamic[obj] = None
+        return objects
+
+    def remove(self, *objects: "GraphicalObject") -> typing.Iterable["GraphicalObject"]:
+        for obj in objects:
+            self.grid.remove(obj)
+            self._dynamic.pop(obj, None)
+        return super().remove(*objects)
+
+    def moved(self, *objects: "GraphicalObject") -> None:
+        """Re-indexes objects after their bounds changed."""
+        for obj in objects:
+            self.grid.update(obj, obj.get_bounds())
 
     def _visible_world_rect(self) -> tuple[float, float, float, float]:
         m = self.cull_margin
-        minx = self.x_to_world(0) - m
-        maxx = self.x_to_world(self.width) + m
-        miny = self.y_to_world(self.height) - m
-        maxy = self.y_to_world(0) + m
-        return minx, miny, maxx, maxy
+        minx, miny, maxx, maxy = self.world_rect
+        return minx - m, miny - m, maxx + m, maxy + m
+
+    def visible_objects(self) -> typing.Iterator["GraphicalObject"]:
+        """Objects whose bounds intersect the visible rect."""
+        grid = self.grid
+        for obj in self._dynamic:
+            grid.update(obj, obj.get_bounds())
+        minx, miny, maxx, maxy = rect = self._visible_world_rect()
+        for obj in grid.query(rect):
+            ox1, oy1, ox2, oy2 = obj.get_bounds()
+            if ox2 < minx or ox1 > maxx or oy2 < miny or oy1 > maxy:
+                continue
+            yield obj
 
     def draw(self) -> None:
-        minx, miny, maxx, maxy = self._visible_world_rect()
-        margin = self.cull_margin
-        for obj in self.objects:
-            px, py = obj.position
-            r = getattr(obj, "radius", margin)
-            if px + r < minx or px - r > maxx or py + r < miny or py - r > maxy:
-                continue
+        if self.lod is not None:
+            self.lod.reset()
+        for obj in self.visible_objects():
             obj.draw(self)
+        self.commands.flush(self.renderer)
 
 
 from .graphicalobject import GraphicalObject  # noqa
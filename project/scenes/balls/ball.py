@@ -3,6 +3,7 @@ import typing
 import sdl2.ext
 from gamepart.physics import SimplePhysicalObject, pymunk, typed_property
 from gamepart.viewport import Circle, TexturedObject, ViewPort
+from gamepart.viewport.spatial import Bounds
 
 from .category import cat_enemy, cat_enemy_collide
 
@@ -26,6 +27,25 @@ class Ball(Circle, SimplePhysicalObject[pymunk.Circle]):
         shape.friction = 0.01
         super().__init__(body, shape, cat_enemy)
 
+    def reuse(
+        self,
+        radius: float = 1,
+        mass: float = 1,
+        position: tuple[float, float] = (0, 0),
+        velocity: tuple[float, float] = (0, 0),
+    ) -> None:
+        shape = self.shape
+        shape.unsafe_set_radius(radius)
+        shape.elasticity = 0.9
+        shape.friction = 0.01
+        self.reset_physics(
+            position,
+            velocity,
+            mass=mass,
+            moment=pymunk.moment_for_circle(mass, 0, radius),
+            shape_filter=cat_enemy.filter(cat_enemy_collide),
+        )
+
     @typed_property(float)
     def radius(self) -> float:
         return self.shape.radius
@@ -56,3 +76,8 @@ class TexturedBall(Ball, TexturedObject):
     def draw(self, vp: "ViewPort") -> None:
         Ball.draw(self, vp)
         TexturedObject.draw(self, vp)
+
+    def get_bounds(self) -> Bounds:
+        bx1, by1, bx2, by2 = Ball.get_bounds(self)
+        tx1, ty1, tx2, ty2 = TexturedObject.get_bounds(self)
+        return min(bx1, tx1), min(by1, ty1), max(bx2, tx2), max(by2, ty2)
@@ -1,9 +1,11 @@
+import typing
+
 import pymunk
 from gamepart.chunk import Chunk, ChunkManager
 from gamepart.noise import PerlinNoise
 from gamepart.subsystem import SystemManager
 
-from .line import BoundLine
+from .terrain import ChunkTerrain
 
 TERRAIN_BASE_Y = 50.0
 TERRAIN_DETAIL_AMPLITUDE = 200.0
@@ -17,8 +19,10 @@ class TerrainChunkManager(ChunkManager[Chunk]):
         static_body: pymunk.Body,
         seed: int = 42,
         chunk_size: int = 1000,
+        render_cache: bool = True,
+        workers: int = 0,
     ) -> None:
-        super().__init__(system, chunk_size)
+        super().__init__(system, chunk_size, render_cache, workers)
         self._static_body = static_body
 
         self._noise_detail = PerlinNoise(
@@ -34,9 +38,13 @@ class TerrainChunkManager(ChunkManager[Chunk]):
             scale=1000.0,
         )
 
-    def _load_chunk(self, coord: tuple[int, int]) -> Chunk:
+    def _generate_chunk(self, coord: tuple[int, int]) -> typing.Any:
+        return self._generate_runs(coord)
+
+    def _build_chunk(self, coord: tuple[int, int], data: typing.Any) -> Chunk:
         chunk = Chunk(coord)
-        chunk.objects.extend(self._generate_terrain(coord))
+        if data:
+            chunk.objects.append(ChunkTerrain(self._static_body, data))
         return chunk
 
     def get_terrain_height(self, x: float) -> float:
@@ -62,7 +70,7 @@ class TerrainChunkManager(ChunkManager[Chunk]):
         y_overlaps = y_min < chunk_y_end and y_max >= chunk_y_start
         return x_overlaps and y_overlaps
 
-    def _generate_terrain(self, coord: tuple[int, int]) -> list[BoundLine]:
+    def _generate_runs(self, coord: tuple[int, int]) -> list[list[tuple[float, float]]]:
         chunk_x, chunk_y = coord
         chunk_x_start = chunk_x * self._chunk_size
         chunk_x_end = chunk_x_start + self._chunk_size
@@ -70,7 +78,9 @@ class TerrainChunkManager(ChunkManager[Chunk]):
         chunk_y_end = chunk_y_start + self._chunk_size
         step = 50
 
-        lines: list[BoundLine] = []
+        # Connected points of segments overlapping the chunk
+        runs: list[list[tuple[float, float]]] = []
+        run: list[tuple[float, float]] = []
         x1, y1 = float(chunk_x_start), self.get_terrain_height(float(chunk_x_start))
         for x in range(chunk_x_start + step, chunk_x_end + step, step):
             x2, y2 = float(x), self.get_terrain_height(float(x))
@@ -78,9 +88,13 @@ class TerrainChunkManager(ChunkManager[Chunk]):
             if self._line_overlaps_chunk(
                 x1, y1, x2, y2, chunk_x_start, chunk_x_end, chunk_y_start, chunk_y_end
             ):
-                line = BoundLine(self._static_body, x1, y1, x2, y2)
-                lines.append(line)
+                if not run:
+                    run.append((x1, y1))
+                    runs.append(run)
+                run.append((x2, y2))
+            else:
+                run = []
 
             x1, y1 = x2, y2
 
-        return lines
+        return runs
@@ -9,6 +9,7 @@ from .category import cat_terrain, cat_terrain_collide
 
 class BoundLine(Line, SimplePhysicalObject[pymunk.Segment]):
     color = sdl2.ext.Color(255, 0, 0)
+    static = True
 
     def __init__(
         self, static_body: pymunk.Body, p1x: float, p1y: float, p2x: float, p2y: float
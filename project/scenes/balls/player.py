@@ -40,6 +40,7 @@ class Player(Polygon, CollisionObject, AwareObject):
         self.feet.friction = 10.0
         self.feet.elasticity = 0.0
         self.on_ground = False
+        self.touched_ground = False  # set by collide during the physics step
         super().__init__(body, [self.head, self.feet], cat_player)
 
     @property
@@ -65,11 +66,12 @@ class Player(Polygon, CollisionObject, AwareObject):
         raise NotImplementedError()
 
     def tick(self, delta: float) -> None:
-        self.on_ground = False
+        self.on_ground = self.touched_ground
+        self.touched_ground = False
 
     def collide(self, arbiter: pymunk.Arbiter, other: "PhysicalObject") -> bool:
         if cat_terrain in other.category and arbiter.contact_point_set.normal.y < -0.1:
-            self.on_ground = True
+            self.touched_ground = True
             return True
         return False
 
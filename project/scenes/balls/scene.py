@@ -5,7 +5,7 @@ import sdl2
 import sdl2.ext
 from context import MyContext
 from gamepart.context import Context
-from gamepart.physics import PhysicalObject, World, pymunk
+from gamepart.physics import PhysicalObject, PhysicsPool, World, pymunk
 from gamepart.physics.vector import Vector
 from gamepart.render import GfxRenderer
 from gamepart.viewport import FlippedViewPort, ViewPort
@@ -13,6 +13,7 @@ from gamepart.viewport import FlippedViewPort, ViewPort
 from scenes.base import MyBaseScene
 
 from .ball import Ball, TexturedBall
+from .category import cat_enemy
 from .chunk import TerrainChunkManager
 from .player import Player, PlayerController
 from .ui import create_ui
@@ -31,6 +32,7 @@ class BallScene(MyBaseScene):
         self.player_ctrl: PlayerController
         self.terrain_chunk_manager: TerrainChunkManager
         self.last_click: tuple[float, float] = (0, 0)
+        self.ball_pool: PhysicsPool[Ball] = PhysicsPool(Ball)
 
     def init(self) -> None:
         super().init()
@@ -86,10 +88,13 @@ class BallScene(MyBaseScene):
         self.chunk_manager = TerrainChunkManager(
             self.system,
             self.world.space.static_body,
+            workers=1,
         )
         self.chunk_manager.update(self.player.position)
+        self.chunk_manager.finish_pending()
 
     def stop(self) -> MyContext:
+        self.chunk_manager.shutdown()
         self.system.clear_all()
         return super().stop()
 
@@ -112,18 +117,17 @@ class BallScene(MyBaseScene):
         p = Vector(*self.last_click)
         v = (Vector(*click) - p) * 4
         self.system.add_all(
-            Ball(position=p.to_tuple(), velocity=v.to_tuple(), radius=30, mass=20)
+            self.ball_pool.acquire(
+                position=p.to_tuple(), velocity=v.to_tuple(), radius=30, mass=20
+            )
         )
 
     def delete_ball(self, event: sdl2.SDL_Event) -> None:
-        pos = Vector.to(self.viewport.to_world((event.button.x, event.button.y)))
-        rem = None
-        for c in self.world.get_objects(Ball):
-            if (pos - c.position).r <= c.radius:
-                rem = c
+        pos = self.viewport.to_world((event.button.x, event.button.y))
+        for obj in self.world.point_query(pos, categories=cat_enemy):
+            if isinstance(obj, Ball):
+                self.system.remove_all(obj)
                 break
-        if rem is not None:
-            self.system.remove_all(rem)
 
     def switch_to_test(self, _: typing.Any = None) -> None:
         self.game.queue_scene_switch("test")
@@ -147,17 +151,22 @@ class BallScene(MyBaseScene):
         self.player_ctrl.input.shoot = bool(self.game.key_state[scancode_shoot])
         self.player_ctrl.control(self.game.world_time, delta)
         self.world.tick(delta)
-        self.chunk_manager.update(self.player.position)
+        body = self.player.body
+        self.chunk_manager.update(
+            self.player.position, velocity=body.velocity if body else None
+        )
         self._update_fallen_objects()
         self._update_camera(delta)
 
     def every_frame(self, renderer: GfxRenderer) -> None:
         renderer.clear(self.bg_color)
+        self.world.update_transforms()
+        self.viewport.alpha = self.game.feeder.alpha
         self.viewport.draw()
         self.gui.draw()
 
     def _update_fallen_objects(self) -> None:
-        for obj in self.world.get_objects(PhysicalObject):
+        for obj in list(self.world.get_objects(PhysicalObject)):
             if obj.body is None or obj.body.body_type == pymunk.Body.STATIC:
                 continue
             current_x, current_y = obj.position
@@ -0,0 +1,77 @@
+import typing
+from array import array
+
+import sdl2.ext
+from gamepart.physics import PhysicalObject, pymunk
+from gamepart.viewport import GFXObject, ViewPort
+from gamepart.viewport.commands import POLYLINE
+from gamepart.viewport.spatial import Bounds
+
+from .category import cat_terrain, cat_terrain_collide
+
+
+class ChunkTerrain(GFXObject, PhysicalObject):
+    """All terrain segments of a chunk as one object.
+
+    Runs of connected points become static segments added to the space in one
+    batch and drawn as one polyline per run.
+    """
+
+    color = sdl2.ext.Color(255, 0, 0)
+    static = True
+    width: float = 1  # in pixels
+
+    def __init__(
+        self,
+        static_body: pymunk.Body,
+        runs: typing.Iterable[typing.Sequence[tuple[float, float]]],
+    ) -> None:
+        self.runs: list[array] = [
+            array("d", [c for point in run for c in point])
+            for run in runs
+            if len(run) >= 2
+        ]
+        shapes = []
+        for coords in self.runs:
+            for i in range(0, len(coords) - 2, 2):
+                shape = pymunk.Segment(
+                    static_body,
+                    (coords[i], coords[i + 1]),
+                    (coords[i + 2], coords[i + 3]),
+                    0.0,
+                )
+                shape.filter = cat_terrain.filter(cat_terrain_collide)
+                shape.elasticity = 1.0
+                shape.friction = 1.0
+                shapes.append(shape)
+        super().__init__(None, shapes, cat_terrain)
+        self._bounds: Bounds = (0.0, 0.0, 0.0, 0.0)
+        if self.runs:
+            xs = [x for coords in self.runs for x in coords[0::2]]
+            ys = [y for coords in self.runs for y in coords[1::2]]
+            self._bounds = min(xs), min(ys), max(xs), max(ys)
+
+    @property
+    def position(self) -> tuple[float, float]:
+        minx, miny, maxx, maxy = self.get_bounds()
+        return (minx + maxx) / 2, (miny + maxy) / 2
+
+    @position.setter
+    def position(self, value: tuple[float, float]) -> None:
+        raise NotImplementedError()
+
+    @property
+    def angle(self) -> float:
+        return 0.0
+
+    @angle.setter
+    def angle(self, value: float) -> None:
+        raise NotImplementedError()
+
+    def draw(self, vp: "ViewPort") -> None:
+        for coords in self.runs:
+            view_coords = vp.to_view_many(coords)
+            vp.commands.add(POLYLINE, (view_coords, self.width), self.color, self.layer)
+
+    def get_bounds(self) -> Bounds:
+        return self._bounds
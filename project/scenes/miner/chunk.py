@@ -1,10 +1,12 @@
 import math
+import struct
+import typing
 
-from gamepart.chunk import Chunk, ChunkManager
+from gamepart.chunk import Chunk, ChunkManager, ChunkStore
 from gamepart.noise import PerlinNoise
 from gamepart.subsystem import SystemManager
 
-from .patch import ResourcePatch, ResourceType
+from .patch import ResourceMarker, ResourcePatch, ResourceType
 
 PATCH_GRID_STEP = 80
 RICHNESS_BASE = 20
@@ -14,6 +16,26 @@ RICHNESS_MIN = 10
 RICHNESS_MAX = 500
 PATCH_THRESHOLD = 0.35
 TYPE_SCALE = 200.0
+# x, y, index in RESOURCE_TYPES, richness of a stored patch
+PATCH_STRUCT = struct.Struct("<ddBi")
+RESOURCE_TYPES: tuple[ResourceType, ...] = ("iron", "copper", "coal")
+# Coarse chunks, used below COARSE_ZOOM, span COARSE_CHUNK_FACTOR detailed
+# chunks per side and place markers COARSE_GRID_STEP apart where the first
+# octave of the patch noise reaches COARSE_THRESHOLD
+COARSE_ZOOM = 0.25
+COARSE_CHUNK_FACTOR = 8
+COARSE_GRID_STEP = 256
+COARSE_THRESHOLD = 0.2
+COARSE_MARKER_RADIUS = 0.3  # of COARSE_GRID_STEP, at full strength
+
+
+def pick_resource_type(iron: float, copper: float, coal: float) -> ResourceType:
+    """Resource with the highest type noise value."""
+    if iron >= copper and iron >= coal:
+        return "iron"
+    if copper >= coal:
+        return "copper"
+    return "coal"
 
 
 class ResourceChunk(Chunk):
@@ -28,8 +50,24 @@ class ResourceChunkManager(ChunkManager[ResourceChunk]):
         system: SystemManager,
         seed: int = 42,
         chunk_size: int = 512,
+        render_cache: bool = True,
+        workers: int = 0,
+        store: ChunkStore | None = None,
+        coarse: ChunkManager[typing.Any] | None = None,
     ) -> None:
-        super().__init__(system, chunk_size)
+        super().__init__(
+            system,
+            chunk_size,
+            render_cache,
+            workers,
+            load_rings=2,
+            unload_rings=3,
+            cache_size=32,
+            store=store,
+            view_rings=1,
+            coarse=coarse,
+            coarse_zoom=COARSE_ZOOM,
+        )
         self._noise_patch = PerlinNoise(
             seed=seed,
             octaves=4,
@@ -55,17 +93,8 @@ class ResourceChunkManager(ChunkManager[ResourceChunk]):
             scale=TYPE_SCALE,
         )
 
-    def update(self, center: tuple[float, float], rings: int = 2) -> None:
-        center_chunk = self.get_chunk_coord(center)
-        required = self.get_required_chunks(
-            (center_chunk[0], center_chunk[1]), rings=rings
-        )
-        loaded = set(self._loaded_chunks.keys())
-        for coord in required - loaded:
-            self.load_chunk(coord)
-
-    def _load_chunk(self, coord: tuple[int, int]) -> ResourceChunk:
-        chunk = ResourceChunk(coord)
+    def _generate_chunk(self, coord: tuple[int, int]) -> typing.Any:
+        patches: list[tuple[float, float, ResourceType, int]] = []
         cx, cy = coord
         x_start = cx * self._chunk_size
         y_start = cy * self._chunk_size
@@ -85,26 +114,40 @@ class ResourceChunkManager(ChunkManager[ResourceChunk]):
                         + (patch_val + 1) * 0.5 * RICHNESS_NOISE_SCALE
                     )
                     richness = int(max(RICHNESS_MIN, min(RICHNESS_MAX, richness_raw)))
-                    patch = ResourcePatch(
-                        position=(float(x), float(y)),
-                        resource_type=resource_type,
-                        richness=richness,
-                    )
-                    chunk.patches.append(patch)
-                    chunk.objects.append(patch)
+                    patches.append((float(x), float(y), resource_type, richness))
                 y += PATCH_GRID_STEP
             x += PATCH_GRID_STEP
+        return patches
+
+    def _build_chunk(self, coord: tuple[int, int], data: typing.Any) -> ResourceChunk:
+        chunk = ResourceChunk(coord)
+        for x, y, resource_type, richness in data:
+            patch = ResourcePatch(
+                position=(x, y), resource_type=resource_type, richness=richness
+            )
+            chunk.patches.append(patch)
+            chunk.objects.append(patch)
         return chunk
 
+    def _encode_chunk(self, chunk: ResourceChunk) -> bytes:
+        pack = PATCH_STRUCT.pack
+        return b"".join(
+            pack(*p.position, RESOURCE_TYPES.index(p.resource_type), p.richness)
+            for p in chunk.patches
+        )
+
+    def _decode_chunk(self, coord: tuple[int, int], data: bytes) -> typing.Any:
+        return [
+            (x, y, RESOURCE_TYPES[index], richness)
+            for x, y, index, richness in PATCH_STRUCT.iter_unpack(data)
+        ]
+
     def _type_from_noise(self, x: float, y: float) -> ResourceType:
-        iron_val = self._noise_iron.get2d(x, y)
-        copper_val = self._noise_copper.get2d(x, y)
-        coal_val = self._noise_coal.get2d(x, y)
-        if iron_val >= copper_val and iron_val >= coal_val:
-            return "iron"
-        if copper_val >= coal_val:
-            return "copper"
-        return "coal"
+        return pick_resource_type(
+            self._noise_iron.get2d(x, y),
+            self._noise_copper.get2d(x, y),
+            self._noise_coal.get2d(x, y),
+        )
 
     def get_patch_at(self, world_pos: tuple[float, float]) -> ResourcePatch | None:
         for chunk in self._loaded_chunks.values():
@@ -112,3 +155,69 @@ class ResourceChunkManager(ChunkManager[ResourceChunk]):
                 if patch.contains_point(world_pos):
                     return patch
         return None
+
+
+class CoarseResourceChunk(Chunk):
+    def __init__(self, coord: tuple[int, int]) -> None:
+        super().__init__(coord)
+        self.markers: list[ResourceMarker] = []
+
+
+class CoarseResourceChunkManager(ChunkManager[CoarseResourceChunk]):
+    """Markers of where resources are, for views zoomed out past COARSE_ZOOM.
+
+    Uses the first octave of the noises ResourceChunkManager places patches
+    with, on a grid COARSE_GRID_STEP apart, so a chunk covering the area of
+    COARSE_CHUNK_FACTOR ** 2 detailed chunks samples the noise about as many
+    times as a single detailed chunk. Markers show the large scale layout of
+    the resources, not individual patches, and do not reflect depletion.
+    """
+
+    def __init__(
+        self,
+        system: SystemManager,
+        seed: int = 42,
+        chunk_size: int = 512 * COARSE_CHUNK_FACTOR,
+        render_cache: bool = True,
+        workers: int = 0,
+    ) -> None:
+        super().__init__(system, chunk_size, render_cache, workers)
+        self._noise_patch = PerlinNoise(seed=seed, octaves=1, scale=180.0)
+        self._noise_iron = PerlinNoise(seed=seed + 1000, octaves=1, scale=TYPE_SCALE)
+        self._noise_copper = PerlinNoise(seed=seed + 2000, octaves=1, scale=TYPE_SCALE)
+        self._noise_coal = PerlinNoise(seed=seed + 3000, octaves=1, scale=TYPE_SCALE)
+
+    def _generate_chunk(self, coord: tuple[int, int]) -> typing.Any:
+        markers: list[tuple[float, float, ResourceType, float]] = []
+        size = self._chunk_size
+        x_start = coord[0] * size
+        y_start = coord[1] * size
+        max_radius = COARSE_GRID_STEP * COARSE_MARKER_RADIUS
+        for x in range(
+            x_start + COARSE_GRID_STEP // 2, x_start + size, COARSE_GRID_STEP
+        ):
+            for y in range(
+                y_start + COARSE_GRID_STEP // 2, y_start + size, COARSE_GRID_STEP
+            ):
+                value = self._noise_patch.get2d(x, y)
+                if value < COARSE_THRESHOLD:
+                    continue
+                strength = (value - COARSE_THRESHOLD) / (1 - COARSE_THRESHOLD)
+                resource_type = pick_resource_type(
+                    self._noise_iron.get2d(x, y),
+                    self._noise_copper.get2d(x, y),
+                    self._noise_coal.get2d(x, y),
+                )
+                radius = max_radius * (0.5 + 0.5 * strength)
+                markers.append((float(x), float(y), resource_type, radius))
+        return markers
+
+    def _build_chunk(
+        self, coord: tuple[int, int], data: typing.Any
+    ) -> CoarseResourceChunk:
+        chunk = CoarseResourceChunk(coord)
+        for x, y, resource_type, radius in data:
+            marker = ResourceMarker((x, y), resource_type, radius)
+            chunk.markers.append(marker)
+            chunk.objects.append(marker)
+        return chunk
@@ -21,6 +21,8 @@ def _miner_points(
 
 
 class Miner(Polygon):
+    static = True
+
     def __init__(self, patch: "ResourcePatch") -> None:
         super().__init__()
         self.patch = patch
@@ -20,6 +20,8 @@ def richness_to_radius(richness: int) -> float:
 
 
 class ResourcePatch(Circle):
+    static = True
+
     def __init__(
         self,
         position: tuple[float, float],
@@ -42,3 +44,22 @@ class ResourcePatch(Circle):
         dx = world_pos[0] - self.position[0]
         dy = world_pos[1] - self.position[1]
         return math.hypot(dx, dy) <= self.radius
+
+
+class ResourceMarker(Circle):
+    """Patches around a point of a coarse chunk, drawn as one circle."""
+
+    static = True
+
+    def __init__(
+        self,
+        position: tuple[float, float],
+        resource_type: ResourceType,
+        radius: float,
+    ) -> None:
+        super().__init__()
+        self.position = position
+        self.angle = 0.0
+        self.resource_type = resource_type
+        self.radius = radius
+        self.color = RESOURCE_COLORS[resource_type]
@@ -3,6 +3,7 @@ import typing
 import sdl2
 import sdl2.ext
 from context import MyContext
+from gamepart.chunk import ChunkStore
 from gamepart.context import Context
 from gamepart.gui.text import Text
 from gamepart.render import GfxRenderer
@@ -10,7 +11,7 @@ from gamepart.viewport import CulledFlippedViewPort, ViewPort
 
 from scenes.base import MyBaseScene
 
-from .chunk import ResourceChunkManager
+from .chunk import CoarseResourceChunkManager, ResourceChunkManager
 from .miner_entity import Miner
 from .patch import ResourceType
 from .ui import create_resource_panel
@@ -48,6 +49,7 @@ class MinerScene(MyBaseScene):
         self._copper: int = STARTING_COPPER
         self._coal: int = STARTING_COAL
         self._timer_acc: float = 0.0
+        self._camera_velocity: tuple[float, float] = (0.0, 0.0)
         self._panel: typing.Any = None
         self._iron_text: typing.Any = None
         self._iron_per_sec_text: typing.Any = None
@@ -122,8 +124,14 @@ class MinerScene(MyBaseScene):
         )
         self.gui.add(self._patch_tooltip)
         self._patch_tooltip.visible = False
-        self.chunk_manager = ResourceChunkManager(self.system)
-        self.chunk_manager.update((0.0, 0.0), rings=2)
+        self.chunk_manager = ResourceChunkManager(
+            self.system,
+            workers=1,
+            store=ChunkStore(),
+            coarse=CoarseResourceChunkManager(self.system, workers=1),
+        )
+        self.chunk_manager.update_view(self.viewport)
+        self.chunk_manager.finish_pending()
         self.mouse_button_event.on_down(sdl2.SDL_BUTTON_LEFT, self._on_left_click)
         self.mouse_button_event.on_up(sdl2.SDL_BUTTON_RIGHT, self._on_right_click)
         self.event_dispatcher.on(sdl2.SDL_MOUSEWHEEL, self._change_zoom)
@@ -133,6 +141,7 @@ class MinerScene(MyBaseScene):
         )
 
     def stop(self) -> MyContext:
+        self.chunk_manager.shutdown()
         self.system.clear_all()
         return super().stop()
 
@@ -175,6 +184,7 @@ class MinerScene(MyBaseScene):
             dy += 1.0
         if self.game.key_state[sc_down]:
             dy -= 1.0
+        self._camera_velocity = (dx * EDGE_PAN_SPEED, dy * EDGE_PAN_SPEED)
         if dx != 0 or dy != 0:
             move = EDGE_PAN_SPEED * delta
             self.viewport.x += dx * move
@@ -183,33 +193,42 @@ class MinerScene(MyBaseScene):
     def _on_left_click(self, event: sdl2.SDL_Event) -> None:
         if _point_in_panel(self._panel, event.button.x, event.button.y):
             return
-        wx, wy = self._screen_to_world(event.button.x, event.button.y)
-        patch = self.chunk_manager.get_patch_at((wx, wy))
+        self._place_miner(self._screen_to_world(event.button.x, event.button.y))
+
+    def _place_miner(self, position: tuple[float, float]) -> Miner | None:
+        patch = self.chunk_manager.get_patch_at(position)
         if patch is None:
-            return
+            return None
         if any(m.patch is patch for m in self.miners):
-            return
+            return None
         if (
             self.iron < MINER_COST_IRON
             or self.copper < MINER_COST_COPPER
             or self.coal < MINER_COST_COAL
         ):
-            return
+            return None
         self.iron -= MINER_COST_IRON
         self.copper -= MINER_COST_COPPER
         self.coal -= MINER_COST_COAL
         miner = Miner(patch)
         self.miners.append(miner)
         self.system.add_all(miner)
+        # the miner holds the patch, its chunk must come back as the same objects
+        self.chunk_manager.pin(patch.position)
+        return miner
+
+    def _remove_miner(self, miner: Miner) -> None:
+        self.miners.remove(miner)
+        self.system.remove_all(miner)
+        self.chunk_manager.unpin(miner.patch.position)
 
     def _on_right_click(self, event: sdl2.SDL_Event) -> None:
         if _point_in_panel(self._panel, event.button.x, event.button.y):
             return
         wx, wy = self._screen_to_world(event.button.x, event.button.y)
-        for i, miner in enumerate(self.miners):
+        for miner in self.miners:
             if miner.contains_point((wx, wy)):
-                self.miners.pop(i)
-                self.system.remove_all(miner)
+                self._remove_miner(miner)
                 self.iron += MINER_REFUND_IRON
                 self.copper += MINER_REFUND_COPPER
                 self.coal += MINER_REFUND_COAL
@@ -221,7 +240,7 @@ class MinerScene(MyBaseScene):
             self._timer_acc -= PRODUCTION_INTERVAL
             self._run_miner_production()
         self._update_camera(delta)
-        self.chunk_manager.update(self.viewport.center, rings=2)
+        self.chunk_manager.update_view(self.viewport, velocity=self._camera_velocity)
 
     def _run_miner_production(self) -> None:
         to_remove: list[Miner] = []
@@ -236,12 +255,16 @@ class MinerScene(MyBaseScene):
                 self.copper += 1
             else:
                 self.coal += 1
+            radius = int(miner.patch.radius)
             miner.patch.deplete(1)
+            if int(miner.patch.radius) != radius:
+                self.chunk_manager.mark_changed(miner.patch.position)
+            else:
+                self.chunk_manager.mark_dirty(miner.patch.position)
             if miner.patch.richness <= 0:
                 to_remove.append(miner)
         for miner in to_remove:
-            self.miners.remove(miner)
-            self.system.remove_all(miner)
+            self._remove_miner(miner)
 
     def every_frame(self, renderer: GfxRenderer) -> None:
         renderer.clear((30, 30, 35, 255))
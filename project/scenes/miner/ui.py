@@ -19,6 +19,7 @@ def create_resource_panel(
         font="sans",
         font_size=16,
         color=(220, 220, 220, 255),
+        use_atlas=True,
     )
     iron_per_sec_text = Text(
         width=panel_width - 20,
@@ -27,6 +28,7 @@ def create_resource_panel(
         font="sans",
         font_size=14,
         color=(180, 180, 180, 255),
+        use_atlas=True,
     )
     copper_text = Text(
         width=panel_width - 20,
@@ -35,6 +37,7 @@ def create_resource_panel(
         font="sans",
         font_size=16,
         color=(220, 220, 220, 255),
+        use_atlas=True,
     )
     copper_per_sec_text = Text(
         width=panel_width - 20,
@@ -43,6 +46,7 @@ def create_resource_panel(
         font="sans",
         font_size=14,
         color=(180, 180, 180, 255),
+        use_atlas=True,
     )
     coal_text = Text(
         width=panel_width - 20,
@@ -51,6 +55,7 @@ def create_resource_panel(
         font="sans",
         font_size=16,
         color=(220, 220, 220, 255),
+        use_atlas=True,
     )
     coal_per_sec_text = Text(
         width=panel_width - 20,
@@ -59,6 +64,7 @@ def create_resource_panel(
         font="sans",
         font_size=14,
         color=(180, 180, 180, 255),
+        use_atlas=True,
     )
     panel.add_child(iron_text)
     panel.add_child(iron_per_sec_text)
@@ -0,0 +1,80 @@
+"""Integration tests for the headless physics benchmark."""
+
+import io
+import json
+import pathlib
+
+import pytest
+from benchmark import ProfiledWorld, benchmark, build_world, main, print_curve, run
+from scenes.balls.ball import Ball
+from scenes.balls.line import BoundLine
+from scenes.balls.player import Player
+
+
+class TestBuildWorld:
+    """Tests for build_world."""
+
+    def test_builds_requested_objects(self) -> None:
+        """Test the world holds the balls, the terrain and the player."""
+        world = build_world(50, lines=10)
+
+        assert isinstance(world, ProfiledWorld)
+        assert len(list(world.get_objects(Ball))) == 50
+        assert len(list(world.get_objects(BoundLine))) == 14
+        assert len(list(world.get_objects(Player))) == 1
+
+    def test_without_player(self) -> None:
+        """Test the player can be left out."""
+        world = build_world(10, player=False)
+        assert list(world.get_objects(Player)) == []
+
+    def test_times_collision_dispatch(self) -> None:
+        """Test collision callbacks are timed apart from the step."""
+        world = build_world(20, collision_handlers=True)
+        for _ in range(60):
+            world.tick(1 / 60)
+
+        assert world.timings["collisions"] > 0
+        assert world.timings["step"] > world.timings["collisions"]
+        assert world.timings["aware"] > 0
+
+
+class TestRun:
+    """Tests for run and benchmark."""
+
+    def test_run_reports_step_costs(self) -> None:
+        """Test a run reports tick statistics and the split per step."""
+        result = run(20, steps=5)
+
+        assert result["bodies"] == 20
+        assert result["steps"] == 5
+        assert result["tick"]["max"] >= result["tick"]["median"] > 0
+        assert set(result["per_step"]) == {
+            "solver",
+            "collisions",
+            "aware",
+            "bookkeeping",
+        }
+        assert sum(result["per_step"].values()) <= result["tick"]["mean"] * 1.01
+        assert result["bodies_per_second"] > 0
+
+    def test_results_are_json(self) -> None:
+        """Test results survive a JSON round trip and print as a curve."""
+        results = benchmark([5, 10], steps=2)
+        assert json.loads(json.dumps(results)) == results
+        assert [r["bodies"] for r in results["runs"]] == [5, 10]
+
+        out = io.StringIO()
+        print_curve(results, out)
+        assert len(out.getvalue().splitlines()) == 3
+
+    def test_main_writes_output(
+        self, tmp_path: pathlib.Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test the command line writes JSON to the output file."""
+        output = tmp_path / "run.json"
+        main(["--bodies", "5", "--steps", "2", "--no-player", "-o", str(output)])
+
+        results = json.loads(output.read_text())
+        assert results["runs"][0]["options"]["player"] is False
+        assert "bodies" in capsys.readouterr().err
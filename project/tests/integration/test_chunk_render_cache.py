@@ -0,0 +1,164 @@
+"""Integration tests for ChunkRenderCache rendering."""
+
+import ctypes
+from collections.abc import Generator
+
+import pytest
+import sdl2
+import sdl2.ext
+from gamepart.chunk import Chunk, ChunkRenderCache, RenderCacheBudget
+from gamepart.render import GfxRenderer
+from gamepart.viewport import Circle, FlippedViewPort
+
+RED = (255, 0, 0, 255)
+BLACK = (0, 0, 0, 255)
+
+
+@pytest.fixture(scope="module")
+def sdl_init() -> Generator[None, None, None]:
+    """Initialize SDL for the test module."""
+    sdl2.SDL_Init(sdl2.SDL_INIT_VIDEO)
+    yield
+    sdl2.SDL_Quit()
+
+
+@pytest.fixture
+def renderer(sdl_init: None) -> Generator[GfxRenderer, None, None]:
+    """Create a GfxRenderer with a hidden window for testing."""
+    window = sdl2.ext.Window("Test", size=(100, 100), flags=sdl2.SDL_WINDOW_HIDDEN)
+    renderer = GfxRenderer(window)
+    yield renderer
+    renderer.destroy()
+    window.close()
+
+
+def read_pixel(renderer: GfxRenderer, x: int, y: int) -> tuple[int, int, int, int]:
+    """Read back a single RGBA pixel from the renderer."""
+    buf = (ctypes.c_uint8 * 4)()
+    rect = sdl2.SDL_Rect(x, y, 1, 1)
+    sdl2.SDL_RenderReadPixels(
+        renderer.sdlrenderer,
+        ctypes.byref(rect),  # type: ignore[arg-type]
+        sdl2.SDL_PIXELFORMAT_RGBA32,
+        buf,  # type: ignore[arg-type]
+        4,
+    )
+    return buf[0], buf[1], buf[2], buf[3]
+
+
+def make_cache(
+    position: tuple[float, float] = (50.0, 60.0),
+    budget: RenderCacheBudget | None = None,
+) -> ChunkRenderCache:
+    chunk = Chunk((0, 0))
+    circle = Circle()
+    circle.position = position
+    circle.angle = 0.0
+    circle.radius = 10.0
+    circle.color = RED
+    circle.static = True
+    chunk.objects.append(circle)
+    return ChunkRenderCache(chunk, budget=budget)
+
+
+@pytest.fixture
+def cache() -> ChunkRenderCache:
+    return make_cache()
+
+
+class TestChunkRenderCache:
+    """Tests for drawing chunks through a cached texture."""
+
+    def test_draws_cached_objects(
+        self, renderer: GfxRenderer, cache: ChunkRenderCache
+    ) -> None:
+        vp = FlippedViewPort(renderer, 100, 100)
+        renderer.clear(BLACK)
+        vp.add(cache)
+        vp.draw()
+        assert cache.renders == 1
+        assert read_pixel(renderer, 50, 45) == RED
+        assert read_pixel(renderer, 50, 53) == BLACK
+        assert read_pixel(renderer, 5, 5) == BLACK
+        cache.release()
+
+    def test_regenerated_on_threshold_or_change(
+        self, renderer: GfxRenderer, cache: ChunkRenderCache
+    ) -> None:
+        vp = FlippedViewPort(renderer, 100, 100, zoom=0.6)
+        vp.add(cache)
+        vp.draw()
+        vp.zoom = 0.9  # same zoom level, texture is scaled
+        vp.draw()
+        assert cache.renders == 1
+        vp.zoom = 1.5
+        vp.draw()
+        assert cache.renders == 2
+        cache.chunk.changed()
+        vp.draw()
+        assert cache.renders == 3
+        cache.release()
+        assert cache.texture is None
+
+    def test_too_big_draws_directly(
+        self, renderer: GfxRenderer, cache: ChunkRenderCache
+    ) -> None:
+        cache.max_texture_size = 8
+        vp = FlippedViewPort(renderer, 100, 100)
+        renderer.clear(BLACK)
+        vp.add(cache)
+        vp.draw()
+        assert cache.renders == 0
+        assert read_pixel(renderer, 50, 45) == RED
+
+    def test_render_size_is_capped(
+        self, renderer: GfxRenderer, cache: ChunkRenderCache
+    ) -> None:
+        cache.max_texture_size = 40
+        vp = FlippedViewPort(renderer, 100, 100, zoom=1.5)
+        vp.add(cache)
+        vp.draw()
+        assert cache.render_zoom(1.5) == pytest.approx(1.8)
+        assert cache.texture_rect[2] - cache.texture_rect[0] == pytest.approx(40 / 1.8)
+        cache.release()
+
+    def test_budget_releases_least_recently_drawn(self, renderer: GfxRenderer) -> None:
+        size = 24 * 24 * 4
+        budget = RenderCacheBudget(2 * size)
+        caches = [make_cache((x, 60.0), budget) for x in (20.0, 50.0, 80.0)]
+        vp = FlippedViewPort(renderer, 100, 100)
+        for cache in caches:
+            vp.add(cache)
+        vp.draw()
+        renderer.present()
+        assert budget.usage == 3 * size  # all drawn in the same frame
+
+        vp.remove(caches[0])
+        vp.remove(caches[1])
+        vp.draw()
+        renderer.present()
+        other = FlippedViewPort(renderer, 100, 100)
+        other.add(caches[1])
+        caches[1].release()
+        other.draw()
+
+        assert [cache.texture is not None for cache in caches] == [
+            False,
+            True,
+            True,
+        ]
+        assert budget.usage == 2 * size
+        for cache in caches:
+            cache.release()
+        assert budget.usage == 0
+
+    def test_rerendered_after_targets_reset(
+        self, renderer: GfxRenderer, cache: ChunkRenderCache
+    ) -> None:
+        vp = FlippedViewPort(renderer, 100, 100)
+        vp.add(cache)
+        vp.draw()
+        renderer.reset_targets()
+        vp.draw()
+        assert cache.renders == 2
+        cache.release()
@@ -0,0 +1,119 @@
+"""Integration tests for AdvancedFontManager glyph atlases."""
+
+import ctypes
+import os
+from collections.abc import Generator
+
+import pytest
+import sdl2
+import sdl2.ext
+from gamepart.font_manager import AdvancedFontManager, GlyphAtlas
+from gamepart.render import GfxRenderer
+
+FONT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "resources",
+    "Hack-Regular.ttf",
+)
+RED = (255, 0, 0, 255)
+BLACK = (0, 0, 0, 255)
+
+
+@pytest.fixture(scope="module")
+def sdl_init() -> Generator[None, None, None]:
+    """Initialize SDL for the test module."""
+    sdl2.SDL_Init(sdl2.SDL_INIT_VIDEO)
+    yield
+    sdl2.SDL_Quit()
+
+
+@pytest.fixture
+def renderer(sdl_init: None) -> Generator[GfxRenderer, None, None]:
+    """Create a GfxRenderer with a hidden window for testing."""
+    window = sdl2.ext.Window("Test", size=(100, 100), flags=sdl2.SDL_WINDOW_HIDDEN)
+    renderer = GfxRenderer(window)
+    yield renderer
+    renderer.destroy()
+    window.close()
+
+
+@pytest.fixture
+def font_manager(sdl_init: None) -> Generator[AdvancedFontManager, None, None]:
+    font_manager = AdvancedFontManager(FONT_PATH, "console", size=12)
+    yield font_manager
+    font_manager.close_atlases()
+
+
+def read_region(renderer: GfxRenderer, w: int, h: int) -> list[int]:
+    """Read back red channel of the top-left w x h pixels."""
+    buf = (ctypes.c_uint8 * (w * h * 4))()
+    rect = sdl2.SDL_Rect(0, 0, w, h)
+    sdl2.SDL_RenderReadPixels(
+        renderer.sdlrenderer,
+        ctypes.byref(rect),  # type: ignore[arg-type]
+        sdl2.SDL_PIXELFORMAT_RGBA32,
+        buf,  # type: ignore[arg-type]
+        w * 4,
+    )
+    return list(buf[0::4])
+
+
+class TestGlyphAtlas:
+    """Tests for drawing text from a glyph atlas."""
+
+    def test_atlas_is_shared(
+        self, renderer: GfxRenderer, font_manager: AdvancedFontManager
+    ) -> None:
+        atlas = font_manager.get_atlas(renderer, "console", 12)
+        assert isinstance(atlas, GlyphAtlas)
+        assert font_manager.get_atlas(renderer, "console", 12) is atlas
+        assert font_manager.get_atlas(renderer, "console", 16) is not atlas
+
+    def test_glyphs_rasterized_once(
+        self, renderer: GfxRenderer, font_manager: AdvancedFontManager
+    ) -> None:
+        atlas = font_manager.get_atlas(renderer)
+        atlas.draw("abba", 0, 0, RED)
+        atlas.draw("baab", 0, 20, RED)
+        assert set(atlas.glyphs) == {"a", "b"}
+        assert len(atlas.pages) == 1
+
+    def test_measure_matches_ttf(
+        self, renderer: GfxRenderer, font_manager: AdvancedFontManager
+    ) -> None:
+        atlas = font_manager.get_atlas(renderer, "console", 12)
+        text = "Iron: 1234"
+        assert atlas.measure(text) == font_manager.get_text_size("console", 12, text)
+        w, h = atlas.measure("a\nbb")
+        assert h == atlas.line_skip + atlas.line_height
+
+    def test_draw(
+        self, renderer: GfxRenderer, font_manager: AdvancedFontManager
+    ) -> None:
+        renderer.clear(BLACK)
+        atlas = font_manager.get_atlas(renderer, "console", 12)
+        atlas.draw("MMMM", 0, 0, RED)
+        assert len(renderer.geometry) == 0
+        w, h = atlas.measure("MMMM")
+        inside = read_region(renderer, w, h)
+        assert max(inside) > 200
+        renderer.clear(BLACK)
+        assert max(read_region(renderer, w, h)) == 0
+
+    def test_many_glyphs_add_pages(
+        self, renderer: GfxRenderer, font_manager: AdvancedFontManager
+    ) -> None:
+        atlas = GlyphAtlas(renderer, font_manager.fonts["console"][12], page_size=32)
+        atlas.measure("abcdefghijklmnopqrstuvwxyz")
+        assert len(atlas.pages) > 1
+        atlas.close()
+        assert atlas.pages == []
+
+    def test_close_atlases(
+        self, renderer: GfxRenderer, font_manager: AdvancedFontManager
+    ) -> None:
+        atlas = font_manager.get_atlas(renderer, "console", 12)
+        atlas.measure("abc")
+        font_manager.close_atlases()
+        assert atlas.pages == []
+        assert font_manager.atlases == {}
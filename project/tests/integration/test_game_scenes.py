@@ -23,6 +23,7 @@ def test_all_scenes_render_five_frames_each() -> None:
     main.setup()
     game = HeadlessGame()
     game.fps_display_config.display = True
+    game.fps_display_config.graph = True
     scene_names = [name for name in game.scenes if name != "exit"]
     try:
         for _ in range(FRAMES_PER_SCENE):
@@ -36,3 +37,4 @@ def test_all_scenes_render_five_frames_each() -> None:
                     game.context.console.visible = True
     finally:
         game.stop()
+    assert game.font_manager.atlases == {}  # closed before the renderer
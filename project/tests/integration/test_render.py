@@ -1,12 +1,21 @@
 """Integration tests for GfxRenderer SDL2_gfx methods."""
 
+import ctypes
+from array import array
 from collections.abc import Generator
 from typing import Any
 
 import pytest
 import sdl2
 import sdl2.ext
-from gamepart.render import GfxRenderer
+from gamepart.render import (
+    GeometryBatch,
+    GfxRenderer,
+    SpriteCache,
+    circle_segments,
+    float_buffer,
+    triangulate,
+)
 
 RED = (255, 0, 0, 255)
 GREEN = (0, 255, 0, 255)
@@ -29,14 +38,28 @@ def sdl_init() -> Generator[None, None, None]:
     sdl2.SDL_Quit()
 
 
+def read_pixel(renderer: GfxRenderer, x: int, y: int) -> tuple[int, int, int, int]:
+    """Read back a single RGBA pixel from the renderer."""
+    buf = (ctypes.c_uint8 * 4)()
+    rect = sdl2.SDL_Rect(x, y, 1, 1)
+    sdl2.SDL_RenderReadPixels(
+        renderer.sdlrenderer,
+        ctypes.byref(rect),  # type: ignore[arg-type]
+        sdl2.SDL_PIXELFORMAT_RGBA32,
+        buf,  # type: ignore[arg-type]
+        4,
+    )
+    return buf[0], buf[1], buf[2], buf[3]
+
+
 @pytest.fixture
 def renderer(sdl_init: None) -> Generator[GfxRenderer, None, None]:
     """Create a GfxRenderer with a hidden window for testing."""
     window = sdl2.ext.Window("Test", size=(100, 100), flags=sdl2.SDL_WINDOW_HIDDEN)
     renderer = GfxRenderer(window)
     yield renderer
-    sdl2.SDL_DestroyRenderer(renderer.sdlrenderer)
-    sdl2.SDL_DestroyWindow(window.window)
+    renderer.destroy()
+    window.close()
 
 
 class TestPixel:
@@ -511,3 +534,260 @@ class TestClip:
         renderer.box([(0, 0, 100, 100)], RED)
         clip = renderer.clip
         assert clip == (25, 25, 50, 50)
+
+
+class TestTriangulate:
+    """Tests for polygon triangulation."""
+
+    def test_triangle(self) -> None:
+        assert triangulate([(0, 0), (10, 0), (0, 10)]) == [0, 1, 2]
+
+    def test_degenerate(self) -> None:
+        assert triangulate([(0, 0), (10, 0)]) == []
+
+    def test_convex_is_fanned(self) -> None:
+        indices = triangulate([(0, 0), (10, 0), (10, 10), (0, 10)])
+        assert indices == [0, 1, 2, 0, 2, 3]
+
+    def test_concave_covers_polygon(self) -> None:
+        points = [(0, 0), (20, 0), (20, 20), (10, 10), (0, 20)]
+        indices = triangulate(points)
+        assert len(indices) == 3 * (len(points) - 2)
+        assert set(indices) == set(range(len(points)))
+
+    def test_clockwise_concave(self) -> None:
+        points = [(0, 20), (10, 10), (20, 20), (20, 0), (0, 0)]
+        indices = triangulate(points)
+        assert len(indices) == 3 * (len(points) - 2)
+
+    def test_flat_coordinates(self) -> None:
+        pairs = [(0, 0), (20, 0), (20, 20), (10, 10), (0, 20)]
+        flat = array("d", [c for p in pairs for c in p])
+        assert triangulate(flat) == triangulate(pairs)
+
+
+class TestFlatCoordinates:
+    """Tests for drawing from flat coordinate buffers."""
+
+    def test_float_buffer_keeps_float32(self) -> None:
+        coords = array("f", [1.0, 2.0])
+        assert float_buffer(coords) is coords
+
+    def test_float_buffer_converts(self) -> None:
+        expected = array("f", [1.0, 2.0, 3.0, 4.0])
+        assert float_buffer(array("d", [1.0, 2.0, 3.0, 4.0])) == expected
+        assert float_buffer([(1.0, 2.0), (3.0, 4.0)]) == expected
+
+    def test_add_polyline(self) -> None:
+        batch = GeometryBatch()
+        batch.add_polyline([0, 0, 10, 0, 10, 10], 2, sdl2.ext.Color(255, 0, 0))
+        assert batch.vertex_count == 8
+        assert list(batch.indices) == [0, 1, 2, 0, 2, 3, 4, 5, 6, 4, 6, 7]
+
+    @pytest.mark.parametrize("batching", [False, True])
+    def test_points(self, renderer: GfxRenderer, batching: bool) -> None:
+        renderer.clear(BLACK)
+        with renderer.batched(batching):
+            renderer.points([array("f", [5, 5, 60, 70]), array("d", [1, 2])], RED)
+        assert read_pixel(renderer, 5, 5) == RED
+        assert read_pixel(renderer, 60, 70) == RED
+        assert read_pixel(renderer, 1, 2) == RED
+        assert read_pixel(renderer, 6, 5) == BLACK
+
+    def test_polyline(self, renderer: GfxRenderer) -> None:
+        renderer.clear(BLACK)
+        renderer.polyline([(array("d", [10, 10, 90, 10, 90, 90]), 3)], GREEN)
+        assert read_pixel(renderer, 50, 10) == GREEN
+        assert read_pixel(renderer, 90, 50) == GREEN
+        assert read_pixel(renderer, 50, 50) == BLACK
+
+    def test_filled_polygon_flat(self, renderer: GfxRenderer) -> None:
+        renderer.clear(BLACK)
+        renderer.filled_polygon([array("d", [10, 50, 50, 10, 90, 50, 50, 90])], BLUE)
+        assert read_pixel(renderer, 50, 50) == BLUE
+        assert read_pixel(renderer, 5, 5) == BLACK
+
+
+class TestGeometryBatch:
+    """Tests for GeometryBatch buffers."""
+
+    def test_circle_segments_grow_with_radius(self) -> None:
+        assert circle_segments(1) <= circle_segments(10) <= circle_segments(100)
+        assert circle_segments(100) % 4 == 0
+
+    def test_add_circle(self) -> None:
+        batch = GeometryBatch()
+        batch.add_circle(10, 10, 5, sdl2.ext.Color(255, 0, 0))
+        segments = circle_segments(5.5)
+        assert batch.vertex_count == segments + 1
+        assert len(batch) == segments * 3
+        assert len(batch.colors) == batch.vertex_count * 4
+
+    def test_add_quads_offsets_indices(self) -> None:
+        batch = GeometryBatch()
+        batch.add_box(0, 0, 1, 1, sdl2.ext.Color(255, 0, 0))
+        batch.add_box(5, 5, 6, 6, sdl2.ext.Color(255, 0, 0))
+        assert list(batch.indices) == [0, 1, 2, 0, 2, 3, 4, 5, 6, 4, 6, 7]
+
+    def test_clear(self) -> None:
+        batch = GeometryBatch()
+        batch.add_line(0, 0, 10, 10, 3, sdl2.ext.Color(255, 0, 0))
+        batch.clear()
+        assert len(batch) == 0
+        assert batch.vertex_count == 0
+
+
+class TestBatching:
+    """Tests for batched geometry rendering."""
+
+    def test_batched_shapes_are_deferred(self, renderer: GfxRenderer) -> None:
+        renderer.batching = True
+        renderer.filled_circle([(50, 50, 20)], RED)
+        renderer.box([(0, 0, 9, 9)], GREEN)
+        assert len(renderer.geometry) > 0
+        renderer.flush()
+        assert len(renderer.geometry) == 0
+
+    def test_batched_shapes_render(self, renderer: GfxRenderer) -> None:
+        renderer.clear(BLACK)
+        with renderer.batched():
+            renderer.filled_circle([(50, 50, 20)], RED)
+            renderer.box([(0, 0, 9, 9)], GREEN)
+            renderer.filled_polygon(
+                [[(70, 70), (90, 70), (90, 90), (80, 80), (70, 90)]], BLUE
+            )
+            renderer.line([(0, 99, 99, 99)], WHITE)
+            renderer.thick_line([(0, 40, 20, 40, 5)], YELLOW)
+            renderer.pixel([(5, 60)], CYAN)
+        assert len(renderer.geometry) == 0
+        assert read_pixel(renderer, 50, 50) == RED
+        assert read_pixel(renderer, 50, 31) == RED
+        assert read_pixel(renderer, 50, 29) == BLACK
+        assert read_pixel(renderer, 9, 9) == GREEN
+        assert read_pixel(renderer, 10, 10) == BLACK
+        assert read_pixel(renderer, 72, 85) == BLUE
+        assert read_pixel(renderer, 80, 85) == BLACK
+        assert read_pixel(renderer, 50, 99) == WHITE
+        assert read_pixel(renderer, 10, 41) == YELLOW
+        assert read_pixel(renderer, 5, 60) == CYAN
+
+    def test_unbatched_draw_preserves_order(self, renderer: GfxRenderer) -> None:
+        renderer.clear(BLACK)
+        with renderer.batched():
+            renderer.box([(0, 0, 99, 99)], RED)
+            renderer.circle([(50, 50, 10)], GREEN)  # not batched, flushes
+            assert len(renderer.geometry) == 0
+            renderer.box([(0, 0, 20, 20)], BLUE)
+        assert read_pixel(renderer, 50, 40) == GREEN
+        assert read_pixel(renderer, 10, 10) == BLUE
+
+    def test_clear_drops_pending_geometry(self, renderer: GfxRenderer) -> None:
+        with renderer.batched():
+            renderer.box([(0, 0, 99, 99)], RED)
+            renderer.clear(BLACK)
+            assert len(renderer.geometry) == 0
+        assert read_pixel(renderer, 50, 50) == BLACK
+
+    def test_batched_restores_flag(self, renderer: GfxRenderer) -> None:
+        with renderer.batched():
+            assert renderer.batching is True
+        assert renderer.batching is False
+
+
+class TestSpriteCache:
+    """Tests for pre-rasterized sprite cache."""
+
+    @pytest.fixture
+    def cache(self, renderer: GfxRenderer) -> Generator[SpriteCache, None, None]:
+        cache = SpriteCache(renderer)
+        renderer.sprite_cache = cache
+        yield cache
+        cache.clear()
+
+    def test_radius_bucket(self) -> None:
+        assert SpriteCache.radius_bucket(5) == 5
+        assert SpriteCache.radius_bucket(17) == 18
+        assert SpriteCache.radius_bucket(33) == 36
+
+    def test_reuses_texture(self, renderer: GfxRenderer, cache: SpriteCache) -> None:
+        renderer.filled_circle([(20, 20, 5), (40, 40, 5)], RED)
+        renderer.filled_circle([(60, 60, 5)], RED)
+        assert len(cache) == 1
+        assert cache.misses == 1
+        assert cache.hits == 1
+
+    def test_keys_by_color(self, renderer: GfxRenderer, cache: SpriteCache) -> None:
+        renderer.filled_circle([(20, 20, 5)], RED)
+        renderer.filled_circle([(20, 20, 5)], GREEN)
+        assert len(cache) == 2
+
+    @pytest.mark.parametrize("batching", [False, True])
+    def test_alpha_shares_texture(
+        self, renderer: GfxRenderer, cache: SpriteCache, batching: bool
+    ) -> None:
+        renderer.clear(BLACK)
+        with renderer.batched(batching):
+            renderer.filled_circle([(20, 20, 5)], (255, 0, 0, 128))
+            renderer.filled_circle([(50, 50, 20)], RED)
+        assert len(cache) == 2
+        renderer.filled_circle([(20, 20, 20)], (255, 0, 0, 64))
+        assert len(cache) == 2
+        assert read_pixel(renderer, 50, 50) == RED
+
+    def test_reset_targets_clears(
+        self, renderer: GfxRenderer, cache: SpriteCache
+    ) -> None:
+        renderer.filled_circle([(20, 20, 5)], RED)
+        renderer.reset_targets()
+        assert len(cache) == 0
+        assert cache.usage == 0
+        assert renderer.target_resets == 1
+
+    def test_large_radius_not_cached(
+        self, renderer: GfxRenderer, cache: SpriteCache
+    ) -> None:
+        cache.max_radius = 10
+        renderer.filled_circle([(50, 50, 30)], RED)
+        assert len(cache) == 0
+
+    def test_budget_evicts_lru(self, renderer: GfxRenderer, cache: SpriteCache) -> None:
+        cache.budget = 2 * 11 * 11 * 4
+        renderer.filled_circle([(20, 20, 5)], RED)
+        renderer.filled_circle([(20, 20, 5)], GREEN)
+        renderer.filled_circle([(20, 20, 5)], RED)
+        renderer.filled_circle([(20, 20, 5)], BLUE)
+        assert len(cache) == 2
+        assert cache.usage <= cache.budget
+        renderer.filled_circle([(20, 20, 5)], RED)
+        assert cache.misses == 3
+
+    @pytest.mark.parametrize("batching", [False, True])
+    def test_draws_cached_circle(
+        self, renderer: GfxRenderer, cache: SpriteCache, batching: bool
+    ) -> None:
+        renderer.clear(BLACK)
+        with renderer.batched(batching):
+            renderer.filled_circle([(50, 50, 20)], RED)
+        assert read_pixel(renderer, 50, 50) == RED
+        assert read_pixel(renderer, 50, 31) == RED
+        assert read_pixel(renderer, 50, 29) == BLACK
+
+    @pytest.mark.parametrize("batching", [False, True])
+    def test_draws_translucent_cached_circle(
+        self, renderer: GfxRenderer, cache: SpriteCache, batching: bool
+    ) -> None:
+        renderer.clear(BLACK)
+        with renderer.batched(batching):
+            renderer.filled_circle([(50, 50, 20)], (255, 0, 0, 128))
+        assert len(cache) == 1
+        r, g, b, _ = read_pixel(renderer, 50, 50)
+        assert 120 <= r <= 136
+        assert (g, b) == (0, 0)
+
+    def test_antialiased_circle(
+        self, renderer: GfxRenderer, cache: SpriteCache
+    ) -> None:
+        cache.antialias = True
+        renderer.clear(BLACK)
+        renderer.filled_circle([(50, 50, 20)], RED)
+        assert read_pixel(renderer, 50, 50) == RED
@@ -1,11 +1,20 @@
 """Integration tests for World physics subsystem."""
 
 import pymunk
+import pytest
+from gamepart.physics.category import Category, cat_none
 from gamepart.physics.physicalobject import (
     AwareObject,
     PhysicalObject,
 )
-from gamepart.physics.world import World
+from gamepart.physics.world import (
+    SNAPSHOT_STRIDE,
+    THREADED_SOLVER,
+    CollisionCallback,
+    World,
+    WorldSnapshot,
+    collision_type,
+)
 
 
 class TestWorldInit:
@@ -231,6 +240,71 @@ class TestWorldTick:
 
         assert body.position.x > 0
 
+    def test_records_previous_transform(self) -> None:
+        """Test tick stores the transform from before the step."""
+        world = World()
+        body = pymunk.Body(1, 1)
+        body.position = (5, 0)
+        body.velocity = (100, 0)
+        obj = PhysicalObject(body, [pymunk.Circle(body, 10)])
+        world.add(obj)
+
+        world.tick(0.1)
+        world.update_transforms()
+
+        assert obj.previous_transform == ((5, 0), 0.0)
+        obj.position = (50, 50)
+        assert obj.previous_transform is None
+        world.update_transforms()
+        assert obj.previous_transform is None  # teleported after the step
+
+    def test_teleport_skips_interpolation_until_next_step(self) -> None:
+        """Test frames without a step after a teleport are not interpolated."""
+        world = World()
+        body = pymunk.Body(1, 1)
+        body.velocity = (100, 0)
+        obj = PhysicalObject(body, [pymunk.Circle(body, 10)])
+        world.add(obj)
+        world.tick(0.1)
+        obj.position = (50, 50)
+
+        world.update_transforms()
+        world.update_transforms()
+
+        assert obj.previous_transform is None
+        world.tick(0.1)
+        world.update_transforms()
+        assert obj.previous_transform == ((50, 50), 0.0)
+
+    def test_skips_static_and_sleeping_bodies(self) -> None:
+        """Test update_transforms leaves out bodies that do not move."""
+        world = World(sleep_time_threshold=0.5)
+        static_body = pymunk.Body(body_type=pymunk.Body.STATIC)
+        static = PhysicalObject(static_body, [pymunk.Circle(static_body, 10)])
+        body = pymunk.Body(1, 1)
+        sleeper = PhysicalObject(body, [pymunk.Circle(body, 10)])
+        world.add(static, sleeper)
+        world.tick(0.1)
+        body.sleep()
+
+        world.tick(0.1)
+        world.update_transforms()
+
+        assert static.previous_transform is None
+        assert sleeper.previous_transform is None
+
+    def test_no_transform_without_interpolation(self) -> None:
+        """Test tick does not record transforms when interpolation is off."""
+        world = World(interpolate=False)
+        body = pymunk.Body(1, 1)
+        obj = PhysicalObject(body, [pymunk.Circle(body, 10)])
+        world.add(obj)
+
+        world.tick(0.1)
+        world.update_transforms()
+
+        assert obj.previous_transform is None
+
     def test_respects_speed_multiplier(self) -> None:
         """Test tick respects speed multiplier."""
         world_normal = World(speed=1.0)
@@ -393,3 +467,412 @@ class TestWorldCollision:
             world.tick(0.016)
 
         assert collision_counts["obj1"] > 0 or collision_counts["obj2"] > 0
+
+
+def _ball(position: tuple[float, float], category: Category) -> PhysicalObject:
+    body = pymunk.Body(1, 1)
+    body.position = position
+    return PhysicalObject(body, [pymunk.Circle(body, 20)], category)
+
+
+class TestWorldCollisionHandlers:
+    """Tests for collision handlers keyed on categories."""
+
+    def test_shapes_get_category_collision_type(self) -> None:
+        """Test shapes take the collision type of their category."""
+        world = World()
+        category = Category(4)
+        obj = _ball((0, 0), category)
+        world.add(obj)
+        assert obj.shapes[0].collision_type == collision_type(category)
+
+    def test_explicit_collision_type_is_kept(self) -> None:
+        """Test shapes with a collision type keep it."""
+        world = World()
+        obj = _ball((0, 0), Category(4))
+        obj.shapes[0].collision_type = 99
+        world.add(obj)
+        assert obj.shapes[0].collision_type == 99
+
+    def test_phases_receive_objects_in_category_order(self) -> None:
+        """Test begin, pre_solve, post_solve and separate get both objects."""
+        world = World()
+        cat_a, cat_b = Category(8), Category(16)
+        a = _ball((0, 0), cat_a)
+        b = _ball((10, 0), cat_b)
+        log: list[tuple[str, PhysicalObject, PhysicalObject]] = []
+
+        def record(phase: str) -> CollisionCallback:
+            def callback(
+                arbiter: pymunk.Arbiter, first: PhysicalObject, second: PhysicalObject
+            ) -> None:
+                log.append((phase, first, second))
+
+            return callback
+
+        world.add(b, a)
+        world.on_collision(
+            cat_a,
+            cat_b,
+            begin=record("begin"),
+            pre_solve=record("pre_solve"),
+            post_solve=record("post_solve"),
+            separate=record("separate"),
+        )
+        world.tick(0.01)
+        world.remove(b)
+        phases = [phase for phase, _, _ in log]
+        assert phases == ["begin", "pre_solve", "post_solve", "separate"]
+        assert all(first is a and second is b for _, first, second in log)
+
+    def test_unsubscribed_categories_are_not_reported(self) -> None:
+        """Test only pairs involving a subscribed category call back."""
+        world = World()
+        cat_a, cat_b, cat_c = Category(32), Category(64), Category(128)
+        world.add(_ball((0, 0), cat_b), _ball((10, 0), cat_c))
+        a = _ball((500, 0), cat_a)
+        world.add(a)
+        calls: list[PhysicalObject] = []
+        world.on_collision(cat_a, pre_solve=lambda arb, obj, other: calls.append(obj))
+        world.tick(0.01)
+        assert calls == []
+        world.add(_ball((510, 0), cat_c))
+        world.tick(0.01)
+        assert calls == [a]
+
+    def test_callbacks_accumulate(self) -> None:
+        """Test registering twice keeps both callbacks."""
+        world = World()
+        category = Category(256)
+        world.add(_ball((0, 0), category), _ball((10, 0), cat_none))
+        calls: list[str] = []
+        world.on_collision(category, begin=lambda *args: calls.append("first"))
+        world.on_collision(category, begin=lambda *args: calls.append("second"))
+        world.tick(0.01)
+        assert calls == ["first", "second"]
+
+
+def _filtered_ball(position: tuple[float, float], category: Category) -> PhysicalObject:
+    obj = _ball(position, category)
+    obj.shapes[0].filter = category.filter()
+    return obj
+
+
+class TestWorldQueries:
+    """Tests for spatial queries on World."""
+
+    def test_point_query(self) -> None:
+        """Test point queries return owning objects filtered by category."""
+        world = World()
+        cat_a, cat_b = Category(512), Category(1024)
+        a = _filtered_ball((0, 0), cat_a)
+        b = _filtered_ball((100, 0), cat_b)
+        world.add(a, b)
+        assert world.point_query((5, 5)) == [a]
+        assert world.point_query((5, 5), categories=cat_b) == []
+        assert set(world.point_query((50, 0), max_distance=35)) == {a, b}
+        assert world.point_query_nearest((70, 0), 100) is b
+        assert world.point_query_nearest((70, 0), 100, categories=cat_a) is a
+        assert world.point_query_nearest((500, 0), 10) is None
+
+    def test_segment_query_sorted_by_distance(self) -> None:
+        """Test segment queries return hits from start to end."""
+        world = World()
+        near = _ball((100, 0), cat_none)
+        far = _ball((200, 0), cat_none)
+        world.add(far, near)
+        assert world.segment_query((0, 0), (300, 0)) == [near, far]
+        assert world.segment_query_first((300, 0), (0, 0)) is far
+        assert world.segment_query_first((0, 100), (300, 100)) is None
+
+    def test_bb_query(self) -> None:
+        """Test bounding box queries."""
+        world = World()
+        a = _ball((0, 0), cat_none)
+        b = _ball((100, 0), cat_none)
+        world.add(a, b)
+        world.space.reindex_static()
+        assert world.bb_query((-30, -30, 30, 30)) == [a]
+        assert set(world.bb_query((-30, -30, 130, 30))) == {a, b}
+
+    def test_shape_query_keeps_shape_filter(self) -> None:
+        """Test shape queries find overlaps and restore the query shape."""
+        world = World()
+        cat_a = Category(2048)
+        a = _filtered_ball((0, 0), cat_a)
+        world.add(a)
+        probe = pymunk.Circle(None, 10, (15, 0))
+        probe.filter = cat_a.filter(cat_none)
+        assert world.shape_query(probe) == [a]
+        assert world.shape_query(probe, categories=cat_none) == []
+        assert probe.filter == cat_a.filter(cat_none)
+
+
+class TestWorldSolverOptions:
+    """Tests for solver options and tuning."""
+
+    def test_solver_options(self) -> None:
+        """Test options are passed to the space."""
+        world = World(iterations=5, sleep_time_threshold=0.5, collision_slop=0.2)
+        assert world.space.iterations == 5
+        assert world.space.sleep_time_threshold == 0.5
+        assert world.space.collision_slop == pytest.approx(0.2)
+        assert not world.threaded
+
+    @pytest.mark.skipif(not THREADED_SOLVER, reason="no threaded solver")
+    def test_threaded_solver(self) -> None:
+        """Test more than one thread uses the threaded solver."""
+        world = World(threads=2)
+        assert world.threaded
+        assert world.space.threads == 2
+
+    def test_spatial_hash_params_follow_shape_sizes(self) -> None:
+        """Test the cell size is the median dynamic shape size."""
+        world = World()
+        world.add(
+            _ball((0, 0), cat_none),
+            _ball((100, 0), cat_none),
+            _ball((200, 0), cat_none),
+        )
+        dim, count = world.spatial_hash_params()
+        assert dim == pytest.approx(40)
+        assert count >= 30
+        world.use_spatial_hash()
+        assert world.spatial_hash == (dim, count)
+        assert world.point_query((0, 0)) != []
+
+    def test_autotune_keeps_fastest(self) -> None:
+        """Test autotune measures every candidate and applies the fastest."""
+        world = World(threads=2)
+        world.add(*[_ball((x * 50.0, 0), cat_none) for x in range(10)])
+        timings = world.autotune(steps=2)
+        expected = 3 if world.threaded else 2
+        assert len(timings) == expected
+        threads, spatial_hash = min(timings, key=timings.__getitem__)
+        assert world.spatial_hash == spatial_hash
+        assert world.space.threads == threads
+        for obj in world.objects:
+            assert obj.body is not None
+            assert obj.body.position.y == 0
+
+    def test_autotune_runs_on_live_space(self) -> None:
+        """Test autotune steps the live space and restores it afterwards."""
+        world = World()
+        category = Category(4)
+        world.add(_ball((0, 0), category), _ball((30, 0), category))
+        calls: list[PhysicalObject] = []
+        world.on_collision(
+            category, pre_solve=lambda arb, obj, other: calls.append(obj)
+        )
+        world.autotune(steps=2)
+        assert calls  # the handler ran during the benchmark
+        positions = [obj.position for obj in world.objects]
+        assert positions == [(0, 0), (30, 0)]
+
+
+class CountingAware(AwareObject):
+    def __init__(self, position: tuple[float, float] = (0, 0)) -> None:
+        body = pymunk.Body(1, 1)
+        body.position = position
+        super().__init__(body, [pymunk.Circle(body, 10)])
+        self.deltas: list[float] = []
+
+    def tick(self, delta: float) -> None:
+        self.deltas.append(delta)
+
+
+class TestWorldAwareScheduling:
+    """Tests for reduced rate ticking of aware objects."""
+
+    def test_distant_objects_tick_with_accumulated_delta(self) -> None:
+        """Test objects outside active_radius tick less often."""
+        world = World()
+        world.focus = (0, 0)
+        world.active_radius = 100
+        world.distant_tick_interval = 4
+        near = CountingAware((0, 0))
+        far = CountingAware((1000, 0))
+        world.add(near, far)
+        for _ in range(9):
+            world.tick(0.25)
+        assert near.deltas == [0.25] * 9
+        assert far.deltas == [0.25, 1.0, 1.0]
+
+    def test_sleeping_objects_skip_ticks(self) -> None:
+        """Test sleeping bodies are not ticked until woken."""
+        world = World(sleep_time_threshold=0.01)
+        obj = CountingAware()
+        world.sleep_check_interval = 100
+        world.add(obj)
+        for _ in range(20):
+            world.tick(0.01)
+        assert obj.body is not None
+        assert obj.body.is_sleeping
+        ticks = len(obj.deltas)
+        for _ in range(5):
+            world.tick(0.01)
+        assert len(obj.deltas) == ticks
+        obj.apply_impulse((10, 0))
+        world.wake(obj)
+        world.tick(0.01)
+        assert len(obj.deltas) == ticks + 1
+        assert obj.deltas[-1] == pytest.approx(0.01)  # slept time not accumulated
+
+    def test_impulse_resumes_ticks(self) -> None:
+        """Test an impulse on a sleeping object ticks it on the next step."""
+        world = World(sleep_time_threshold=0.01)
+        world.sleep_check_interval = 100
+        obj = CountingAware()
+        world.add(obj)
+        for _ in range(20):
+            world.tick(0.01)
+        ticks = len(obj.deltas)
+        obj.apply_impulse((10, 0))
+        world.tick(0.01)
+        assert len(obj.deltas) == ticks + 1
+
+    def test_contact_resumes_ticks(self) -> None:
+        """Test a sleeping object hit by a moving body ticks on that step."""
+        world = World(sleep_time_threshold=0.01)
+        world.sleep_check_interval = 100
+        obj = CountingAware()
+        world.add(obj)
+        for _ in range(20):
+            world.tick(0.01)
+        assert obj.body is not None and obj.body.is_sleeping
+        ticks = len(obj.deltas)
+        body = pymunk.Body(1, 1)
+        body.position = (25, 0)
+        body.velocity = (-1000, 0)
+        world.add(PhysicalObject(body, [pymunk.Circle(body, 10)]))
+        steps = 0
+        while len(obj.deltas) == ticks and steps < 10:
+            world.tick(0.01)
+            steps += 1
+        assert not obj.body.is_sleeping
+        assert steps == 1
+
+    def test_removed_objects_are_not_ticked(self) -> None:
+        """Test removal drops scheduled ticks."""
+        world = World()
+        obj = CountingAware()
+        world.add(obj)
+        world.remove(obj)
+        world.tick(0.01)
+        assert obj.deltas == []
+
+    def test_idle_speed_threshold(self) -> None:
+        """Test the idle speed threshold option."""
+        world = World(idle_speed_threshold=2.0)
+        assert world.space.idle_speed_threshold == 2.0
+
+
+def _moving_ball(position: tuple[float, float]) -> PhysicalObject:
+    body = pymunk.Body(1, 10)
+    body.position = position
+    body.velocity = (position[0], 5)
+    body.angular_velocity = 0.5
+    return PhysicalObject(body, [pymunk.Circle(body, 1)])
+
+
+def _state(obj: PhysicalObject) -> tuple[float, ...]:
+    body = obj.body
+    assert body is not None
+    return (*body.position, body.angle, *body.velocity, body.angular_velocity)
+
+
+class TestWorldSnapshot:
+    """Tests for World.snapshot and World.restore."""
+
+    def test_snapshot_packs_body_state(self) -> None:
+        """Test rows hold position, angle and velocities keyed by body id."""
+        world = World()
+        objects = [_moving_ball((i * 10, 0)) for i in range(3)]
+        world.add(*objects)
+        world.tick(0.1)
+
+        snapshot = world.snapshot()
+
+        assert isinstance(snapshot, WorldSnapshot)
+        assert len(snapshot) == 3
+        assert len(snapshot.state) == 3 * SNAPSHOT_STRIDE
+        assert snapshot.nbytes > 0
+        for obj in objects:
+            assert obj.body is not None
+            index = list(snapshot.ids).index(obj.body.id)
+            assert snapshot.row(index) == pytest.approx(_state(obj))
+
+    def test_restore_rewinds_bodies(self) -> None:
+        """Test restore puts bodies back where the snapshot was taken."""
+        world = World()
+        world.space.gravity = (0, -100)
+        objects = [_moving_ball((i * 10, 0)) for i in range(3)]
+        world.add(*objects)
+        shapes = [obj.shapes[0] for obj in objects]
+        world.tick(0.1)
+        saved = [_state(obj) for obj in objects]
+        snapshot = world.snapshot()
+        for _ in range(10):
+            world.tick(0.1)
+
+        world.restore(snapshot)
+
+        assert [_state(obj) for obj in objects] == pytest.approx(saved)
+        assert [obj.shapes[0] for obj in objects] == shapes
+        assert all(obj.previous_transform is None for obj in objects)
+
+    def test_replay_is_deterministic(self) -> None:
+        """Test stepping again from a restored snapshot gives the same result."""
+        world = World()
+        world.space.gravity = (0, -100)
+        objects = [_moving_ball((i * 1.5, 0)) for i in range(5)]
+        world.add(*objects)
+        snapshot = world.snapshot()
+        for _ in range(10):
+            world.tick(0.05)
+        first = [_state(obj) for obj in objects]
+
+        world.restore(snapshot)
+        for _ in range(10):
+            world.tick(0.05)
+
+        assert [_state(obj) for obj in objects] == pytest.approx(first)
+
+    def test_restore_after_adding_and_removing(self) -> None:
+        """Test new bodies keep their state and removed ones stay removed."""
+        world = World()
+        kept, removed = _moving_ball((0, 0)), _moving_ball((10, 0))
+        world.add(kept, removed)
+        saved = _state(kept)
+        snapshot = world.snapshot()
+        world.tick(0.1)
+        world.remove(removed)
+        added = _moving_ball((20, 0))
+        world.add(added)
+        added_state = _state(added)
+
+        world.restore(snapshot)
+
+        assert _state(kept) == pytest.approx(saved)
+        assert _state(added) == pytest.approx(added_state)
+        assert removed.body is not None
+        assert removed.body.space is None
+
+    def test_restore_sleeping_state(self) -> None:
+        """Test bodies asleep in the snapshot are put back to sleep."""
+        world = World(sleep_time_threshold=0.01)
+        obj = PhysicalObject(pymunk.Body(1, 10), [])
+        world.add(obj)
+        for _ in range(20):
+            world.tick(0.01)
+        assert obj.body is not None
+        assert obj.body.is_sleeping
+        snapshot = world.snapshot()
+        obj.apply_impulse((10, 0))
+        world.tick(0.01)
+        assert not obj.body.is_sleeping
+
+        world.restore(snapshot)
+
+        assert obj.body.is_sleeping
+        assert obj.body.velocity == (0, 0)
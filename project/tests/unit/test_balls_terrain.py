@@ -0,0 +1,54 @@
+"""Tests for balls scene terrain module."""
+
+from unittest.mock import MagicMock
+
+import pymunk
+from gamepart.physics import World
+from gamepart.subsystem import SystemManager
+from gamepart.viewport import ViewPort
+from gamepart.viewport.commands import POLYLINE
+from scenes.balls.chunk import TerrainChunkManager
+from scenes.balls.terrain import ChunkTerrain
+
+
+class TestChunkTerrain:
+    def test_runs_become_segments(self) -> None:
+        space = pymunk.Space()
+        terrain = ChunkTerrain(
+            space.static_body, [[(0, 0), (10, 5), (20, 0)], [(40, 0), (50, 10)], []]
+        )
+        assert len(terrain.runs) == 2
+        assert len(terrain.shapes) == 3
+        assert terrain.get_bounds() == (0, 0, 50, 10)
+        assert terrain.position == (25, 5)
+
+    def test_added_to_world_as_one_object(self) -> None:
+        world = World()
+        terrain = ChunkTerrain(world.space.static_body, [[(0, 0), (10, 0), (20, 0)]])
+        world.add(terrain)
+        assert len(world.objects) == 1
+        assert len(world.space.shapes) == 2
+        assert world.point_query((5, 0), 1) == [terrain]
+        world.remove(terrain)
+        assert len(world.space.shapes) == 0
+
+    def test_draws_one_polyline_per_run(self) -> None:
+        viewport = ViewPort(MagicMock(), width=100, height=100)
+        terrain = ChunkTerrain(
+            pymunk.Space().static_body, [[(0, 0), (10, 0)], [(20, 0), (30, 0)]]
+        )
+        terrain.draw(viewport)
+        kinds = [key[5] for key, _ in viewport.commands.commands]
+        assert kinds == [POLYLINE, POLYLINE]
+
+
+class TestTerrainChunkManager:
+    def test_chunk_holds_single_terrain_object(self) -> None:
+        manager = TerrainChunkManager(
+            MagicMock(spec=SystemManager), pymunk.Space().static_body
+        )
+        chunk = manager._build_chunk((0, 0), manager._generate_chunk((0, 0)))
+        assert len(chunk.objects) == 1
+        terrain = chunk.objects[0]
+        assert isinstance(terrain, ChunkTerrain)
+        assert len(terrain.shapes) >= 1
@@ -1,7 +1,24 @@
+import os
+import pathlib
+import threading
+import time
+import typing
+from collections.abc import Iterator
 from unittest.mock import MagicMock
 
 import pytest
-from gamepart.chunk import Chunk, ChunkManager
+from gamepart.chunk import (
+    CHUNK_CACHED,
+    CHUNK_LOADED,
+    CHUNK_PENDING,
+    CHUNK_UNLOADED,
+    Chunk,
+    ChunkManager,
+    ChunkRenderCache,
+    ChunkStore,
+)
+from gamepart.subsystem import SubSystem, SubSystemObject, SystemManager
+from gamepart.viewport import Circle, ViewPort
 
 
 class SimpleChunkManager(ChunkManager[Chunk]):
@@ -152,7 +169,7 @@ class TestChunkManagerUpdate:
 
         assert mock_system.add_all.call_count == initial_call_count
 
-    def test_chunk_transition_loads_new_unloads_old(
+    def test_chunk_transition_loads_new_keeps_old(
         self, manager: SimpleChunkManager, mock_system: MagicMock
     ) -> None:
         manager.update((500.0, 500.0))
@@ -161,7 +178,29 @@ class TestChunkManagerUpdate:
         manager.update((1500.0, 500.0))
 
         assert mock_system.add_all.call_count == 3
+        assert mock_system.remove_all.call_count == 0
+
+    def test_chunks_beyond_unload_rings_are_unloaded(
+        self, manager: SimpleChunkManager, mock_system: MagicMock
+    ) -> None:
+        manager.update((500.0, 500.0))
+        mock_system.reset_mock()
+
+        manager.update((2500.0, 500.0))
+
         assert mock_system.remove_all.call_count == 3
+        assert len(manager._loaded_chunks) == 12
+
+    def test_oscillating_over_boundary_does_not_reload(
+        self, manager: SimpleChunkManager, mock_system: MagicMock
+    ) -> None:
+        manager.update((990.0, 500.0))
+        for _ in range(5):
+            manager.update((1010.0, 500.0))
+            manager.update((990.0, 500.0))
+
+        assert mock_system.add_all.call_count == 12
+        mock_system.remove_all.assert_not_called()
 
     def test_clear(self, manager: SimpleChunkManager, mock_system: MagicMock) -> None:
         manager.update((500.0, 500.0))
@@ -171,3 +210,513 @@ class TestChunkManagerUpdate:
 
         assert len(manager._loaded_chunks) == 0
         assert mock_system.remove_all.call_count == 9
+
+
+def _circle(position: tuple[float, float], static: bool) -> Circle:
+    circle = Circle()
+    circle.position = position
+    circle.angle = 0.0
+    circle.radius = 10.0
+    circle.color = (255, 0, 0)
+    circle.static = static
+    return circle
+
+
+class CircleChunkManager(ChunkManager[Chunk]):
+    """Chunks with one static and one dynamic circle."""
+
+    def _load_chunk(self, coord: tuple[int, int]) -> Chunk:
+        chunk = Chunk(coord)
+        chunk.objects.append(_circle((coord[0] * 100.0, 0.0), static=True))
+        chunk.objects.append(_circle((coord[0] * 100.0, 50.0), static=False))
+        return chunk
+
+
+class TestChunkRenderCache:
+    @pytest.fixture
+    def manager(self) -> CircleChunkManager:
+        return CircleChunkManager(MagicMock(), chunk_size=100, render_cache=True)
+
+    def test_static_objects_are_baked(self, manager: CircleChunkManager) -> None:
+        chunk = manager.load_chunk((0, 0))
+        static, dynamic, cache = chunk.objects
+        assert cache is chunk.render_cache
+        assert isinstance(cache, ChunkRenderCache)
+        assert cache.objects == [static]
+        assert isinstance(static, Circle) and isinstance(dynamic, Circle)
+        assert static.baked and not dynamic.baked
+
+    def test_baked_objects_are_kept_out_of_viewports(self) -> None:
+        system = SystemManager()
+        viewport = ViewPort(MagicMock(), 100, 100)
+        other: SubSystem[SubSystemObject] = SubSystem()
+        system.add(viewport, other)
+        manager = CircleChunkManager(system, chunk_size=100, render_cache=True)
+        chunk = manager.load_chunk((0, 0))
+        static, dynamic, cache = chunk.objects
+
+        assert list(viewport.objects) == [dynamic, cache]
+        assert list(other.objects) == [dynamic, cache, static]
+
+        manager.unload_chunk((0, 0))
+        assert not viewport.objects and not other.objects
+
+    def test_bounds_follow_changes(self, manager: CircleChunkManager) -> None:
+        chunk = manager.load_chunk((1, 0))
+        static = chunk.objects[0]
+        assert isinstance(static, Circle) and chunk.render_cache is not None
+        assert chunk.render_cache.get_bounds() == (90.0, -10.0, 110.0, 10.0)
+        static.radius = 20.0
+        manager.mark_changed((150.0, 0.0))
+        assert chunk.version == 1
+        assert chunk.render_cache.get_bounds() == (80.0, -20.0, 120.0, 20.0)
+
+    def test_zoom_level_rounds_up(self) -> None:
+        cache = ChunkRenderCache(Chunk((0, 0)), zoom_step=2.0)
+        assert cache.zoom_level(1.0) == 1.0
+        assert cache.zoom_level(1.2) == 2.0
+        assert cache.zoom_level(0.3) == 0.5
+
+    def test_disabled_by_default(self) -> None:
+        manager = CircleChunkManager(MagicMock(), chunk_size=100)
+        chunk = manager.load_chunk((0, 0))
+        assert chunk.render_cache is None
+        assert len(chunk.objects) == 2
+
+
+class GeneratingChunkManager(ChunkManager[Chunk]):
+    """Generates chunks in two steps, generation can be held back."""
+
+    def __init__(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.release = threading.Event()
+        self.release.set()
+        self.generated: list[tuple[int, int]] = []
+        self.threads: set[str] = set()
+
+    def _generate_chunk(self, coord: tuple[int, int]) -> typing.Any:
+        self.release.wait(5)
+        self.threads.add(threading.current_thread().name)
+        self.generated.append(coord)
+        return coord[0] * 10
+
+    def _build_chunk(self, coord: tuple[int, int], data: typing.Any) -> Chunk:
+        chunk = Chunk(coord)
+        chunk.version = data
+        return chunk
+
+
+class TestChunkManagerBackground:
+    @pytest.fixture
+    def mock_system(self) -> MagicMock:
+        return MagicMock()
+
+    @pytest.fixture
+    def manager(self, mock_system: MagicMock) -> Iterator[GeneratingChunkManager]:
+        manager = GeneratingChunkManager(mock_system, chunk_size=1000, workers=1)
+        yield manager
+        manager.release.set()
+        manager.shutdown()
+
+    def test_generates_on_worker(self, manager: GeneratingChunkManager) -> None:
+        manager.request_chunk((2, 0))
+        manager.finish_pending()
+        chunk = manager.get_chunk((2, 0))
+        assert chunk is not None and chunk.version == 20
+        assert manager.threads and threading.current_thread().name not in (
+            manager.threads
+        )
+
+    def test_chunk_states(
+        self, manager: GeneratingChunkManager, mock_system: MagicMock
+    ) -> None:
+        manager.release.clear()
+        manager.request_chunk((0, 0))
+        assert manager.chunk_state((0, 0)) == CHUNK_PENDING
+        assert manager.chunk_state((1, 0)) == CHUNK_UNLOADED
+        assert manager.integrate_pending() == 0
+        mock_system.add_all.assert_not_called()
+        manager.release.set()
+        manager.finish_pending()
+        assert manager.chunk_state((0, 0)) == CHUNK_LOADED
+        assert list(manager.pending_chunks) == []
+
+    def test_budget_spreads_chunks_over_calls(
+        self, manager: GeneratingChunkManager, mock_system: MagicMock
+    ) -> None:
+        for x in range(3):
+            manager.request_chunk((x, 0))
+        manager._pending[(2, 0)].result(5)  # single worker, all generated
+
+        assert manager.integrate_pending(budget=0.0) == 1
+        assert manager.integrate_pending(budget=0.0) == 1
+        assert manager.integrate_pending(budget=1.0) == 1
+        assert mock_system.add_all.call_count == 3
+
+    def test_update_requests_nearest_first(
+        self, manager: GeneratingChunkManager
+    ) -> None:
+        manager.update((500.0, 500.0))
+        manager.finish_pending()
+        assert manager.generated[0] == (0, 0)
+        assert len(manager.generated) == 9
+
+    def test_update_cancels_chunks_no_longer_required(
+        self, manager: GeneratingChunkManager
+    ) -> None:
+        manager.release.clear()
+        manager.update((500.0, 500.0))
+        manager.update((10500.0, 500.0))
+        assert (0, 0) not in manager.pending_chunks
+        assert (10, 0) in manager.pending_chunks
+        manager.release.set()
+        manager.finish_pending()
+        assert manager.chunk_state((0, 0)) == CHUNK_UNLOADED
+
+    def test_load_chunk_uses_pending_generation(
+        self, manager: GeneratingChunkManager
+    ) -> None:
+        manager.request_chunk((1, 0))
+        manager._pending[(1, 0)].result(5)
+        manager.load_chunk((1, 0))
+        assert manager.generated == [(1, 0)]
+
+    def test_without_workers_loads_on_request(self, mock_system: MagicMock) -> None:
+        manager = GeneratingChunkManager(mock_system, chunk_size=1000)
+        manager.request_chunk((3, 0))
+        assert manager.chunk_state((3, 0)) == CHUNK_LOADED
+        assert manager.threads == {threading.current_thread().name}
+
+
+class TestChunkManagerCache:
+    @pytest.fixture
+    def mock_system(self) -> MagicMock:
+        return MagicMock()
+
+    def test_unloaded_chunk_is_reattached(self, mock_system: MagicMock) -> None:
+        manager = CircleChunkManager(mock_system, chunk_size=100)
+        chunk = manager.load_chunk((0, 0))
+        manager.unload_chunk((0, 0))
+        assert manager.chunk_state((0, 0)) == CHUNK_CACHED
+
+        manager.request_chunk((0, 0))
+
+        assert manager.get_chunk((0, 0)) is chunk
+        assert manager.counts["built"] == 1
+        assert manager.counts["reattached"] == 1
+        mock_system.add_all.assert_called_with(*chunk.objects)
+
+    def test_cache_size_evicts_least_recently_unloaded(
+        self, mock_system: MagicMock
+    ) -> None:
+        manager = CircleChunkManager(mock_system, chunk_size=100, cache_size=2)
+        for x in range(3):
+            manager.load_chunk((x, 0))
+        for x in range(3):
+            manager.unload_chunk((x, 0))
+
+        assert manager.chunk_state((0, 0)) == CHUNK_UNLOADED
+        assert manager.chunk_state((1, 0)) == CHUNK_CACHED
+        assert manager.chunk_state((2, 0)) == CHUNK_CACHED
+        assert manager.counts["evicted"] == 1
+
+    def test_cache_objects_limit(self, mock_system: MagicMock) -> None:
+        manager = CircleChunkManager(mock_system, chunk_size=100, cache_objects=3)
+        manager.load_chunk((0, 0))
+        manager.load_chunk((1, 0))
+        manager.unload_chunk((0, 0))
+        manager.unload_chunk((1, 0))
+
+        assert manager.chunk_state((0, 0)) == CHUNK_UNLOADED
+        assert manager.chunk_state((1, 0)) == CHUNK_CACHED
+
+    def test_disabled_cache(self, mock_system: MagicMock) -> None:
+        manager = CircleChunkManager(mock_system, chunk_size=100, cache_size=0)
+        manager.load_chunk((0, 0))
+        manager.unload_chunk((0, 0))
+        manager.load_chunk((0, 0))
+        assert manager.counts["built"] == 2
+
+    def test_pinned_chunks_are_not_evicted(self, mock_system: MagicMock) -> None:
+        manager = CircleChunkManager(mock_system, chunk_size=100, cache_size=0)
+        chunk = manager.load_chunk((0, 0))
+        manager.pin((50.0, 50.0))
+        manager.unload_chunk((0, 0))
+        manager.load_chunk((1, 0))
+        manager.unload_chunk((1, 0))
+
+        assert manager.chunk_state((0, 0)) == CHUNK_CACHED
+        assert manager.chunk_state((1, 0)) == CHUNK_UNLOADED
+        assert manager.load_chunk((0, 0)) is chunk
+
+        manager.unload_chunk((0, 0))
+        manager.unpin((50.0, 50.0))
+
+        assert manager.chunk_state((0, 0)) == CHUNK_UNLOADED
+        assert manager.counts["evicted"] == 1
+
+    def test_clear_empties_cache(self, mock_system: MagicMock) -> None:
+        manager = CircleChunkManager(mock_system, chunk_size=100)
+        manager.load_chunk((0, 0))
+        manager.clear()
+        assert manager.chunk_state((0, 0)) == CHUNK_UNLOADED
+        assert manager.counts["unloaded"] == 1
+
+
+class TestChunkStore:
+    def test_get_sees_queued_chunks(self, tmp_path: pathlib.Path) -> None:
+        store = ChunkStore(str(tmp_path / "w.chunks"), flush_interval=60)
+        store.put((1, -2), b"abc")
+        assert store.get((1, -2)) == b"abc"
+        assert (1, -2) in store
+        assert store.get((0, 0)) is None
+        store.close()
+
+    def test_batches_writes(self, tmp_path: pathlib.Path) -> None:
+        store = ChunkStore(str(tmp_path / "w.chunks"), batch_size=4)
+        for x in range(3):
+            store.put((x, 0), b"x")
+        store.put((0, 0), b"y")
+        store.flush()
+        assert store.writes == 3
+        assert store.batches == 1
+        assert store.get((0, 0)) == b"y"
+        store.close()
+
+    def test_persists_across_reopen(self, tmp_path: pathlib.Path) -> None:
+        path = str(tmp_path / "w.chunks")
+        store = ChunkStore(path)
+        store.put((3, 4), b"\x00\x01")
+        store.close()
+
+        store = ChunkStore(path)
+        assert store.get((3, 4)) == b"\x00\x01"
+        store.close()
+
+    def test_temporary_store_is_removed(self) -> None:
+        store = ChunkStore()
+        store.put((0, 0), b"x")
+        path = store.path
+        store.close()
+        assert not os.path.exists(path)
+        with pytest.raises(ValueError):
+            store.put((0, 0), b"x")
+
+
+class StoredChunkManager(GeneratingChunkManager):
+    """Chunks whose version is their whole state."""
+
+    def _encode_chunk(self, chunk: Chunk) -> bytes:
+        return chunk.version.to_bytes(4, "little")
+
+    def _decode_chunk(self, coord: tuple[int, int], data: bytes) -> typing.Any:
+        return int.from_bytes(data, "little")
+
+
+class TestChunkManagerStore:
+    @pytest.fixture
+    def store(self) -> Iterator[ChunkStore]:
+        store = ChunkStore()
+        yield store
+        store.close()
+
+    def test_dirty_chunks_are_saved_on_unload(self, store: ChunkStore) -> None:
+        manager = StoredChunkManager(MagicMock(), chunk_size=100, store=store)
+        manager.load_chunk((1, 0))
+        manager.load_chunk((2, 0))
+        manager.mark_changed((150.0, 0.0))
+
+        manager.unload_chunk((1, 0))
+        manager.unload_chunk((2, 0))
+
+        assert store.get((1, 0)) == (11).to_bytes(4, "little")
+        assert store.get((2, 0)) is None
+        assert manager.counts["saved"] == 1
+
+    def test_evicted_chunks_load_from_store(self, store: ChunkStore) -> None:
+        manager = StoredChunkManager(
+            MagicMock(), chunk_size=100, store=store, cache_size=0
+        )
+        manager.load_chunk((1, 0))
+        manager.mark_changed((150.0, 0.0))
+        manager.unload_chunk((1, 0))
+
+        chunk = manager.load_chunk((1, 0))
+
+        assert chunk.version == 11
+        assert manager.generated == [(1, 0)]
+        assert manager.counts["restored"] == 1
+
+    def test_restored_chunks_counted_on_integration(self, store: ChunkStore) -> None:
+        store.put((1, 0), (7).to_bytes(4, "little"))
+        manager = StoredChunkManager(
+            MagicMock(), chunk_size=100, store=store, workers=1
+        )
+        manager.request_chunk((1, 0))
+        while not manager._pending[(1, 0)].done():
+            time.sleep(0.001)
+        assert manager.counts["restored"] == 0  # not counted on the worker
+
+        manager.integrate_pending()
+
+        assert manager.get_chunk((1, 0)) is not None
+        assert manager.counts["restored"] == 1
+        manager.shutdown()
+
+    def test_changes_to_cached_chunks_are_saved(self, store: ChunkStore) -> None:
+        manager = StoredChunkManager(MagicMock(), chunk_size=100, store=store)
+        manager.load_chunk((1, 0))
+        manager.unload_chunk((1, 0))
+        manager.mark_dirty((150.0, 0.0))
+        assert store.get((1, 0)) is None
+
+        manager.clear()
+
+        assert store.get((1, 0)) == (10).to_bytes(4, "little")
+
+
+class TestChunkManagerPrefetch:
+    @pytest.fixture
+    def manager(self) -> Iterator[GeneratingChunkManager]:
+        manager = GeneratingChunkManager(
+            MagicMock(), chunk_size=1000, workers=1, load_rings=0, unload_rings=1
+        )
+        yield manager
+        manager.release.set()
+        manager.shutdown()
+
+    def test_prefetch_chunks_follow_velocity(
+        self, manager: GeneratingChunkManager
+    ) -> None:
+        manager.lookahead = 2.0
+        chunks = manager.get_prefetch_chunks((500.0, 500.0), (1000.0, 0.0))
+        assert chunks == [(1, 0), (2, 0)]
+        assert manager.get_prefetch_chunks((500.0, 500.0), (0.0, 0.0)) == []
+
+    def test_prefetch_rings_widen_path(self, manager: GeneratingChunkManager) -> None:
+        manager.prefetch_rings = 1
+        chunks = manager.get_prefetch_chunks((500.0, 500.0), (1000.0, 0.0))
+        assert set(chunks) == {(x, y) for x in range(3) for y in range(-1, 2)} - {
+            (0, 0)
+        }
+        assert set(chunks[:3]) == {(1, 0), (0, -1), (0, 1)}
+        assert (0, 0) not in chunks
+
+    def test_max_prefetch(self, manager: GeneratingChunkManager) -> None:
+        manager.lookahead = 10.0
+        manager.max_prefetch = 3
+        chunks = manager.get_prefetch_chunks((500.0, 500.0), (0.0, -1000.0))
+        assert chunks == [(0, -1), (0, -2), (0, -3)]
+
+    def test_update_prefetches_after_required(
+        self, manager: GeneratingChunkManager
+    ) -> None:
+        manager.lookahead = 3.0
+        manager.update((500.0, 500.0), velocity=(1000.0, 0.0))
+        manager.finish_pending()
+        assert manager.generated == [(0, 0), (1, 0), (2, 0), (3, 0)]
+        assert manager.counts["prefetched"] == 3
+
+    def test_prefetched_chunks_are_kept_on_path(
+        self, manager: GeneratingChunkManager
+    ) -> None:
+        manager.lookahead = 3.0
+        manager.update((500.0, 500.0), velocity=(1000.0, 0.0))
+        manager.finish_pending()
+        manager.update((600.0, 500.0), velocity=(1000.0, 0.0))
+        assert manager.chunk_state((3, 0)) == CHUNK_LOADED
+
+    def test_turning_cancels_prefetches(self, manager: GeneratingChunkManager) -> None:
+        manager.release.clear()
+        manager.lookahead = 5.0
+        manager.update((500.0, 500.0), velocity=(1000.0, 0.0))
+        assert (4, 0) in manager.pending_chunks
+
+        manager.update((500.0, 500.0), velocity=(-1000.0, 0.0))
+
+        assert (4, 0) not in manager.pending_chunks
+        assert (1, 0) in manager.pending_chunks  # within unload rings
+        assert (-4, 0) in manager.pending_chunks
+        assert manager.counts["cancelled"] >= 3
+
+    def test_without_workers_prefetches_one_per_update(self) -> None:
+        manager = GeneratingChunkManager(
+            MagicMock(), chunk_size=1000, load_rings=0, lookahead=3.0
+        )
+        manager.update((500.0, 500.0), velocity=(1000.0, 0.0))
+        assert manager.generated == [(0, 0), (1, 0)]
+        manager.update((500.0, 500.0), velocity=(1000.0, 0.0))
+        assert manager.generated == [(0, 0), (1, 0), (2, 0)]
+
+
+class TestChunkManagerView:
+    @pytest.fixture
+    def manager(self) -> SimpleChunkManager:
+        return SimpleChunkManager(MagicMock(), chunk_size=100, unload_rings=3)
+
+    @pytest.fixture
+    def viewport(self) -> ViewPort:
+        return ViewPort(MagicMock(), width=250, height=150, zoom=1.0)
+
+    def test_chunk_area(self, manager: SimpleChunkManager) -> None:
+        assert manager.get_chunk_area((-50.0, 0.0, 250.0, 99.0)) == (-1, 0, 2, 0)
+        assert manager.area_distance((0, 0, 2, 1), (1, 1)) == 0
+        assert manager.area_distance((0, 0, 2, 1), (5, -1)) == 3
+
+    def test_rect_loads_overlapped_chunks(self, manager: SimpleChunkManager) -> None:
+        manager.update((125.0, 75.0), rect=(0.0, 0.0, 250.0, 150.0))
+        assert set(manager._loaded_chunks) == {
+            (x, y) for x in range(3) for y in range(2)
+        }
+
+    def test_view_rings_grow_rect(self, manager: SimpleChunkManager) -> None:
+        manager.view_rings = 1
+        manager.update((50.0, 50.0), rect=(10.0, 10.0, 90.0, 90.0))
+        assert len(manager._loaded_chunks) == 9
+
+    def test_rect_unloads_with_hysteresis(self, manager: SimpleChunkManager) -> None:
+        manager.update((50.0, 50.0), rect=(0.0, 0.0, 99.0, 99.0))
+        manager.update((250.0, 50.0), rect=(200.0, 0.0, 299.0, 99.0))
+        assert manager.chunk_state((0, 0)) == CHUNK_LOADED  # two rings away
+        manager.update((350.0, 50.0), rect=(300.0, 0.0, 399.0, 99.0))
+        assert manager.chunk_state((0, 0)) == CHUNK_CACHED
+
+    def test_prefetch_moves_rect(self, manager: SimpleChunkManager) -> None:
+        chunks = manager.get_prefetch_chunks(
+            (100.0, 50.0), (100.0, 0.0), rect=(0.0, 0.0, 199.0, 99.0)
+        )
+        assert chunks == [(2, 0)]
+
+    def test_view_follows_zoom(
+        self, manager: SimpleChunkManager, viewport: ViewPort
+    ) -> None:
+        manager.update_view(viewport)
+        assert len(manager._loaded_chunks) == 6
+        viewport.change_zoom(2.0, (0.0, 0.0))
+        manager.update_view(viewport)
+        assert manager.chunk_state((0, 0)) == CHUNK_LOADED
+        assert manager.get_area_chunks((0, 0, 1, 0)) <= manager._loaded_chunks.keys()
+
+    def test_coarse_manager_takes_over_when_zoomed_out(
+        self, manager: SimpleChunkManager, viewport: ViewPort
+    ) -> None:
+        coarse = SimpleChunkManager(MagicMock(), chunk_size=1000)
+        manager.coarse = coarse
+        manager.coarse_zoom = 0.5
+        manager.update_view(viewport)
+        assert manager._loaded_chunks and not coarse._loaded_chunks
+
+        viewport.zoom = 0.25
+        manager.update_view(viewport)
+        assert not manager._loaded_chunks
+        assert set(coarse._loaded_chunks) == {(0, 0), (1, 0)}
+
+        viewport.zoom = 1.0
+        manager.update_view(viewport)
+        assert not coarse._loaded_chunks
+        assert manager.counts["reattached"] == 6
+
+    def test_shutdown_shuts_coarse_down(self, manager: SimpleChunkManager) -> None:
+        manager.coarse = MagicMock(spec=ChunkManager)
+        manager.shutdown()
+        manager.coarse.shutdown.assert_called_once_with()
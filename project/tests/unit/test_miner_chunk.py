@@ -3,8 +3,16 @@
 from unittest.mock import MagicMock
 
 import pytest
+from gamepart.chunk import ChunkStore
 from gamepart.subsystem import SystemManager
-from scenes.miner.chunk import ResourceChunk, ResourceChunkManager
+from gamepart.viewport import ViewPort
+from scenes.miner.chunk import (
+    COARSE_ZOOM,
+    CoarseResourceChunkManager,
+    ResourceChunk,
+    ResourceChunkManager,
+)
+from scenes.miner.patch import ResourceMarker
 
 
 class TestResourceChunk:
@@ -16,7 +24,7 @@ class TestResourceChunk:
 
 
 class TestResourceChunkManagerUpdate:
-    """ResourceChunkManager.update() only loads chunks, never unloads."""
+    """ResourceChunkManager.update() loads two rings and unloads past three."""
 
     @pytest.fixture
     def mock_system(self) -> MagicMock:
@@ -35,16 +43,41 @@ class TestResourceChunkManagerUpdate:
         assert (0, 0) in loaded
         assert (-1, -1) in loaded
         assert (1, 1) in loaded
-        assert mock_system.add_all.call_count == 9
-
-    def test_update_does_not_unload_when_center_moves(
+        added = [obj for c in mock_system.add_all.call_args_list for obj in c.args]
+        assert sorted(map(id, added)) == sorted(
+            id(obj)
+            for chunk in manager._loaded_chunks.values()
+            for obj in chunk.objects
+        )
+
+    def test_update_keeps_chunks_within_unload_rings(
         self, manager: ResourceChunkManager, mock_system: MagicMock
     ) -> None:
         manager.update((0.0, 0.0), rings=1)
         mock_system.reset_mock()
-        manager.update((2000.0, 2000.0), rings=1)
+        manager.update((1024.0, 1024.0), rings=1)
         mock_system.remove_all.assert_not_called()
-        assert len(manager._loaded_chunks) == 9 + 9
+
+    def test_update_unloads_far_chunks(
+        self, manager: ResourceChunkManager, mock_system: MagicMock
+    ) -> None:
+        manager.update((0.0, 0.0))
+        assert len(manager._loaded_chunks) == 25
+        loaded = list(manager._loaded_chunks.values())
+        manager.update((5000.0, 5000.0))
+        removed = [obj for c in mock_system.remove_all.call_args_list for obj in c.args]
+        assert sorted(map(id, removed)) == sorted(
+            id(obj) for chunk in loaded for obj in chunk.objects
+        )
+        assert len(manager._loaded_chunks) == 25
+
+    def test_returning_reattaches_chunks(self, manager: ResourceChunkManager) -> None:
+        manager.cache_size = 50
+        manager.update((0.0, 0.0))
+        manager.update((5000.0, 5000.0))
+        manager.update((0.0, 0.0))
+        assert manager.counts["built"] == 50
+        assert manager.counts["reattached"] == 25
 
     def test_update_loads_only_missing_chunks(
         self, manager: ResourceChunkManager, mock_system: MagicMock
@@ -86,3 +119,55 @@ class TestResourceChunkManagerGetPatchAt:
         manager.update((0.0, 0.0), rings=1)
         result = manager.get_patch_at((-1e6, -1e6))
         assert result is None
+
+
+class TestResourceChunkManagerStore:
+    def test_depleted_patches_survive_eviction(self) -> None:
+        store = ChunkStore()
+        manager = ResourceChunkManager(
+            MagicMock(spec=SystemManager), chunk_size=512, store=store
+        )
+        manager.cache_size = 0
+        chunk = manager.load_chunk((-1, -1))
+        assert chunk.patches
+        patch = chunk.patches[0]
+        patch.deplete(5)
+        manager.mark_dirty(patch.position)
+        manager.unload_chunk((-1, -1))
+
+        restored = manager.load_chunk((-1, -1))
+
+        assert restored is not chunk
+        assert [
+            (p.position, p.resource_type, p.richness) for p in restored.patches
+        ] == [(p.position, p.resource_type, p.richness) for p in chunk.patches]
+        store.close()
+
+
+class TestCoarseResourceChunkManager:
+    def test_markers_follow_patch_noise(self) -> None:
+        system = MagicMock(spec=SystemManager)
+        manager = ResourceChunkManager(system)
+        coarse = CoarseResourceChunkManager(system)
+        chunk = coarse.load_chunk((0, 0))
+        assert chunk.markers
+        assert chunk.objects[: len(chunk.markers)] == chunk.markers
+        assert all(isinstance(m, ResourceMarker) for m in chunk.markers)
+        values = [manager._noise_patch.get2d(*m.position) for m in chunk.markers]
+        assert sum(values) / len(values) > 0.1  # detailed noise averages 0
+
+    def test_zoomed_out_view_loads_coarse_chunks(self) -> None:
+        system = MagicMock(spec=SystemManager)
+        coarse = CoarseResourceChunkManager(system)
+        manager = ResourceChunkManager(system, coarse=coarse)
+        viewport = ViewPort(MagicMock(), width=1280, height=720, zoom=1 / 16)
+        assert viewport.zoom < COARSE_ZOOM
+
+        manager.update_view(viewport)
+
+        assert not manager._loaded_chunks
+        assert 0 < len(coarse._loaded_chunks) <= 24
+        viewport.zoom = 1.0
+        manager.update_view(viewport)
+        assert not coarse._loaded_chunks
+        assert len(manager._loaded_chunks) == 20
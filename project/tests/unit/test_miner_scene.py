@@ -0,0 +1,64 @@
+"""Tests for miner scene miner placement."""
+
+from collections.abc import Iterator
+from unittest.mock import MagicMock
+
+import pytest
+from gamepart.chunk import CHUNK_CACHED, CHUNK_UNLOADED, ChunkStore
+from gamepart.subsystem import SystemManager
+from scenes.miner.chunk import ResourceChunkManager
+from scenes.miner.scene import MINER_COST_IRON, STARTING_IRON, MinerScene
+
+
+class TestMinerChunkPins:
+    @pytest.fixture
+    def scene(self) -> Iterator[MinerScene]:
+        scene = MinerScene(MagicMock(), "miner")
+        scene.system = MagicMock(spec=SystemManager)
+        scene.miners = []
+        scene.chunk_manager = ResourceChunkManager(
+            scene.system, chunk_size=512, store=ChunkStore()
+        )
+        scene.chunk_manager.cache_size = 2
+        yield scene
+        scene.chunk_manager.shutdown()
+
+    def test_mined_chunk_survives_eviction(self, scene: MinerScene) -> None:
+        manager = scene.chunk_manager
+        manager.update((0.0, 0.0))
+        patch = max(manager._loaded_chunks[(-1, -1)].patches, key=lambda p: p.richness)
+        richness = patch.richness
+        miner = scene._place_miner(patch.position)
+        assert miner is not None
+        scene._run_miner_production()
+        scene._run_miner_production()
+
+        for x in range(1, 6):
+            manager.update((x * 10000.0, 0.0))
+
+        assert manager.chunk_state((-1, -1)) == CHUNK_CACHED
+        assert manager.counts["evicted"] > 0
+
+        manager.update((0.0, 0.0))
+
+        found = manager.get_patch_at(patch.position)
+        assert found is miner.patch
+        assert patch.richness == richness - 2
+        assert scene._place_miner(patch.position) is None
+        assert scene.miners == [miner]
+        assert scene.iron == STARTING_IRON - MINER_COST_IRON + (
+            2 if patch.resource_type == "iron" else 0
+        )
+
+    def test_removed_miner_unpins_chunk(self, scene: MinerScene) -> None:
+        manager = scene.chunk_manager
+        manager.update((0.0, 0.0))
+        patch = manager._loaded_chunks[(-1, -1)].patches[0]
+        miner = scene._place_miner(patch.position)
+        assert miner is not None
+
+        scene._remove_miner(miner)
+        for x in range(1, 6):
+            manager.update((x * 10000.0, 0.0))
+
+        assert manager.chunk_state((-1, -1)) == CHUNK_UNLOADED
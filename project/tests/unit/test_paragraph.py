@@ -76,6 +76,20 @@ class TestParagraphGetTexts:
         assert len(texts) == 1
         assert texts[0][1].text == "single"
 
+    def test_get_texts_use_atlas(self, mock_gui_system: MagicMock) -> None:
+        mock_gui_system.font_manager.get_atlas.return_value.measure.return_value = (
+            42,
+            15,
+        )
+        p = Paragraph(text="a\nbc", use_atlas=True)
+        p.init_gui_system(mock_gui_system)
+        with patch.object(Text, "get_rendered_text") as get_rendered_text:
+            texts = p.get_texts()
+        get_rendered_text.assert_not_called()
+        assert all(text.use_atlas for _, text in texts)
+        assert texts[0][1].width == 42
+        assert texts[1][0] == 17 + p.line_spacing
+
 
 class TestParagraphFitToText:
     @pytest.fixture
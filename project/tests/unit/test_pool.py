@@ -0,0 +1,87 @@
+"""Tests for PhysicsPool."""
+
+import pymunk
+from gamepart.physics import Category, PhysicsPool, SimplePhysicalObject, World
+
+cat_pooled = Category(1 << 20)
+
+
+class PooledBall(SimplePhysicalObject[pymunk.Circle]):
+    created = 0
+
+    def __init__(self, radius: float = 1, position: tuple[float, float] = (0, 0)):
+        PooledBall.created += 1
+        body = pymunk.Body(1, pymunk.moment_for_circle(1, 0, radius))
+        body.position = position
+        shape = pymunk.Circle(body, radius)
+        shape.filter = cat_pooled.filter()
+        super().__init__(body, shape, cat_pooled)
+
+    def reuse(self, radius: float = 1, position: tuple[float, float] = (0, 0)) -> None:
+        self.shape.unsafe_set_radius(radius)
+        self.reset_physics(position, shape_filter=cat_pooled.filter())
+
+
+class TestPhysicsPool:
+    """Test PhysicsPool class."""
+
+    def test_first_acquire_creates(self) -> None:
+        """Test that an empty pool creates objects and counts misses."""
+        pool = PhysicsPool(PooledBall)
+        obj = pool.acquire(2, (1, 1))
+        assert isinstance(obj, PooledBall)
+        assert obj.pool is pool
+        assert obj.shape.radius == 2
+        assert pool.misses == 1
+        assert pool.hit_rate == 0.0
+
+    def test_world_remove_releases_and_acquire_reuses(self) -> None:
+        """Test recycling through World keeps body and shape."""
+        world = World()
+        pool = PhysicsPool(PooledBall)
+        obj = pool.acquire(2, (0, 0))
+        body, shape = obj.body, obj.shape
+        world.add(obj)
+        assert body is not None
+        body.velocity = (10, 5)
+        obj.shape.filter = Category(1).filter()
+        obj.mark_for_removal()
+        world.remove_queued()
+        assert len(pool) == 1
+        created = PooledBall.created
+        again = pool.acquire(radius=5, position=(3, 4))
+        assert again is obj
+        assert PooledBall.created == created
+        assert again.body is body and again.shape is shape
+        assert shape.radius == 5
+        assert body.position == (3, 4)
+        assert body.velocity == (0, 0)
+        assert shape.filter == cat_pooled.filter()
+        assert bool(again)
+        world.add(again)
+        assert world.shape_map[shape] is again
+        assert pool.hits == 1
+        assert pool.hit_rate == 0.5
+
+    def test_acquire_skips_objects_back_in_use(self) -> None:
+        """Test released objects added to a system again are not handed out."""
+        world = World()
+        pool = PhysicsPool(PooledBall)
+        obj = pool.acquire()
+        world.add(obj)
+        world.remove(obj)
+        world.add(obj)
+        assert pool.acquire() is not obj
+        assert pool.dropped == 1
+
+    def test_max_size(self) -> None:
+        """Test releases over max_size are dropped."""
+        pool = PhysicsPool(PooledBall, max_size=1)
+        world = World()
+        objects = [pool.acquire(), pool.acquire()]
+        world.add(*objects)
+        world.remove(*objects)
+        assert len(pool) == 1
+        assert pool.dropped == 1
+        pool.reset_stats()
+        assert pool.misses == 0
@@ -2,7 +2,8 @@
 
 import typing
 
-from gamepart.subsystem import SubSystem, SubSystemObject, SystemManager
+import pytest
+from gamepart.subsystem import ObjectSet, SubSystem, SubSystemObject, SystemManager
 
 
 class TestSubSystemObject:
@@ -151,6 +152,89 @@ class TestSubSystem:
         assert len(cleared) == 2
         assert len(system.objects) == 0
 
+    def test_get_objects_bucket_follows_adds_and_removes(self) -> None:
+        """Test that per-type buckets stay in sync after first use."""
+
+        class A(SubSystemObject):
+            pass
+
+        class B(SubSystemObject):
+            pass
+
+        system: SubSystem[SubSystemObject] = SubSystem()
+        a1, b1 = A(), B()
+        system.add(a1, b1)
+        assert list(system.get_objects(A)) == [a1]
+        a2 = A()
+        system.add(a2)
+        assert list(system.get_objects(A)) == [a1, a2]
+        assert list(system.get_objects(A, B)) == [a1, b1, a2]
+        system.remove(a1)
+        assert list(system.get_objects(A)) == [a2]
+        assert list(system.get_objects(A, B)) == [b1, a2]
+        assert list(system.get_objects()) == []
+
+    def test_remove_queued_only_visits_marked(self) -> None:
+        """Test that marking queues the object in every system holding it."""
+        system1: SubSystem[SubSystemObject] = SubSystem()
+        system2: SubSystem[SubSystemObject] = SubSystem()
+        obj1, obj2 = SubSystemObject(), SubSystemObject()
+        system1.add(obj1, obj2)
+        system2.add(obj1)
+        obj1.mark_for_removal()
+        assert list(system1.removal_queue) == [obj1]
+        assert list(system2.removal_queue) == [obj1]
+        assert list(system1.remove_queued()) == [obj1]
+        assert list(system2.remove_queued()) == [obj1]
+        assert not system1.removal_queue
+        assert list(system1.objects) == [obj2]
+
+    def test_add_marked_object_is_queued(self) -> None:
+        """Test that objects marked before being added are still removed."""
+        system: SubSystem[SubSystemObject] = SubSystem()
+        obj = SubSystemObject()
+        obj.mark_for_removal()
+        system.add(obj)
+        assert list(system.remove_queued()) == [obj]
+        assert len(system.objects) == 0
+
+    def test_removed_object_leaves_queue(self) -> None:
+        """Test that direct removal drops the object from the queue."""
+        system: SubSystem[SubSystemObject] = SubSystem()
+        obj = SubSystemObject()
+        system.add(obj)
+        obj.mark_for_removal()
+        system.remove(obj)
+        assert not system.removal_queue
+        assert obj._systems == []
+
+
+class TestObjectSet:
+    """Test ObjectSet container."""
+
+    def test_keeps_insertion_order(self) -> None:
+        """Test ordering, membership and removal."""
+        objects = ObjectSet([3, 1, 2])
+        objects.add(0)
+        objects.remove(1)
+        objects.discard(5)
+        assert list(objects) == [3, 2, 0]
+        assert 2 in objects
+        assert 1 not in objects
+        assert objects[1] == 2
+        assert objects[-1] == 0
+
+    def test_iteration_walks_the_set(self) -> None:
+        """Test that iteration does not copy, a list() snapshot allows removal."""
+        objects = ObjectSet([1, 2, 3])
+        with pytest.raises(RuntimeError):
+            for obj in objects:
+                objects.remove(obj)
+        for obj in list(objects):
+            objects.remove(obj)
+        assert len(objects) == 0
+        assert not objects
+
 
 class TestSystemManager:
     """Test SystemManager class."""
@@ -345,3 +429,67 @@ class TestSystemManager:
 
         cleared = set(manager.clear_all())
         assert len(cleared) == 0
+
+    def test_add_all_routes_by_class(self) -> None:
+        """Test that acceptance is asked once per class for type based systems."""
+        calls: list[type] = []
+
+        class A(SubSystemObject):
+            pass
+
+        class B(SubSystemObject):
+            pass
+
+        class OnlyA(SubSystem[A]):
+            @staticmethod
+            def accepts(obj: typing.Any) -> bool:
+                calls.append(type(obj))
+                return isinstance(obj, A)
+
+        manager = SystemManager()
+        system = OnlyA()
+        manager.add(system)
+        a1, a2, b1 = A(), A(), B()
+        manager.add_all(a1, b1, a2)
+        manager.add_all(A())
+        assert calls.count(B) == 1  # rejected classes are not asked again
+        assert list(system.objects)[:2] == [a1, a2]
+        assert manager.added_counts[system] == 3
+        manager.remove_all(a1, b1)
+        assert manager.removed_counts[system] == 1
+        manager.reset_counts()
+        assert not manager.added_counts
+
+    def test_add_all_asks_instance_based_systems(self) -> None:
+        """Test that systems with accepts_by_type off decide per object."""
+
+        class Flagged(SubSystemObject):
+            def __init__(self, flag: bool) -> None:
+                super().__init__()
+                self.flag = flag
+
+        class FlagSystem(SubSystem[Flagged]):
+            accepts_by_type = False
+
+            @staticmethod
+            def accepts(obj: typing.Any) -> bool:
+                return isinstance(obj, Flagged) and obj.flag
+
+        manager = SystemManager()
+        system = FlagSystem()
+        manager.add(system)
+        yes, no = Flagged(True), Flagged(False)
+        manager.add_all(yes, no)
+        assert list(system.objects) == [yes]
+
+    def test_adding_system_resets_routes(self) -> None:
+        """Test that systems added later receive objects of known classes."""
+        manager = SystemManager()
+        system1: SubSystem[SubSystemObject] = SubSystem()
+        manager.add(system1)
+        manager.add_all(SubSystemObject())
+        system2: SubSystem[SubSystemObject] = SubSystem()
+        manager.add(system2)
+        obj = SubSystemObject()
+        manager.add_all(obj)
+        assert obj in system2.objects
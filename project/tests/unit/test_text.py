@@ -1,5 +1,7 @@
 """Tests for Text component."""
 
+from unittest.mock import MagicMock
+
 from gamepart.gui.text import Text
 
 
@@ -47,3 +49,18 @@ class TestText:
     def test_max_width(self) -> None:
         text = Text(text="Long text", max_width=200)
         assert text.max_width == 200
+
+    def test_use_atlas(self) -> None:
+        assert not Text(text="Test").draws_from_atlas()
+        assert Text(text="Test", use_atlas=True).draws_from_atlas()
+        # The atlas does not wrap lines
+        assert not Text(text="Test", use_atlas=True, max_width=50).draws_from_atlas()
+
+    def test_fit_to_text_from_atlas_keeps_all_lines(self) -> None:
+        text = Text(text="a\nb", use_atlas=True)
+        atlas = MagicMock()
+        atlas.measure.return_value = (7, 30)
+        text.get_atlas = MagicMock(return_value=atlas)  # type: ignore[method-assign]
+        text.get_line_height = MagicMock(return_value=17)  # type: ignore[method-assign]
+        text.fit_to_text()
+        assert (text.width, text.height) == (7, 30)
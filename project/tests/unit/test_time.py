@@ -2,6 +2,7 @@
 
 import time
 
+import pytest
 from gamepart.time import FPSCounter, TimeFeeder
 
 
@@ -102,6 +103,22 @@ class TestFPSCounter:
         assert "max" in summary
         assert "last" in summary
 
+    def test_get_fps_summary_from_running_sums(self) -> None:
+        """Test get_fps_summary averages come from the running sums."""
+        counter = FPSCounter(maxlen=10)
+        counter.history.extend([0.01, 0.02])
+        counter.sleep_history.extend([0.005, 0.005])
+        counter.total_time = 0.03
+        counter.sleep_time = 0.01
+        rows = {
+            row.split()[0]: row.split()[1:]
+            for row in counter.get_fps_summary().split("\n")
+        }
+        assert rows["FPS"] == ["66.67", "50.00", "100.00", "50.00"]
+        assert rows["Total"] == ["15.00ms", "10.00ms", "20.00ms", "20.00ms"]
+        assert rows["Frame"] == ["10.00ms", "5.00ms", "15.00ms", "15.00ms"]
+        assert rows["Usage"] == ["66.67%", "50.00%", "75.00%", "75.00%"]
+
     def test_target_fps_with_recent(self) -> None:
         """Test target_fps with explicit recent parameter."""
         counter = FPSCounter(maxlen=10)
@@ -135,6 +152,38 @@ class TestFPSCounter:
             time.sleep(0.001)
         counter.target_fps(60.0)
 
+    def test_running_sums_match_history(self) -> None:
+        """Test that running sums follow the history as it wraps."""
+        counter = FPSCounter(maxlen=4)
+        for _ in range(11):
+            counter.frame()
+            counter.target_fps(1000.0)
+        assert len(counter.history) == 4
+        assert counter.total_time == pytest.approx(sum(counter.history))
+        assert counter.sleep_time == pytest.approx(sum(counter.sleep_history))
+        assert counter.get_fps() == pytest.approx(4 / sum(counter.history))
+
+    def test_frame_times_ring_buffer(self) -> None:
+        """Test that frame times are written in order into the ring buffer."""
+        counter = FPSCounter(maxlen=3)
+        assert list(counter.frame_times) == [0.0, 0.0, 0.0]
+        for _ in range(4):
+            counter.frame()
+        assert counter.frame_index == 1
+        oldest_first = [counter.frame_times[(1 + i) % 3] for i in range(3)]
+        assert oldest_first == list(counter.history)
+
+    def test_clear_resets_running_state(self) -> None:
+        """Test that clear() resets sums and the ring buffer."""
+        counter = FPSCounter(maxlen=3)
+        counter.frame()
+        counter.target_fps(1000.0)
+        counter.clear()
+        assert counter.total_time == 0.0
+        assert counter.sleep_time == 0.0
+        assert counter.frame_index == 0
+        assert list(counter.frame_times) == [0.0, 0.0, 0.0]
+
 
 class TestTimeFeeder:
     """Test TimeFeeder class."""
@@ -202,3 +251,17 @@ class TestTimeFeeder:
         feeder = TimeFeeder(time_step=0.1, speed=1.0)
         list(feeder.tick(0.1))
         assert feeder.lag == 0.0
+
+    def test_alpha_after_overshoot(self) -> None:
+        """Test alpha tells how far into the last step system time is."""
+        feeder = TimeFeeder(time_step=0.1, speed=1.0)
+        list(feeder.tick(0.125))
+        assert feeder.world_time == pytest.approx(0.2)
+        assert feeder.alpha == pytest.approx(0.25)
+
+    def test_alpha_is_clamped(self) -> None:
+        """Test alpha stays within [0, 1] when world time lags behind."""
+        feeder = TimeFeeder(time_step=0.1, speed=1.0)
+        list(feeder.tick(1.0, max_iter=2))
+        assert feeder.alpha == 1.0
+        assert TimeFeeder(time_step=0.1).alpha == 1.0
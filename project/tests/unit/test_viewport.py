@@ -1,11 +1,57 @@
 """Tests for ViewPort classes."""
 
 import typing
+from array import array
 from unittest.mock import MagicMock
 
 import pytest
-from gamepart.viewport import CulledFlippedViewPort, FlippedViewPort, ViewPort
+import sdl2.ext
+from gamepart.subsystem import ObjectSet
+from gamepart.viewport import (
+    Circle,
+    CulledFlippedViewPort,
+    DrawCommands,
+    FlippedViewPort,
+    LevelOfDetail,
+    Line,
+    Polygon,
+    Polyline,
+    SpatialGrid,
+    ViewPort,
+)
+from gamepart.viewport.commands import (
+    BOX,
+    COPY,
+    FILLED_CIRCLE,
+    FILLED_POLYGON,
+    LINE,
+    PIXEL,
+    POLYLINE,
+    pack_color,
+    unpack_color,
+)
 from gamepart.viewport.graphicalobject import GraphicalObject
+from gamepart.viewport.spatial import Bounds
+
+
+class _BoxObject(GraphicalObject):
+    """Square object counting its draws."""
+
+    def __init__(self, position: tuple[float, float], half: float | None) -> None:
+        super().__init__()
+        self.position = position
+        self.angle = 0.0
+        self.half = half
+        self.drawn = 0
+
+    def draw(self, vp: typing.Any) -> None:
+        self.drawn += 1
+
+    def get_bounds(self) -> Bounds:
+        if self.half is None:
+            return super().get_bounds()
+        px, py = self.position
+        return px - self.half, py - self.half, px + self.half, py + self.half
 
 
 @pytest.fixture
@@ -54,7 +100,7 @@ class TestViewPort:
         """draw should call draw on all added objects."""
         mock_obj1 = MagicMock()
         mock_obj2 = MagicMock()
-        viewport.objects = [mock_obj1, mock_obj2]
+        viewport.objects = ObjectSet([mock_obj1, mock_obj2])
 
         viewport.draw()
 
@@ -63,7 +109,7 @@ class TestViewPort:
 
     def test_draw_with_no_objects(self, viewport: ViewPort) -> None:
         """draw should handle empty objects list."""
-        viewport.objects = []
+        viewport.objects = ObjectSet()
         viewport.draw()
 
     def test_d_to_view_at_zoom_1(self, viewport: ViewPort) -> None:
@@ -100,6 +146,17 @@ class TestViewPort:
         viewport.zoom = 0.5
         assert viewport.d_to_world(100.0) == 200.0
 
+    def test_world_rect(self, viewport: ViewPort) -> None:
+        """world_rect should span the view in world coordinates."""
+        viewport.zoom = 2.0
+        viewport.x, viewport.y = 10.0, 20.0
+        assert viewport.world_rect == pytest.approx((10.0, 20.0, 410.0, 320.0))
+
+    def test_world_rect_flipped(self, flipped_viewport: FlippedViewPort) -> None:
+        """world_rect should keep min before max when y is flipped."""
+        flipped_viewport.zoom = 0.5
+        assert flipped_viewport.world_rect == pytest.approx((0.0, 0.0, 1600.0, 1200.0))
+
     def test_d_to_view_and_d_to_world_are_inverse(self, viewport: ViewPort) -> None:
         """d_to_view and d_to_world should be inverse operations."""
         viewport.zoom = 1.5
@@ -112,6 +169,51 @@ class TestViewPort:
         )
 
 
+class TestViewPortManyTransforms:
+    """Test transforming flat coordinate buffers."""
+
+    COORDS = [0.0, 0.0, 10.0, -5.0, 123.5, 42.25]
+
+    @pytest.fixture(params=[ViewPort, FlippedViewPort])
+    def moved_viewport(
+        self, request: pytest.FixtureRequest, mock_renderer: MagicMock
+    ) -> ViewPort:
+        vp_class: type[ViewPort] = request.param
+        return vp_class(mock_renderer, width=800, height=600, zoom=2.5, x=-7.0, y=3.0)
+
+    def test_to_view_many_matches_to_view(self, moved_viewport: ViewPort) -> None:
+        result = moved_viewport.to_view_many(array("d", self.COORDS))
+        coords = self.COORDS
+        for i in range(0, len(coords), 2):
+            x, y = moved_viewport.to_view((coords[i], coords[i + 1]))
+            assert result[i] == pytest.approx(x)
+            assert result[i + 1] == pytest.approx(y)
+
+    def test_to_world_many_inverts(self, moved_viewport: ViewPort) -> None:
+        view = moved_viewport.to_view_many(self.COORDS)
+        world = moved_viewport.to_world_many(view)
+        assert list(world) == pytest.approx(self.COORDS)
+
+    def test_keeps_float32(self, viewport: ViewPort) -> None:
+        result = viewport.to_view_many(array("f", [1.0, 2.0]))
+        assert isinstance(result, array)
+        assert result.typecode == "f"
+
+    def test_source_is_not_modified(self, viewport: ViewPort) -> None:
+        viewport.x = 10.0
+        coords = array("d", [1.0, 2.0])
+        viewport.to_view_many(coords)
+        assert list(coords) == [1.0, 2.0]
+
+    def test_numpy(self, mock_renderer: MagicMock) -> None:
+        numpy = pytest.importorskip("numpy")
+        vp = FlippedViewPort(mock_renderer, width=800, height=600, zoom=2.0, x=1.0)
+        coords = numpy.array([[0.0, 0.0], [10.0, 20.0]])
+        result = vp.to_view_many(coords)
+        assert result.shape == (2, 2)
+        assert result[1].tolist() == list(vp.to_view((10.0, 20.0)))
+
+
 class TestViewPortChangeZoom:
     """Test change_zoom method."""
 
@@ -427,38 +529,317 @@ class TestCulledFlippedViewPort:
         self, culled_viewport: CulledFlippedViewPort
     ) -> None:
         minx, miny, maxx, maxy = culled_viewport._visible_world_rect()
-        inside = MagicMock()
-        inside.position = (400.0, 400.0)
-        inside.radius = 5.0
-        outside_left = MagicMock()
-        outside_left.position = (minx - 10.0, 400.0)
-        outside_left.radius = 5.0
-        outside_right = MagicMock()
-        outside_right.position = (maxx + 10.0, 400.0)
-        outside_right.radius = 5.0
-        culled_viewport.objects = [inside, outside_left, outside_right]
+        inside = _BoxObject((400.0, 400.0), 5.0)
+        outside_left = _BoxObject((minx - 10.0, 400.0), 5.0)
+        outside_right = _BoxObject((maxx + 10.0, 400.0), 5.0)
+        culled_viewport.add(inside, outside_left, outside_right)
         culled_viewport.draw()
-        inside.draw.assert_called_once_with(culled_viewport)
-        outside_left.draw.assert_not_called()
-        outside_right.draw.assert_not_called()
+        assert inside.drawn == 1
+        assert outside_left.drawn == 0
+        assert outside_right.drawn == 0
 
-    def test_draw_uses_default_radius_when_missing(
+    def test_draw_uses_point_bounds_by_default(
         self, culled_viewport: CulledFlippedViewPort
     ) -> None:
-        obj_at_edge = MagicMock()
-        obj_at_edge.position = (95.0, 400.0)
-        del obj_at_edge.radius
-        culled_viewport.objects = [obj_at_edge]
+        obj_at_edge = _BoxObject((95.0, 400.0), None)
+        culled_viewport.add(obj_at_edge)
         culled_viewport.draw()
-        obj_at_edge.draw.assert_called_once_with(culled_viewport)
+        assert obj_at_edge.drawn == 1
 
     def test_draw_includes_object_touching_rect_boundary(
         self, culled_viewport: CulledFlippedViewPort
     ) -> None:
         minx, miny, maxx, maxy = culled_viewport._visible_world_rect()
-        touching = MagicMock()
-        touching.position = (minx + 10.0, miny + 10.0)
-        touching.radius = 10.0
-        culled_viewport.objects = [touching]
+        touching = _BoxObject((minx - 10.0, miny - 10.0), 10.0)
+        culled_viewport.add(touching)
+        culled_viewport.draw()
+        assert touching.drawn == 1
+
+    def test_draw_tracks_moving_objects(
+        self, culled_viewport: CulledFlippedViewPort
+    ) -> None:
+        obj = _BoxObject((5000.0, 5000.0), 5.0)
+        culled_viewport.add(obj)
         culled_viewport.draw()
-        touching.draw.assert_called_once()
+        assert obj.drawn == 0
+        obj.position = (400.0, 400.0)
+        culled_viewport.draw()
+        assert obj.drawn == 1
+
+    def test_static_objects_need_moved(
+        self, culled_viewport: CulledFlippedViewPort
+    ) -> None:
+        obj = _BoxObject((5000.0, 5000.0), 5.0)
+        obj.static = True
+        culled_viewport.add(obj)
+        obj.position = (400.0, 400.0)
+        culled_viewport.draw()
+        assert obj.drawn == 0
+        culled_viewport.moved(obj)
+        culled_viewport.draw()
+        assert obj.drawn == 1
+
+    def test_remove_drops_from_grid(
+        self, culled_viewport: CulledFlippedViewPort
+    ) -> None:
+        obj = _BoxObject((400.0, 400.0), 5.0)
+        culled_viewport.add(obj)
+        culled_viewport.remove(obj)
+        assert obj not in culled_viewport.grid
+        culled_viewport.draw()
+        assert obj.drawn == 0
+
+    def test_line_and_polygon_bounds(self) -> None:
+        line = Line()
+        line.end_points = ((10.0, 50.0), (-5.0, 20.0))
+        assert line.get_bounds() == (-5.0, 20.0, 10.0, 50.0)
+        polygon = Polygon()
+        polygon.points = [(0.0, 0.0), (10.0, -3.0), (4.0, 8.0)]
+        assert polygon.get_bounds() == (0.0, -3.0, 10.0, 8.0)
+
+
+class TestFlatCoordinateObjects:
+    """Test objects drawn from flat coordinate buffers."""
+
+    def test_polygon_queues_flat_coords(self, viewport: ViewPort) -> None:
+        viewport.x = 5.0
+        polygon = Polygon()
+        polygon.points = [(5.0, 0.0), (15.0, 0.0), (5.0, 10.0)]
+        polygon.color = (255, 0, 0)
+        polygon.draw(viewport)
+        ((key, args),) = viewport.commands.commands
+        assert key[5] == FILLED_POLYGON
+        assert list(args) == [0.0, 0.0, 10.0, 0.0, 0.0, 10.0]
+
+    def test_polyline(self, viewport: ViewPort) -> None:
+        polyline = Polyline()
+        polyline.coords = array("d", [0.0, 0.0, 10.0, 5.0, -3.0, 8.0])
+        polyline.color = (0, 255, 0)
+        polyline.width = 2
+        assert polyline.get_bounds() == (-3.0, 0.0, 10.0, 8.0)
+        viewport.zoom = 2.0
+        polyline.draw(viewport)
+        ((key, (coords, width)),) = viewport.commands.commands
+        assert key[5] == POLYLINE
+        assert width == 2
+        assert list(coords) == [0.0, 0.0, 20.0, 10.0, -6.0, 16.0]
+
+
+class TestInterpolation:
+    """Test drawing objects between physics steps."""
+
+    @pytest.fixture
+    def circle(self) -> Circle:
+        circle = Circle()
+        circle.position = (100.0, 50.0)
+        circle.angle = 1.0
+        circle.radius = 10.0
+        circle.color = (255, 0, 0)
+        return circle
+
+    def test_interpolated_transform(self, circle: Circle) -> None:
+        assert circle.interpolated(0.5) == ((100.0, 50.0), 1.0)
+        circle.previous_transform = ((80.0, 50.0), 0.0)
+        assert circle.interpolated(0.5) == ((90.0, 50.0), 0.5)
+        assert circle.interpolated(1.0) == ((100.0, 50.0), 1.0)
+
+    def test_circle_drawn_interpolated(
+        self, viewport: ViewPort, circle: Circle
+    ) -> None:
+        circle.previous_transform = ((80.0, 30.0), 1.0)
+        viewport.alpha = 0.25
+        circle.draw(viewport)
+        payloads = {key[5]: args for key, args in viewport.commands.commands}
+        assert payloads[FILLED_CIRCLE] == (85, 35, 10)
+
+    def test_polygon_shifted(self, viewport: ViewPort) -> None:
+        polygon = Polygon()
+        polygon.position = (10.0, 10.0)
+        polygon.angle = 0.0
+        polygon.points = [(10.0, 10.0), (20.0, 10.0), (10.0, 20.0)]
+        polygon.color = (255, 0, 0)
+        polygon.previous_transform = ((0.0, 10.0), 0.0)
+        viewport.alpha = 0.5
+        polygon.draw(viewport)
+        ((_, args),) = viewport.commands.commands
+        assert list(args) == [5.0, 10.0, 15.0, 10.0, 5.0, 20.0]
+
+
+class TestLevelOfDetail:
+    """Test cheaper drawing of small objects."""
+
+    @staticmethod
+    def _circle(radius: float, position: tuple[float, float] = (10.0, 10.0)) -> Circle:
+        circle = Circle()
+        circle.position = position
+        circle.angle = 0.0
+        circle.radius = radius
+        circle.color = (255, 0, 0)
+        return circle
+
+    def _kinds(self, viewport: ViewPort) -> list[int]:
+        return [key[5] for key, _ in viewport.commands.commands]
+
+    def test_full_detail(self, viewport: ViewPort) -> None:
+        self._circle(10.0).draw(viewport)
+        assert self._kinds(viewport) == [FILLED_CIRCLE, LINE]
+
+    def test_orientation_line_dropped(self, viewport: ViewPort) -> None:
+        self._circle(3.0).draw(viewport)
+        assert self._kinds(viewport) == [FILLED_CIRCLE]
+
+    def test_tiny_circles_simplified(self, viewport: ViewPort) -> None:
+        self._circle(1.5).draw(viewport)
+        self._circle(0.7).draw(viewport)
+        assert self._kinds(viewport) == [BOX, PIXEL]
+        assert viewport.commands.commands[0][1] == (9, 9, 11, 11)
+        assert viewport.lod is not None and viewport.lod.simplified == 2
+
+    def test_subpixel_aggregated(self, viewport: ViewPort) -> None:
+        self._circle(0.1, (10.2, 10.2)).draw(viewport)
+        self._circle(0.1, (10.7, 10.4)).draw(viewport)
+        self._circle(0.1, (30.0, 10.0)).draw(viewport)
+        assert self._kinds(viewport) == [PIXEL, PIXEL]
+
+    def test_subpixel_skipped(self, viewport: ViewPort) -> None:
+        viewport.lod = LevelOfDetail(aggregate=False)
+        self._circle(0.1).draw(viewport)
+        assert self._kinds(viewport) == []
+
+    def test_disabled(self, viewport: ViewPort) -> None:
+        viewport.lod = None
+        self._circle(0.1).draw(viewport)
+        assert self._kinds(viewport) == [FILLED_CIRCLE, LINE]
+
+    def test_reset_on_draw(self, viewport: ViewPort, mock_renderer: MagicMock) -> None:
+        circle = self._circle(0.1)
+        viewport.add(circle)
+        viewport.draw()
+        viewport.draw()
+        assert mock_renderer.pixel.call_count == 2
+
+    def test_small_polygon(self, viewport: ViewPort) -> None:
+        polygon = Polygon()
+        polygon.points = [(10.0, 10.0), (11.0, 10.0), (10.0, 11.0)]
+        polygon.color = (255, 0, 0)
+        polygon.draw(viewport)
+        assert self._kinds(viewport) == [PIXEL]
+
+
+class TestSpatialGrid:
+    """Test uniform grid spatial index."""
+
+    def test_query_returns_overlapping(self) -> None:
+        grid: SpatialGrid[str] = SpatialGrid(cell_size=10.0)
+        grid.insert("a", (0.0, 0.0, 5.0, 5.0))
+        grid.insert("b", (100.0, 100.0, 105.0, 105.0))
+        assert list(grid.query((-1.0, -1.0, 9.0, 9.0))) == ["a"]
+
+    def test_query_yields_spanning_object_once(self) -> None:
+        grid: SpatialGrid[str] = SpatialGrid(cell_size=10.0)
+        grid.insert("a", (0.0, 0.0, 35.0, 35.0))
+        assert list(grid.query((0.0, 0.0, 100.0, 100.0))) == ["a"]
+
+    def test_oversized_objects_always_returned(self) -> None:
+        grid: SpatialGrid[str] = SpatialGrid(cell_size=10.0, max_cells=4)
+        grid.insert("big", (0.0, 0.0, 1000.0, 1000.0))
+        assert list(grid.query((5000.0, 5000.0, 5001.0, 5001.0))) == ["big"]
+        grid.remove("big")
+        assert len(grid) == 0
+
+    def test_update_reports_cell_change(self) -> None:
+        grid: SpatialGrid[str] = SpatialGrid(cell_size=10.0)
+        grid.insert("a", (0.0, 0.0, 1.0, 1.0))
+        assert grid.update("a", (2.0, 2.0, 3.0, 3.0)) is False
+        assert grid.update("a", (52.0, 2.0, 53.0, 3.0)) is True
+        assert list(grid.query((0.0, 0.0, 9.0, 9.0))) == []
+        assert list(grid.query((50.0, 0.0, 59.0, 9.0))) == ["a"]
+
+    def test_remove_drops_empty_cells(self) -> None:
+        grid: SpatialGrid[str] = SpatialGrid(cell_size=10.0)
+        grid.insert("a", (0.0, 0.0, 25.0, 5.0))
+        grid.remove("a")
+        assert grid._cells == {}
+
+
+class TestDrawCommands:
+    """Test deferred draw command queue."""
+
+    def test_pack_color_roundtrip(self) -> None:
+        packed = pack_color((10, 20, 30, 40))
+        assert packed == pack_color(sdl2.ext.Color(10, 20, 30, 40))
+        color = unpack_color(packed)
+        assert (color.r, color.g, color.b, color.a) == (10, 20, 30, 40)
+
+    def test_flush_groups_by_color(self, mock_renderer: MagicMock) -> None:
+        commands = DrawCommands()
+        commands.add(FILLED_CIRCLE, (1, 1, 1), (255, 0, 0))
+        commands.add(FILLED_CIRCLE, (2, 2, 2), (0, 255, 0))
+        commands.add(FILLED_CIRCLE, (3, 3, 3), (255, 0, 0))
+        commands.flush(mock_renderer)
+        assert mock_renderer.filled_circle.call_count == 2
+        batches = [c.args[0] for c in mock_renderer.filled_circle.call_args_list]
+        assert [(2, 2, 2)] in batches
+        assert [(1, 1, 1), (3, 3, 3)] in batches
+        assert commands.last_groups == 2
+        assert commands.last_count == 3
+        assert len(commands) == 0
+
+    def test_flush_orders_by_layer(self, mock_renderer: MagicMock) -> None:
+        commands = DrawCommands()
+        commands.add(LINE, (0, 0, 1, 1), (0, 0, 0), layer=1)
+        commands.add(FILLED_CIRCLE, (1, 1, 1), (255, 0, 0), layer=0)
+        commands.flush(mock_renderer)
+        names = [name for name, _, _ in mock_renderer.method_calls]
+        assert names == ["filled_circle", "line"]
+
+    def test_flush_copies_textures(self, mock_renderer: MagicMock) -> None:
+        commands = DrawCommands()
+        texture = object()
+        args = (texture, None, (0, 0, 1, 1), 0.0, None, 0)
+        commands.add(COPY, args, texture=texture)
+        commands.flush(mock_renderer)
+        mock_renderer.copy.assert_called_once_with(*args)
+
+    def test_textures_keep_order_of_first_use(self, mock_renderer: MagicMock) -> None:
+        commands = DrawCommands()
+        first, second = object(), object()
+        for texture in (second, first, second):
+            commands.add(COPY, (texture,), texture=texture)
+        commands.flush(mock_renderer)
+        copied = [c.args[0] for c in mock_renderer.copy.call_args_list]
+        assert copied == [second, second, first]
+
+    def test_flush_sets_blendmode(self, mock_renderer: MagicMock) -> None:
+        commands = DrawCommands()
+        commands.add(FILLED_CIRCLE, (1, 1, 1), (255, 0, 0), blendmode=2)
+        commands.flush(mock_renderer)
+        mock_renderer.keep_blendmode.assert_called_once()
+        assert mock_renderer.blendmode == 2
+
+    def test_circle_queues_fill_then_orientation(
+        self, viewport: ViewPort, mock_renderer: MagicMock
+    ) -> None:
+        circle = Circle()
+        circle.position = (10.0, 10.0)
+        circle.angle = 0.0
+        circle.radius = 5.0
+        circle.color = (255, 0, 0)
+        circle.draw(viewport)
+        assert len(viewport.commands) == 2
+        viewport.commands.flush(mock_renderer)
+        names = [name for name, _, _ in mock_renderer.method_calls]
+        assert names == ["filled_circle", "line"]
+
+    def test_viewport_draw_flushes(
+        self, viewport: ViewPort, mock_renderer: MagicMock
+    ) -> None:
+        line = Line()
+        line.position = (0.0, 0.0)
+        line.angle = 0.0
+        line.end_points = ((0.0, 0.0), (10.0, 10.0))
+        line.color = (255, 0, 0)
+        viewport.add(line)
+        viewport.draw()
+        mock_renderer.line.assert_called_once()
+        assert len(viewport.commands) == 0